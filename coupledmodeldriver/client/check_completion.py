@@ -1,20 +1,57 @@
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import json
 from os import PathLike
 from pathlib import Path
-from typing import Collection
+import statistics
+import time
+from typing import Any, Collection, Dict, Iterator, Mapping
 
 from coupledmodeldriver.configure import ModelJSON
 from coupledmodeldriver.generate.adcirc.base import ADCIRCJSON
 from coupledmodeldriver.generate.adcirc.check import (
-    check_adcirc_completion,
+    adcirc_completion_fingerprint,
+    adcirc_completion_status,
     collect_adcirc_errors,
+    CompletionCache,
     CompletionStatus,
+    update_progress,
 )
-from coupledmodeldriver.utilities import convert_value
+from coupledmodeldriver.scheduler import (
+    JOB_REGISTRY_FILENAME,
+    JobScheduler,
+    read_job_registry,
+    registry_job_states,
+)
+from coupledmodeldriver.utilities import convert_value, DirectoryWatcher
 
 MODELS = {model.name.lower(): model for model in ModelJSON.__subclasses__()}
 
+# sidecar file, in the checked directory, in which the completion of each run directory is cached
+COMPLETION_CACHE_FILENAME = '.completion.json'
+
+# number of run directories checked at once; checks mostly wait on the file system
+MAX_CHECK_WORKERS = 16
+
+# seconds between polls of run directories in watch mode
+WATCH_INTERVAL = 60
+
+# seconds over which changes are gathered before rescanning, so that runs writing continuously are not rescanned on every write
+WATCH_DEBOUNCE = 1
+
+# runs whose remaining time exceeds this multiple of the median remaining time are reported as stragglers
+STRAGGLER_FACTOR = 1.5
+
+# statuses after which a run is no longer watched; runs with errors in their logs, or that are not configured, do not
+# progress without intervention
+FINAL_STATUSES = [
+    CompletionStatus.COMPLETED,
+    CompletionStatus.FAILED,
+    CompletionStatus.ERROR,
+    CompletionStatus.NOT_CONFIGURED,
+]
+
 
 def parse_check_completion_arguments():
     argument_parser = ArgumentParser()
@@ -28,12 +65,37 @@ def parse_check_completion_arguments():
     argument_parser.add_argument(
         '--verbose', action='store_true', help='list all errors and problems with runs'
     )
+    argument_parser.add_argument(
+        '--workers', default=None, help='number of run directories to check at once'
+    )
+    argument_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'check every run directory, instead of only those changed since the last check (cached in `{COMPLETION_CACHE_FILENAME}`)',
+    )
+    argument_parser.add_argument(
+        '--telemetry',
+        action='store_true',
+        help='report throughput and estimated time remaining of each run, and of the whole ensemble',
+    )
+    argument_parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='keep watching runs, printing a JSON line whenever the status of a run changes',
+    )
+    argument_parser.add_argument(
+        '--interval',
+        default=None,
+        help=f'seconds between polls of run directories in watch mode (default {WATCH_INTERVAL})',
+    )
 
     arguments = argument_parser.parse_args()
 
     model = arguments.model
     if model is not None:
         model = MODELS[model.lower()]
+        if arguments.watch and model != ADCIRCJSON:
+            argument_parser.error(f'watching {model.name} runs is not supported')
 
     directory = convert_value(arguments.directory, [Path])
     if len(directory) == 1:
@@ -43,12 +105,37 @@ def parse_check_completion_arguments():
         'directory': directory,
         'model': model,
         'verbose': arguments.verbose,
+        'workers': convert_value(arguments.workers, int),
+        'use_cache': not arguments.no_cache,
+        'telemetry': arguments.telemetry,
+        'watch': arguments.watch,
+        'interval': convert_value(arguments.interval, float),
     }
 
 
 def check_completion(
-    directory: PathLike = None, model: ModelJSON = None, verbose: bool = False
-):
+    directory: PathLike = None,
+    model: ModelJSON = None,
+    verbose: bool = False,
+    workers: int = None,
+    use_cache: bool = True,
+    scheduler: JobScheduler = None,
+) -> {str: Any}:
+    """
+    check the completion of the given run directory, or of the spinup and runs of the given ensemble directory
+
+    If the ensemble directory contains a job registry (`jobs.txt`, written by the run script), the states of all
+    recorded jobs are queried from the scheduler at once and merged with the status read from the run directories.
+
+    :param directory: run or ensemble directory, or list of directories
+    :param model: model that is running
+    :param verbose: list all errors and problems with runs
+    :param workers: number of run directories to check at once
+    :param use_cache: only check run directories whose files changed since the last check
+    :param scheduler: scheduler to query for the states of recorded jobs, defaulting to Slurm
+    :return: completion of each run directory
+    """
+
     if directory is None:
         directory = Path.cwd()
     elif not isinstance(directory, Path) and (
@@ -59,44 +146,329 @@ def check_completion(
     if model is None:
         model = ADCIRCJSON
 
+    if workers is None:
+        workers = MAX_CHECK_WORKERS
+
     completion_status = {}
 
     if isinstance(directory, Collection):
         for subdirectory in directory:
             completion_status[subdirectory.name] = check_completion(
-                directory=subdirectory, model=model, verbose=verbose
+                directory=subdirectory,
+                model=model,
+                verbose=verbose,
+                workers=workers,
+                use_cache=use_cache,
+                scheduler=scheduler,
             )
     elif isinstance(directory, Path):
-        subdirectories = [member.name for member in directory.iterdir()]
-        if 'spinup' in subdirectories:
-            completion_status.update(
-                check_completion(directory=directory / 'spinup', model=model, verbose=verbose)
-            )
-        if 'runs' in subdirectories:
-            completion_status['runs'] = {}
-            for run_directory in (directory / 'runs').iterdir():
-                completion_status['runs'].update(
-                    check_completion(directory=run_directory, model=model, verbose=verbose)
-                )
+        # run directories, along with the entry of the output to which their completion is added
+        run_directories = {}
+        run_names = {}
+        for name, run_directory in ensemble_run_directories(directory).items():
+            if name.startswith('runs/'):
+                entry = completion_status.setdefault('runs', {})
+            else:
+                entry = completion_status
+            # keep the order of run directories in the output, regardless of which check finishes first
+            entry[run_directory.name] = None
+            run_directories[run_directory] = entry
+            run_names[run_directory] = name
+        if (directory / 'runs').is_dir():
+            completion_status.setdefault('runs', {})
+
+        if use_cache:
+            cache = CompletionCache(directory / COMPLETION_CACHE_FILENAME)
         else:
-            if model == ADCIRCJSON:
-                if verbose:
-                    completion = collect_adcirc_errors(directory=directory)
-                    percentage = completion['completion_percentage']
-                else:
-                    completion, percentage = check_adcirc_completion(directory=directory)
+            cache = None
+
+        job_registry = read_job_registry(directory / JOB_REGISTRY_FILENAME)
+        if len(job_registry) > 0:
+            jobs = registry_job_states(job_registry, scheduler)
+        else:
+            jobs = {}
 
-                if isinstance(completion, CompletionStatus):
-                    completion = f'{completion.value} - {percentage}%'
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(run_directories)))
+        ) as pool:
+            for (run_directory, entry), completion in zip(
+                run_directories.items(),
+                pool.map(
+                    lambda run_directory: check_run_completion(
+                        run_directory,
+                        model=model,
+                        verbose=verbose,
+                        cache=cache,
+                        jobs=jobs.get(run_names[run_directory]),
+                    ),
+                    run_directories,
+                ),
+            ):
+                entry[run_directory.name] = completion
 
-                completion_status[directory.name] = completion
+        if cache is not None:
+            cache.write()
 
     return completion_status
 
 
+def ensemble_run_directories(directory: Path) -> {str: Path}:
+    """
+    :param directory: run or ensemble directory
+    :return: spinup and run directories of an ensemble (named relative to the ensemble directory), or the given run directory
+    """
+
+    run_directories = {}
+
+    subdirectories = [member.name for member in directory.iterdir()]
+    if 'spinup' in subdirectories:
+        run_directories['spinup'] = directory / 'spinup'
+    if 'runs' in subdirectories:
+        for run_directory in (directory / 'runs').iterdir():
+            run_directories[f'runs/{run_directory.name}'] = run_directory
+    else:
+        run_directories[directory.name] = directory
+
+    return run_directories
+
+
+def ensemble_telemetry(completion_status: {str: Any}, now: datetime = None) -> {str: Any}:
+    """
+    summarize the progress of each run, and estimate when the whole ensemble will finish
+
+    :param completion_status: completion of runs, from `check_completion(verbose=True)`
+    :param now: wall-clock time from which the remaining time of the ensemble is measured
+    :return: throughput and estimated time remaining of each run, and estimated completion of the ensemble
+    """
+
+    if now is None:
+        now = datetime.now()
+
+    runs = {}
+
+    def add_runs(entries: {str: Any}, prefix: str = ''):
+        for name, completion in entries.items():
+            if isinstance(completion, Mapping):
+                if 'completion_percentage' in completion:
+                    runs[f'{prefix}{name}'] = completion
+                else:
+                    add_runs(completion, f'{prefix}{name}/')
+
+    add_runs(completion_status)
+
+    run_telemetry = {}
+    for name, completion in runs.items():
+        progress = completion.get('progress', {})
+        run_telemetry[name] = {
+            'completion_percentage': completion['completion_percentage'],
+            'throughput': progress.get('throughput'),
+            'remaining': progress.get('remaining'),
+            'estimated_completion': progress.get('estimated_completion'),
+            'exceeds_job_duration': progress.get('exceeds_job_duration'),
+        }
+
+    estimated_runs = {
+        name: telemetry
+        for name, telemetry in run_telemetry.items()
+        if telemetry['remaining'] is not None
+    }
+
+    ensemble = {
+        'estimated_completion': None,
+        'makespan': None,
+        'stragglers': [],
+        'exceeding_job_duration': [
+            name
+            for name, telemetry in run_telemetry.items()
+            if telemetry['exceeds_job_duration']
+        ],
+        # unfinished runs that have not progressed enough to estimate
+        'unestimated': [
+            name
+            for name, telemetry in run_telemetry.items()
+            if telemetry['remaining'] is None and telemetry['completion_percentage'] < 100
+        ],
+    }
+
+    if len(estimated_runs) > 0:
+        estimated_completion = max(
+            datetime.fromisoformat(telemetry['estimated_completion'])
+            for telemetry in estimated_runs.values()
+        )
+        ensemble['estimated_completion'] = estimated_completion.isoformat()
+        ensemble['makespan'] = max((estimated_completion - now).total_seconds(), 0)
+
+        median_remaining = statistics.median(
+            telemetry['remaining'] for telemetry in estimated_runs.values()
+        )
+        ensemble['stragglers'] = [
+            name
+            for name, telemetry in estimated_runs.items()
+            if telemetry['remaining'] > STRAGGLER_FACTOR * median_remaining
+        ]
+
+    return {'runs': run_telemetry, 'ensemble': ensemble}
+
+
+def watch_completion(
+    directory: PathLike = None, model: ModelJSON = None, interval: float = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    watch run directories, keeping the status of each run in memory and yielding only changes in status
+
+    Changes are detected with `inotify` where available; run directories are also polled (by file modification times
+    and sizes) every `interval` seconds, since `inotify` does not see writes made from other hosts.
+    The generator stops once every run has reached one of `FINAL_STATUSES` (completed, failed, errored, or not
+    configured).
+
+    :param directory: run or ensemble directory, or list of directories
+    :param model: model that is running
+    :param interval: seconds between polls of run directories
+    :return: status changes, as `{'time', 'run', 'previous', 'status', 'completion_percentage', 'throughput'}`
+    """
+
+    if directory is None:
+        directory = Path.cwd()
+    if isinstance(directory, Collection) and not isinstance(directory, str):
+        directories = [Path(subdirectory) for subdirectory in directory]
+    else:
+        directories = [Path(directory)]
+
+    if model is None:
+        model = ADCIRCJSON
+    if model != ADCIRCJSON:
+        raise ValueError(f'watching {model.name} runs is not supported')
+
+    if interval is None:
+        interval = WATCH_INTERVAL
+
+    run_directories = {}
+    for ensemble_directory in directories:
+        for name, run_directory in ensemble_run_directories(ensemble_directory).items():
+            if len(directories) > 1:
+                name = f'{ensemble_directory.name}/{name}'
+            run_directories[name] = run_directory
+
+    fingerprints = {}
+    statuses = {}
+    progresses = {}
+
+    with DirectoryWatcher(run_directories.values()) as watcher:
+        changed_directories = set(run_directories.values())
+        while True:
+            for name, run_directory in run_directories.items():
+                if run_directory not in changed_directories:
+                    continue
+
+                fingerprint = adcirc_completion_fingerprint(run_directory)
+                if fingerprints.get(name) == fingerprint:
+                    continue
+                fingerprints[name] = fingerprint
+
+                errors = collect_adcirc_errors(run_directory)
+                status, percentage = adcirc_completion_status(errors)
+
+                progress = update_progress(progresses.get(name), errors.get('progress'))
+                if progress is not None:
+                    progresses[name] = progress
+
+                previous_status = statuses.get(name)
+                if status != previous_status:
+                    statuses[name] = status
+                    yield {
+                        'time': datetime.now().isoformat(timespec='seconds'),
+                        'run': name,
+                        'previous': previous_status.value
+                        if previous_status is not None
+                        else None,
+                        'status': status.value,
+                        'completion_percentage': percentage,
+                        'throughput': progress['throughput'] if progress is not None else None,
+                    }
+
+            if all(status in FINAL_STATUSES for status in statuses.values()):
+                break
+
+            changed_directories = watcher.wait(interval)
+            if len(changed_directories) > 0:
+                deadline = time.monotonic() + WATCH_DEBOUNCE
+                while time.monotonic() < deadline:
+                    changed_directories.update(watcher.wait(deadline - time.monotonic()))
+            else:
+                changed_directories = set(run_directories.values())
+
+
+def check_run_completion(
+    directory: Path,
+    model: ModelJSON = None,
+    verbose: bool = False,
+    cache: CompletionCache = None,
+    jobs: {str: {str: str}} = None,
+) -> Any:
+    """
+    :param directory: run directory
+    :param model: model that is running
+    :param verbose: list all errors and problems with the run
+    :param cache: cache of completion from previous checks
+    :param jobs: job ID and state of each job of the run, queried from the scheduler
+    :return: completion of run directory
+    """
+
+    if model is None:
+        model = ADCIRCJSON
+
+    completion = None
+    if model == ADCIRCJSON:
+        if cache is not None:
+            fingerprint = adcirc_completion_fingerprint(directory)
+            errors = cache.get(directory, fingerprint)
+            if errors is None:
+                errors = collect_adcirc_errors(directory=directory)
+                if 'progress' in errors:
+                    previous_errors = cache.previous(directory)
+                    update_progress(
+                        previous_errors.get('progress')
+                        if previous_errors is not None
+                        else None,
+                        errors['progress'],
+                    )
+                cache.set(directory, fingerprint, errors)
+        else:
+            errors = collect_adcirc_errors(directory=directory)
+
+        # job states change without changes to the run directory, so they are never cached
+        if jobs is not None:
+            errors = {**errors, 'jobs': jobs}
+
+        if verbose:
+            completion = errors
+        else:
+            completion, percentage = adcirc_completion_status(errors)
+            completion = f'{completion.value} - {percentage}%'
+
+    return completion
+
+
 def main():
-    completion_status = check_completion(**parse_check_completion_arguments())
-    print(json.dumps(completion_status, indent=4))
+    arguments = parse_check_completion_arguments()
+    telemetry = arguments.pop('telemetry')
+    watch = arguments.pop('watch')
+    interval = arguments.pop('interval')
+
+    if watch:
+        try:
+            for status_change in watch_completion(
+                directory=arguments['directory'], model=arguments['model'], interval=interval,
+            ):
+                print(json.dumps(status_change), flush=True)
+        except KeyboardInterrupt:
+            pass
+    elif telemetry:
+        arguments['verbose'] = True
+        print(json.dumps(ensemble_telemetry(check_completion(**arguments)), indent=4))
+    else:
+        completion_status = check_completion(**arguments)
+        print(json.dumps(completion_status, indent=4))
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 from argparse import ArgumentParser
+from datetime import timedelta
 from pathlib import Path
 
 from coupledmodeldriver.generate import generate_adcirc_configuration
@@ -29,6 +30,81 @@ def parse_generate_adcirc_arguments():
         action='store_true',
         help='generate configurations serially (not concurrently)',
     )
+    argument_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='only regenerate configurations that changed since the last generation',
+    )
+    argument_parser.add_argument(
+        '--remove-stale',
+        action='store_true',
+        help='remove run directories that are no longer part of the ensemble',
+    )
+    argument_parser.add_argument(
+        '--job-array',
+        action='store_true',
+        help='submit runs as Slurm job arrays (runs must use the same number of processors)',
+    )
+    argument_parser.add_argument(
+        '--job-array-throttle',
+        default=None,
+        help='maximum number of job array tasks to run at once',
+    )
+    argument_parser.add_argument(
+        '--share-partition',
+        action='store_true',
+        help='partition the mesh once for all runs, instead of once in every run directory',
+    )
+    argument_parser.add_argument(
+        '--spinup-cache',
+        default=None,
+        help='directory of completed tidal spinups shared between ensembles',
+    )
+    argument_parser.add_argument(
+        '--record-jobs',
+        action='store_true',
+        help='record the Slurm job IDs of each run in `jobs.txt`, so that `check_completion` can query their states',
+    )
+    argument_parser.add_argument(
+        '--segment-duration',
+        default=None,
+        help='maximum wall-clock duration of an ADCIRC job (i.e. `04:00:00`); longer runs are split into a chain of hotstart segments',
+    )
+    argument_parser.add_argument(
+        '--throughput',
+        default=None,
+        help='estimated modeled seconds per wall-clock second, used to size hotstart segments and hotstart intervals',
+    )
+    argument_parser.add_argument(
+        '--hotstart-bandwidth',
+        default=None,
+        help='measured write bandwidth of the platform in megabytes per second, used with `--node-failure-rate` to plan hotstart intervals',
+    )
+    argument_parser.add_argument(
+        '--node-failure-rate',
+        default=None,
+        help='expected failures of each compute node per hour, used with `--hotstart-bandwidth` to plan hotstart intervals',
+    )
+    argument_parser.add_argument(
+        '--besttrack-cache',
+        default=None,
+        help='directory of downloaded best tracks shared between ensembles',
+    )
+    argument_parser.add_argument(
+        '--besttrack-cache-ttl',
+        default=None,
+        help='age after which a cached best track is downloaded again (i.e. `24:00:00`); cached tracks are kept indefinitely by default',
+    )
+    argument_parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='read best tracks only from `--besttrack-cache`, as a pre-populated mirror, and never download them',
+    )
+    argument_parser.add_argument(
+        '--tidal-cache',
+        default=None,
+        help='directory of tidal constituents interpolated onto mesh boundaries, shared between ensembles',
+    )
     argument_parser.add_argument(
         '--verbose', action='store_true', help='show more verbose log messages'
     )
@@ -42,6 +118,21 @@ def parse_generate_adcirc_arguments():
         'overwrite': not arguments.skip_existing,
         'parallel': not arguments.serial,
         'verbose': arguments.verbose,
+        'incremental': arguments.incremental,
+        'remove_stale': arguments.remove_stale,
+        'job_array': arguments.job_array,
+        'job_array_throttle': convert_value(arguments.job_array_throttle, int),
+        'share_partition': arguments.share_partition,
+        'spinup_cache_directory': convert_value(arguments.spinup_cache, Path),
+        'job_registry': arguments.record_jobs,
+        'segment_duration': convert_value(arguments.segment_duration, timedelta),
+        'throughput': convert_value(arguments.throughput, float),
+        'hotstart_write_bandwidth': convert_value(arguments.hotstart_bandwidth, float),
+        'node_failure_rate': convert_value(arguments.node_failure_rate, float),
+        'besttrack_cache_directory': convert_value(arguments.besttrack_cache, Path),
+        'besttrack_cache_ttl': convert_value(arguments.besttrack_cache_ttl, timedelta),
+        'offline': arguments.offline,
+        'tidal_cache_directory': convert_value(arguments.tidal_cache, Path),
     }
 
 
@@ -0,0 +1,233 @@
+from argparse import ArgumentParser
+from os import PathLike
+from pathlib import Path
+import re
+import subprocess
+
+from coupledmodeldriver.client.check_completion import check_completion
+from coupledmodeldriver.configure.base import ModelDriverJSON
+from coupledmodeldriver.generate.adcirc.base import ADCIRCJSON
+from coupledmodeldriver.generate.adcirc.check import adcirc_completion_status, CompletionStatus
+from coupledmodeldriver.generate.adcirc.segment import SEGMENT_JOB_FILENAME
+from coupledmodeldriver.scheduler import (
+    JOB_REGISTRY_FILENAME,
+    JobScheduler,
+    JobState,
+)
+from coupledmodeldriver.script import (
+    EnsembleCleanupScript,
+    EnsembleRunScript,
+    SLURM_ARRAY_FILENAMES,
+)
+from coupledmodeldriver.utilities import convert_value, LOGGER
+
+# statuses of runs that are resubmitted by default
+RESUBMIT_STATUSES = [CompletionStatus.FAILED, CompletionStatus.NOT_STARTED]
+
+# scripts written to the ensemble directory for resubmission
+RESUBMIT_CLEANUP_FILENAME = 'cleanup_resubmit.sh'
+
+
+def parse_resubmit_adcirc_arguments():
+    argument_parser = ArgumentParser()
+    argument_parser.add_argument(
+        'directory', nargs='?', default=Path.cwd(), help='ensemble directory to resubmit',
+    )
+    argument_parser.add_argument(
+        '--status',
+        action='append',
+        default=None,
+        help=f'status of runs to resubmit, one of: {", ".join(status.value for status in CompletionStatus)} (default {", ".join(status.value for status in RESUBMIT_STATUSES)})',
+    )
+    argument_parser.add_argument(
+        '--job-array-throttle',
+        default=None,
+        help='maximum number of job array tasks to run at once (defaults to the throttle of the original run script)',
+    )
+    argument_parser.add_argument(
+        '--no-submit',
+        action='store_true',
+        help='write the resubmission script without running it',
+    )
+
+    arguments = argument_parser.parse_args()
+
+    statuses = arguments.status
+    if statuses is not None:
+        statuses = [CompletionStatus(status.lower()) for status in statuses]
+
+    return {
+        'directory': convert_value(arguments.directory, Path),
+        'statuses': statuses,
+        'job_array_throttle': convert_value(arguments.job_array_throttle, int),
+        'submit': not arguments.no_submit,
+    }
+
+
+def resubmit_adcirc_configuration(
+    directory: PathLike = None,
+    statuses: [CompletionStatus] = None,
+    job_array_throttle: int = None,
+    submit: bool = True,
+    scheduler: JobScheduler = None,
+) -> [str]:
+    """
+    write (and run) a script that resubmits only the runs of an ensemble that failed or did not start, reusing a
+    completed spinup
+
+    Runs whose recorded jobs (in `jobs.txt`) are still queued or running are not resubmitted, unless the spinup is
+    resubmitted and the jobs of the run are all pending (waiting on the previous spinup); those jobs are cancelled by
+    the resubmission script, and the run is resubmitted with the spinup. Job arrays, their throttle, hotstart
+    segments, and the job registry are kept from the original generation.
+
+    :param directory: ensemble directory
+    :param statuses: statuses of runs to resubmit
+    :param job_array_throttle: maximum number of array tasks to run at once, defaulting to that of the original run script
+    :param submit: run the resubmission script after writing it
+    :param scheduler: scheduler to query for the states of recorded jobs, defaulting to Slurm
+    :return: names of resubmitted run directories, relative to the ensemble directory
+    """
+
+    if directory is None:
+        directory = Path.cwd()
+    elif not isinstance(directory, Path):
+        directory = Path(directory)
+
+    if statuses is None:
+        statuses = RESUBMIT_STATUSES
+
+    platform = ModelDriverJSON.from_file(directory / ModelDriverJSON.default_filename)[
+        'platform'
+    ]
+
+    job_registry = (directory / JOB_REGISTRY_FILENAME).exists()
+    if not job_registry:
+        LOGGER.warning(
+            f'no job registry found at "{directory / JOB_REGISTRY_FILENAME}"; '
+            f'queued runs cannot be told apart from runs that were never submitted'
+        )
+
+    completion = check_completion(
+        directory, model=ADCIRCJSON, verbose=True, scheduler=scheduler
+    )
+
+    # queued jobs that wait on a spinup that will not complete, to be cancelled before resubmission
+    stale_job_ids = []
+
+    def should_resubmit(name: str, errors: {str: str}) -> bool:
+        status, percentage = adcirc_completion_status(errors)
+        active_jobs = {
+            job: entry
+            for job, entry in errors.get('jobs', {}).items()
+            if JobState(entry['state']) in [JobState.PENDING, JobState.RUNNING]
+        }
+        if len(active_jobs) > 0:
+            if run_spinup and all(
+                JobState(entry['state']) == JobState.PENDING for entry in active_jobs.values()
+            ):
+                # the dependencies of these jobs on the previous spinup can never be satisfied
+                LOGGER.debug(
+                    f'{name} has {" and ".join(active_jobs)} job(s) waiting on the failed spinup'
+                )
+                stale_job_ids.extend(entry['job_id'] for entry in active_jobs.values())
+                return True
+            LOGGER.debug(f'{name} has {" and ".join(active_jobs)} job(s) in the queue')
+            return False
+        return status in statuses
+
+    run_spinup = False
+    if 'spinup' in completion:
+        spinup_status, _ = adcirc_completion_status(completion['spinup'])
+        if spinup_status != CompletionStatus.COMPLETED:
+            if should_resubmit('spinup', completion['spinup']):
+                run_spinup = True
+            else:
+                raise RuntimeError(
+                    f'spinup is {spinup_status.value}; resubmit runs once the spinup has completed'
+                )
+
+    run_directories = [
+        name
+        for name, errors in completion.get('runs', {}).items()
+        if should_resubmit(name, errors)
+    ]
+
+    resubmitted = [f'runs/{name}' for name in run_directories]
+    if run_spinup:
+        resubmitted.insert(0, 'spinup')
+
+    if len(resubmitted) == 0:
+        LOGGER.info('no runs to resubmit')
+        return resubmitted
+
+    LOGGER.info(f'resubmitting {len(resubmitted)} run(s): {", ".join(resubmitted)}')
+
+    run_script_filename = directory / f'run_{platform.name.lower()}.sh'
+    job_array = (directory / SLURM_ARRAY_FILENAMES['adcirc']).exists()
+    if job_array and job_array_throttle is None and run_script_filename.exists():
+        with open(run_script_filename) as run_script_file:
+            throttle = re.search(r'--array=.*?%([0-9]+)\s', run_script_file.read())
+        if throttle is not None:
+            job_array_throttle = int(throttle.group(1))
+
+    # only partition the mesh again if the shared partition did not complete
+    shared_partition = (directory / 'partition').is_dir() and not (
+        directory / 'partition' / 'partmesh.txt'
+    ).exists()
+
+    segmented = any(
+        any((directory / 'runs' / name).glob(SEGMENT_JOB_FILENAME.format('*')))
+        for name in run_directories
+    )
+
+    cleanup_script = EnsembleCleanupScript(
+        shared_partition=shared_partition,
+        run_directories=run_directories,
+        clean_spinup=run_spinup,
+        clean_logs=True,
+        segmented=segmented,
+    )
+    cleanup_script.write(directory / RESUBMIT_CLEANUP_FILENAME, overwrite=True)
+
+    resubmit_script_filename = directory / f'resubmit_{platform.name.lower()}.sh'
+    commands = []
+    if len(stale_job_ids) > 0:
+        commands.extend(
+            [
+                'echo cancelling jobs waiting on the previous spinup',
+                f'scancel {" ".join(stale_job_ids)}',
+            ]
+        )
+    commands.extend(
+        [
+            'echo deleting previous ADCIRC output of resubmitted runs',
+            f'sh {RESUBMIT_CLEANUP_FILENAME}',
+        ]
+    )
+
+    resubmit_script = EnsembleRunScript(
+        platform=platform,
+        commands=commands,
+        run_spinup=run_spinup,
+        job_array=job_array,
+        job_array_throttle=job_array_throttle,
+        shared_partition=shared_partition,
+        job_registry=job_registry,
+        run_directories=run_directories,
+        segmented=segmented,
+    )
+    resubmit_script.write(resubmit_script_filename, overwrite=True)
+
+    if submit:
+        LOGGER.info(f'running "{resubmit_script_filename}"')
+        subprocess.run(['bash', resubmit_script_filename.name], cwd=directory, check=True)
+
+    return resubmitted
+
+
+def main():
+    resubmit_adcirc_configuration(**parse_resubmit_adcirc_arguments())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
+from collections import ChainMap
 from copy import copy
 from datetime import datetime, timedelta
+from functools import partial
 import json
 import os
 from os import PathLike
 from pathlib import Path, PurePosixPath
-from typing import Any, Union
+from typing import Any, Callable, Mapping, Union
 
 from adcircpy.server import SlurmConfig
 from nemspy import ModelingSystem
@@ -13,13 +15,29 @@ from nemspy.model.base import ModelEntry
 
 from coupledmodeldriver.platforms import Platform
 from coupledmodeldriver.script import SlurmEmailType
-from coupledmodeldriver.utilities import convert_to_json, convert_value, LOGGER
+from coupledmodeldriver.utilities import (
+    compile_converter,
+    convert_to_json,
+    convert_value,
+    LOGGER,
+)
 
 
 class ConfigurationJSON(ABC):
     name: str
     default_filename: PathLike
     field_types: {str: type}
+    field_converters: {str: (type, Callable[[Any], Any])} = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # resolve field types once per class, instead of on every conversion
+        cls.field_converters = {}
+        for base in reversed(cls.__mro__):
+            field_types = vars(base).get('field_types', {})
+            for key, field_type in field_types.items():
+                cls.field_converters[key.lower()] = (field_type, compile_converter(field_type))
 
     def __init__(self, fields: {str: type} = None, **configuration):
         self.field_types = {key.lower(): value for key, value in self.field_types.items()}
@@ -42,13 +60,26 @@ class ConfigurationJSON(ABC):
     def update(self, configuration: {str: Any}):
         for key, value in configuration.items():
             if key in self:
-                converted_value = convert_value(value, self.fields[key])
+                converted_value = self.field_converter(key, self.fields[key])(value)
                 if self[key] != converted_value:
                     value = converted_value
                 else:
                     return
             self[key] = value
 
+    @classmethod
+    def field_converter(cls, key: str, field_type: type) -> Callable[[Any], Any]:
+        """
+        :param key: name of field
+        :param field_type: type of field
+        :return: converter compiled for the given field, or a generic converter if the field has a different type
+        """
+
+        compiled = cls.field_converters.get(key)
+        if compiled is not None and compiled[0] is field_type:
+            return compiled[1]
+        return partial(convert_value, to_type=field_type)
+
     def update_from_file(self, filename: PathLike):
         with open(filename) as file:
             configuration = json.load(file)
@@ -84,7 +115,7 @@ class ConfigurationJSON(ABC):
             LOGGER.info(
                 f'adding new configuration entry "{key}: {field_type}" to {self.name}"'
             )
-        self.configuration[key] = convert_value(value, field_type)
+        self.configuration[key] = self.field_converter(key, field_type)(value)
         if key not in self.fields:
             self.fields[key] = field_type
 
@@ -109,8 +140,8 @@ class ConfigurationJSON(ABC):
         configuration = json.loads(string)
 
         configuration = {
-            key.lower(): convert_value(value, cls.field_types[key])
-            if key in cls.field_types
+            key.lower(): cls.field_converters[key.lower()][1](value)
+            if key.lower() in cls.field_converters
             else convert_to_json(value)
             for key, value in configuration.items()
         }
@@ -128,6 +159,22 @@ class ConfigurationJSON(ABC):
     def __copy__(self) -> 'ConfigurationJSON':
         return self.__class__(**self.configuration)
 
+    def overlay(self) -> 'ConfigurationJSON':
+        """
+        create a copy-on-write copy of this configuration, without re-running `__init__`
+
+        The overlay stores only entries that are set on it; all other entries are read from this configuration,
+        so changes made to this configuration afterwards are visible through the overlay.
+
+        :return: overlay configuration object
+        """
+
+        instance = self.__class__.__new__(self.__class__)
+        instance.__dict__.update(self.__dict__)
+        instance.fields = ChainMap({}, *overlay_maps(self.fields))
+        instance.configuration = ChainMap({}, *overlay_maps(self.configuration))
+        return instance
+
     @classmethod
     def from_file(cls, filename: PathLike) -> 'ConfigurationJSON':
         """
@@ -151,8 +198,8 @@ class ConfigurationJSON(ABC):
                 raise SyntaxError(f'{error} in file "{filename}"')
 
         configuration = {
-            key.lower(): convert_value(value, cls.field_types[key])
-            if key in cls.field_types
+            key.lower(): cls.field_converters[key.lower()][1](value)
+            if key.lower() in cls.field_converters
             else convert_to_json(value)
             for key, value in configuration.items()
         }
@@ -466,6 +513,14 @@ class NEMSJSON(ConfigurationJSON):
         )
 
 
+def overlay_maps(mapping: Mapping) -> [Mapping]:
+    """ read-only layers of an overlay on the given mapping, flattened so that lookups do not deepen with each overlay """
+
+    if isinstance(mapping, ChainMap):
+        return mapping.maps
+    return [mapping]
+
+
 def move_path(path: PathLike, move: Union[PathLike, int]) -> Path:
     if not isinstance(path, Path):
         path = Path(path)
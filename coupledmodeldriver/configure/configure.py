@@ -2,7 +2,7 @@ from abc import ABC
 from copy import copy
 from os import PathLike
 from pathlib import Path
-from typing import Any, Collection, Mapping, Union
+from typing import Any, Collection, Iterable, Iterator, Mapping, Tuple, Union
 
 from coupledmodeldriver.configure.base import ConfigurationJSON, ModelDriverJSON
 from coupledmodeldriver.configure.forcings.base import ADCIRCPY_FORCING_CLASSES, ForcingJSON
@@ -18,23 +18,46 @@ class RunConfiguration(ABC):
         self.configurations = configurations
 
     def perturb(self, relative_to: PathLike = None) -> {str: 'RunConfiguration'}:
-        perturbed_configurations = {}
+        return dict(self.iterate_perturbed(relative_to))
+
+    def iterate_perturbed(
+        self, relative_to: PathLike = None, runs: Iterable[str] = None
+    ) -> Iterator[Tuple[str, 'RunConfiguration']]:
+        """
+        lazily perturb this configuration, so that only one perturbed copy needs to exist at a time
+
+        :param relative_to: path to which to make paths relative
+        :param runs: names of runs to perturb (defaults to all runs)
+        :return: generator of run names and perturbed configurations
+        """
+
         if 'modeldriver' in self:
             perturbations = self['modeldriver']['perturbations']
+            if runs is None:
+                runs = perturbations
 
-            for run, run_perturbations in perturbations.items():
-                instance = copy(self) if relative_to is None else self.relative_to(relative_to)
-                if run_perturbations is not None and len(run_perturbations) > 0:
-                    for name, configuration_perturbations in run_perturbations.items():
-                        if name in instance:
-                            instance[name].update(configuration_perturbations)
-                        else:
-                            LOGGER.warning(f'configuration "{name}" not found to perturb')
-                perturbed_configurations[run] = instance
-        else:
-            perturbed_configurations = {}
+            for run in runs:
+                yield run, self.perturbed(perturbations[run], relative_to)
 
-        return perturbed_configurations
+    def perturbed(
+        self, perturbations: {str: {str: Any}}, relative_to: PathLike = None
+    ) -> 'RunConfiguration':
+        """
+        :param perturbations: dictionary of configuration names to parameter values
+        :param relative_to: path to which to make paths relative
+        :return: overlay of this configuration with the given perturbations applied
+        """
+
+        instance = self.overlay()
+        if relative_to is not None:
+            instance.relative_to(relative_to, inplace=True)
+        if perturbations is not None and len(perturbations) > 0:
+            for name, configuration_perturbations in perturbations.items():
+                if name in instance:
+                    instance[name].update(configuration_perturbations)
+                else:
+                    LOGGER.warning(f'configuration "{name}" not found to perturb')
+        return instance
 
     @property
     def configurations(self) -> [ConfigurationJSON]:
@@ -86,6 +109,15 @@ class RunConfiguration(ABC):
     def __copy__(self) -> 'RunConfiguration':
         return self.__class__([copy(configuration) for configuration in self.configurations])
 
+    def overlay(self) -> 'RunConfiguration':
+        """
+        :return: copy of this run configuration, made of copy-on-write overlays of each configuration
+        """
+
+        return self.from_configurations(
+            [configuration.overlay() for configuration in self.configurations]
+        )
+
     def add(self, configuration: ConfigurationJSON) -> str:
         if not isinstance(configuration, ConfigurationJSON):
             configuration = from_user_input(configuration)
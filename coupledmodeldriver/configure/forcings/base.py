@@ -17,10 +17,17 @@ from nemspy.model import AtmosphericMeshEntry, WaveWatch3MeshEntry
 from pandas import DataFrame
 
 from coupledmodeldriver.configure.base import AttributeJSON, ConfigurationJSON, NEMSCapJSON
+from coupledmodeldriver.configure.forcings.cache import (
+    BestTrackCache,
+    CachedTidalDataset,
+    TidalBoundaryCache,
+)
+from coupledmodeldriver.configure.forcings.tides import CachedTides, tidal_arguments
 from coupledmodeldriver.utilities import LOGGER
 
 ADCIRCPY_FORCINGS = {
     'Tides': 'TidalForcingJSON',
+    'CachedTides': 'TidalForcingJSON',
     'AtmosphericMeshForcing': 'ATMESHForcingJSON',
     'BestTrackForcing': 'BestTrackForcingJSON',
     'OWIForcing': 'OWIForcingJSON',
@@ -31,14 +38,61 @@ ADCIRCPY_FORCING_CLASSES = (Forcing, Tides)
 
 
 class ForcingJSON(ConfigurationJSON, ABC):
+    # forcing object built from the current configuration, reused until an entry of the configuration changes
+    __adcircpy_forcing: Forcing = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # the forcing object of each subclass is built once, instead of on every access
+        adcircpy_forcing = vars(cls).get('adcircpy_forcing')
+        if isinstance(adcircpy_forcing, property) and not getattr(
+            adcircpy_forcing, '__isabstractmethod__', False
+        ):
+            cls.build_adcircpy_forcing = adcircpy_forcing.fget
+            cls.adcircpy_forcing = property(
+                ForcingJSON.memoized_adcircpy_forcing, doc=adcircpy_forcing.__doc__
+            )
+
     @property
     @abstractmethod
     def adcircpy_forcing(self) -> Forcing:
         raise NotImplementedError
 
+    def build_adcircpy_forcing(self) -> Forcing:
+        """
+        :return: new forcing object, built from the current configuration
+        """
+
+        raise NotImplementedError
+
+    def memoized_adcircpy_forcing(self) -> Forcing:
+        """
+        :return: forcing object, built only if an entry of the configuration changed since it was last built
+        """
+
+        forcing = self.__adcircpy_forcing
+        if forcing is None:
+            # building the forcing may fill in entries of its configuration, so it is stored afterwards
+            forcing = self.build_adcircpy_forcing()
+            self.__adcircpy_forcing = forcing
+        return forcing
+
     def to_adcircpy(self) -> Forcing:
         return self.adcircpy_forcing
 
+    def __setitem__(self, key: str, value: Any):
+        previous_value = self.configuration.get(key)
+        super().__setitem__(key, value)
+        if self.configuration[key] != previous_value:
+            self.__adcircpy_forcing = None
+
+    def __getstate__(self) -> {str: Any}:
+        state = self.__dict__.copy()
+        # forcing objects are rebuilt in the receiving process
+        state.pop('_ForcingJSON__adcircpy_forcing', None)
+        return state
+
     @classmethod
     @abstractmethod
     def from_adcircpy(cls, forcing: Forcing) -> 'ForcingJSON':
@@ -91,6 +145,9 @@ class TidalForcingJSON(FileForcingJSON):
     default_filename = f'configure_tidal.json'
     field_types = {'tidal_source': TidalSource, 'constituents': [str]}
 
+    # values of constituents at boundary nodes, shared between the `fort.15` of every run
+    cache: TidalBoundaryCache = TidalBoundaryCache()
+
     def __init__(
         self,
         resource: PathLike = None,
@@ -113,7 +170,7 @@ class TidalForcingJSON(FileForcingJSON):
 
     @property
     def adcircpy_forcing(self) -> Forcing:
-        tides = Tides(tidal_source=self['tidal_source'], resource=self['resource'])
+        tides = CachedTides(tidal_source=self['tidal_source'], resource=self['resource'])
 
         constituents = [constituent.capitalize() for constituent in self['constituents']]
 
@@ -137,8 +194,35 @@ class TidalForcingJSON(FileForcingJSON):
                     tides.use_constituent(constituent)
 
         self['constituents'] = list(tides.active_constituents)
+
+        if self.cache is not None:
+            tides.tidal_dataset = CachedTidalDataset(tides.tidal_dataset, self.cache)
+
         return tides
 
+    def tidal_arguments(
+        self, start_date: datetime, end_date: datetime, spinup_time: timedelta = None
+    ) -> DataFrame:
+        """
+        :param start_date: start date of tidal forcing
+        :param end_date: end date of tidal forcing
+        :param spinup_time: tidal spinup duration
+        :return: nodal factor and equilibrium argument of each active constituent, computed once for each set of times
+        """
+
+        if spinup_time is None:
+            spinup_time = timedelta(0)
+
+        constituents = tuple(self.adcircpy_forcing.active_constituents)
+        nodal_factors, equilibrium_arguments = tidal_arguments(
+            constituents, start_date, end_date, spinup_time
+        )
+
+        return DataFrame(
+            {'nodal_factor': nodal_factors, 'equilibrium_argument': equilibrium_arguments},
+            index=constituents,
+        )
+
     @classmethod
     def from_adcircpy(cls, forcing: Tides) -> 'TidalForcingJSON':
         # TODO: workaround for this issue: https://github.com/JaimeCalzadaNOAA/adcircpy/pull/70#discussion_r607245713
@@ -182,6 +266,8 @@ class BestTrackForcingJSON(WindForcingJSON, AttributeJSON):
     default_filename = f'configure_besttrack.json'
     default_nws = 20
     default_attributes = BESTTRACK_ATTRIBUTES
+    # cache of downloaded tracks, shared by all best track configurations; tracks are downloaded every time if `None`
+    cache: BestTrackCache = None
     field_types = {
         'storm_id': str,
         'interval': timedelta,
@@ -248,6 +334,14 @@ class BestTrackForcingJSON(WindForcingJSON, AttributeJSON):
                 start_date=self['start_date'],
                 end_date=self['end_date'],
             )
+        elif self['storm_id'] is not None and self.cache is not None:
+            forcing = self.cache.forcing(
+                self['storm_id'],
+                nws=self['nws'],
+                interval_seconds=self['interval'],
+                start_date=self['start_date'],
+                end_date=self['end_date'],
+            )
         elif self['storm_id'] is not None:
             forcing = BestTrackForcing(
                 storm=self['storm_id'],
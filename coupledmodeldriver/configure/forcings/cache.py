@@ -0,0 +1,361 @@
+from datetime import datetime, timedelta
+import gzip
+import hashlib
+import os
+from os import PathLike
+from pathlib import Path
+import tempfile
+
+from adcircpy.forcing.tides.dataset import TidalDataset
+from adcircpy.forcing.winds import BestTrackForcing
+from adcircpy.forcing.winds.best_track import Mode
+import numpy
+from pandas import DataFrame, read_csv
+
+from coupledmodeldriver.utilities import LOGGER
+
+
+class CachedBestTrackForcing(BestTrackForcing):
+    """
+    `BestTrackForcing` of a track read from a `BestTrackCache`
+
+    `BestTrackForcing` looks up the ATCF ID of a storm from its track, and downloads the track again whenever its
+    storm ID changes; the storm ID of a cached track is fixed instead, so that the track is never downloaded.
+    """
+
+    def __init__(self, storm_id: str, dataframe: DataFrame, **kwargs):
+        """
+        :param storm_id: ATCF storm ID (i.e. `al062018`)
+        :param dataframe: parsed track, as given by `BestTrackForcing.dataframe`
+        """
+
+        self.__storm_id = storm_id
+        super().__init__(storm=dataframe, **kwargs)
+
+    @property
+    def storm_id(self) -> str:
+        return self.__storm_id
+
+    @storm_id.setter
+    def storm_id(self, storm_id: str):
+        self.__storm_id = storm_id
+
+    def __copy__(self) -> 'CachedBestTrackForcing':
+        return self.__class__(
+            storm_id=self.storm_id,
+            dataframe=self.dataframe.copy(),
+            nws=self.NWS,
+            interval_seconds=self.interval,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            mode=self.mode,
+        )
+
+
+class BestTrackCache:
+    """
+    directory of parsed best tracks, keyed by storm ID and data vintage (archived or real-time ATCF data)
+
+    Tracks are stored as compressed CSV, which (unlike pickles) is safe to read from a shared mirror and does not
+    depend on the version of `pandas` that wrote it. The first row of each file holds the types of the fields.
+
+    Tracks are downloaded once and served from the directory until they are older than the time-to-live. In
+    offline mode the directory is a pre-populated mirror; tracks are served regardless of age and are never
+    downloaded.
+    """
+
+    def __init__(self, directory: PathLike, ttl: timedelta = None, offline: bool = False):
+        """
+        :param directory: path to cache directory
+        :param ttl: age after which a cached track is downloaded again, or `None` to keep tracks indefinitely
+        :param offline: only read tracks from the cache directory, never from the network
+        """
+
+        if not isinstance(directory, Path):
+            directory = Path(directory)
+
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+
+    def filename(self, storm_id: str, mode: Mode = None) -> Path:
+        """
+        :param storm_id: storm ID, as given to `BestTrackForcing`
+        :param mode: ATCF data vintage, defaulting to archived data
+        :return: path to the cached track of the given storm
+        """
+
+        if mode is None:
+            mode = Mode.historical
+
+        return self.directory / f'{storm_id.lower()}_{mode.name}.csv.gz'
+
+    def is_fresh(self, storm_id: str, mode: Mode = None) -> bool:
+        """
+        :param storm_id: storm ID
+        :param mode: ATCF data vintage
+        :return: whether the given track is cached and younger than the time-to-live
+        """
+
+        filename = self.filename(storm_id, mode)
+        if not filename.exists():
+            return False
+        if self.ttl is None:
+            return True
+        return datetime.now() - datetime.fromtimestamp(filename.stat().st_mtime) < self.ttl
+
+    def track(self, storm_id: str, mode: Mode = None) -> DataFrame:
+        """
+        :param storm_id: storm ID
+        :param mode: ATCF data vintage
+        :return: parsed track of the given storm, downloaded only if not cached or expired
+        """
+
+        filename = self.filename(storm_id, mode)
+
+        if self.offline or self.is_fresh(storm_id, mode):
+            if filename.exists():
+                return read_track(filename)
+            raise FileNotFoundError(
+                f'track of storm "{storm_id}" is not mirrored at "{filename}" (offline)'
+            )
+
+        LOGGER.info(f'downloading track of storm "{storm_id}"')
+        try:
+            dataframe = BestTrackForcing(storm=storm_id, mode=mode).dataframe
+        except Exception as error:
+            if filename.exists():
+                LOGGER.warning(
+                    f'could not download track of storm "{storm_id}" ({error}); using expired cached track'
+                )
+                return read_track(filename)
+            raise
+
+        self.store(storm_id, dataframe, mode)
+        return dataframe
+
+    def store(self, storm_id: str, dataframe: DataFrame, mode: Mode = None):
+        """
+        add the given track to the cache, such as when populating a mirror for offline use
+
+        :param storm_id: storm ID
+        :param dataframe: parsed track
+        :param mode: ATCF data vintage
+        """
+
+        filename = self.filename(storm_id, mode)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        # tracks are renamed into place once written, so that concurrent readers never see a partial file
+        file_descriptor, temporary_filename = tempfile.mkstemp(
+            dir=filename.parent, prefix=f'.{filename.name}.'
+        )
+        os.close(file_descriptor)
+        try:
+            # the types of the fields depend on the version of `adcircpy` that parsed the track (i.e. `direction` and
+            # `speed` are text in older versions), so they are written out from the track itself, as its first row
+            with gzip.open(temporary_filename, 'wt', newline='') as temporary_file:
+                DataFrame(
+                    [dataframe.dtypes.astype(str).values], columns=dataframe.columns
+                ).to_csv(temporary_file, index=False)
+                dataframe.to_csv(temporary_file, index=False, header=False)
+            os.replace(temporary_filename, filename)
+        except:
+            os.remove(temporary_filename)
+            raise
+
+    def forcing(self, storm_id: str, mode: Mode = None, **kwargs) -> CachedBestTrackForcing:
+        """
+        :param storm_id: storm ID
+        :param mode: ATCF data vintage
+        :param kwargs: keyword arguments to `BestTrackForcing`
+        :return: best track forcing of the given storm, from its cached track
+        """
+
+        dataframe = self.track(storm_id, mode)
+
+        # the ATCF ID of a storm given by name is read from the track, as `BestTrackForcingJSON` would
+        digits = sum(1 for character in storm_id if character.isdigit())
+        if digits == 4:
+            storm_id = f'{dataframe["basin"].iloc[-1]}{dataframe["storm_number"].iloc[-1]}{dataframe["datetime"].iloc[-1].year}'
+
+        return CachedBestTrackForcing(
+            storm_id=storm_id, dataframe=dataframe, mode=mode, **kwargs
+        )
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.directory)}, {repr(self.ttl)}, {self.offline})'
+
+
+def read_track(filename: PathLike) -> DataFrame:
+    """
+    :param filename: path to track written by `BestTrackCache.store`
+    :return: parsed track, with the same types as given by `BestTrackForcing.dataframe`
+    """
+
+    dtypes = read_csv(filename, compression='gzip', nrows=1, dtype=str).iloc[0]
+
+    text_columns = [column for column, dtype in dtypes.items() if dtype == 'object']
+    date_columns = [
+        column for column, dtype in dtypes.items() if dtype.startswith('datetime64')
+    ]
+    numeric_types = {
+        column: dtype
+        for column, dtype in dtypes.items()
+        if column not in text_columns and column not in date_columns
+    }
+
+    dataframe = read_csv(
+        filename,
+        compression='gzip',
+        skiprows=[1],
+        dtype={column: str for column in text_columns},
+        parse_dates=date_columns,
+        keep_default_na=False,
+        na_values={column: [''] for column in numeric_types},
+        float_precision='round_trip',
+    )
+    return dataframe.astype(numeric_types)
+
+
+class TidalBoundaryCache:
+    """
+    amplitudes and phases of tidal constituents interpolated onto open-boundary nodes, keyed by the coordinates of
+    the boundary nodes, the tidal database, and the constituent
+
+    Values are kept in memory and, if given a directory, written to it as binary arrays, so that the tidal database
+    is read once for each mesh boundary instead of once for every `fort.15`.
+    """
+
+    def __init__(self, directory: PathLike = None):
+        """
+        :param directory: path to cache directory, or `None` to keep values only in memory
+        """
+
+        if directory is not None and not isinstance(directory, Path):
+            directory = Path(directory)
+
+        self.directory = directory
+        self.__values = {}
+
+    @staticmethod
+    def key(dataset: TidalDataset, constituent: str, vertices: numpy.ndarray) -> str:
+        """
+        :param dataset: tidal database
+        :param constituent: tidal constituent
+        :param vertices: XY locations of boundary nodes (Mx2)
+        :return: digest of the given boundary, database, and constituent
+        """
+
+        digest = hashlib.sha1()
+        digest.update(
+            f'{dataset.__class__.__name__} {dataset.path} {constituent.lower()}'.encode()
+        )
+
+        # a database replaced in place (i.e. a newer TPXO release) invalidates its cached values
+        if dataset.path is not None and os.path.exists(dataset.path):
+            status = os.stat(dataset.path)
+            digest.update(f' {status.st_size} {status.st_mtime_ns}'.encode())
+
+        digest.update(numpy.ascontiguousarray(vertices, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def filename(self, key: str) -> Path:
+        """
+        :param key: digest given by `key`
+        :return: path to the cached values
+        """
+
+        return self.directory / f'{key}.npy'
+
+    def values(
+        self, dataset: TidalDataset, constituent: str, vertices: numpy.ndarray
+    ) -> (numpy.ndarray, numpy.ndarray):
+        """
+        :param dataset: tidal database
+        :param constituent: tidal constituent
+        :param vertices: XY locations of boundary nodes (Mx2)
+        :return: amplitude and phase at the given locations, read from the database only if not cached
+        """
+
+        key = self.key(dataset, constituent, vertices)
+
+        if key not in self.__values:
+            if self.directory is not None and self.filename(key).exists():
+                values = numpy.load(self.filename(key))
+            else:
+                LOGGER.debug(
+                    f'interpolating {constituent} from {dataset.__class__.__name__} onto {len(vertices)} boundary node(s)'
+                )
+                values = numpy.stack(dataset(constituent, vertices))
+                if self.directory is not None:
+                    self.store(key, values)
+            self.__values[key] = values
+
+        amplitude, phase = self.__values[key]
+        return amplitude, phase
+
+    def store(self, key: str, values: numpy.ndarray):
+        """
+        :param key: digest given by `key`
+        :param values: amplitude and phase (2xM)
+        """
+
+        filename = self.filename(key)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        # values are renamed into place once written, so that concurrent readers never see a partial file
+        file_descriptor, temporary_filename = tempfile.mkstemp(
+            dir=filename.parent, prefix=f'.{filename.name}.'
+        )
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temporary_file:
+                numpy.save(temporary_file, values)
+            os.replace(temporary_filename, filename)
+        except:
+            os.remove(temporary_filename)
+            raise
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.directory)})'
+
+
+class CachedTidalDataset(TidalDataset):
+    """
+    tidal database whose values at boundary nodes are read through a `TidalBoundaryCache`
+
+    The `fort.15` writer of `adcircpy` samples the database once for every constituent of every open boundary.
+    """
+
+    def __init__(self, dataset: TidalDataset, cache: TidalBoundaryCache):
+        """
+        :param dataset: tidal database
+        :param cache: cache of values at boundary nodes
+        """
+
+        super().__init__(dataset.path)
+        self.dataset = dataset
+        self.cache = cache
+
+    def __call__(
+        self, constituent: str, vertices: numpy.ndarray
+    ) -> (numpy.ndarray, numpy.ndarray):
+        return self.cache.values(self.dataset, constituent, numpy.asarray(vertices))
+
+    def get_amplitude(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+        return self(constituent, vertices)[0]
+
+    def get_phase(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+        return self(constituent, vertices)[1]
+
+    @property
+    def x(self) -> numpy.ndarray:
+        return self.dataset.x
+
+    @property
+    def y(self) -> numpy.ndarray:
+        return self.dataset.y
+
+    @property
+    def constituents(self) -> [str]:
+        return self.dataset.constituents
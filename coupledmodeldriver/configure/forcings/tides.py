@@ -0,0 +1,313 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from adcircpy import Tides
+from adcircpy.forcing.tides import TPXO
+from adcircpy.forcing.tides.dataset import TidalDataset
+import numpy
+from scipy.interpolate import griddata
+
+# grid cells around the sampled locations read from the tidal database, as buffered by `adcircpy`
+TIDAL_WINDOW_MARGIN = 2
+
+# astronomical arguments (in degrees) of which the equilibrium argument of each constituent is a linear combination,
+# as named by `adcircpy.Tides`
+EQUILIBRIUM_ARGUMENT_TERMS = [
+    'DT',
+    'DS',
+    'DH',
+    'DP',
+    'DXI',
+    'DNU',
+    'DNUP',
+    'DNUP2',
+    'DP1',
+    'DR',
+    'DQ',
+]
+
+# nodal factor terms of which the nodal factor of each constituent is a product, as named by `adcircpy.Tides`
+NODAL_FACTOR_TERMS = [
+    'EQ73',
+    'EQ74',
+    'EQ75',
+    'EQ76',
+    'EQ77',
+    'EQ78',
+    'EQ149',
+    'EQ197',
+    'EQ213',
+    'EQ227',
+    'EQ235',
+]
+
+# coefficients of each astronomical argument (in the order of `EQUILIBRIUM_ARGUMENT_TERMS`) in the equilibrium
+# argument of each constituent, followed by a constant phase (in degrees); transcribed from
+# `adcircpy.Tides.get_greenwich_factor`
+EQUILIBRIUM_ARGUMENT_COEFFICIENTS = {
+    'M2': [2, -2, 2, 0, 2, -2, 0, 0, 0, 0, 0, 0],
+    'S2': [2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'N2': [2, -3, 2, 1, 2, -2, 0, 0, 0, 0, 0, 0],
+    'K1': [1, 0, 1, 0, 0, 0, -1, 0, 0, 0, 0, -90],
+    'M4': [4, -4, 4, 0, 4, -4, 0, 0, 0, 0, 0, 0],
+    'O1': [1, -2, 1, 0, 2, -1, 0, 0, 0, 0, 0, 90],
+    'M6': [6, -6, 6, 0, 6, -6, 0, 0, 0, 0, 0, 0],
+    'MK3': [3, -2, 3, 0, 2, -2, -1, 0, 0, 0, 0, -90],
+    'S4': [4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'MN4': [4, -5, 4, 1, 4, -4, 0, 0, 0, 0, 0, 0],
+    'Nu2': [2, -3, 4, -1, 2, -2, 0, 0, 0, 0, 0, 0],
+    'S6': [6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'MU2': [2, -4, 4, 0, 2, -2, 0, 0, 0, 0, 0, 0],
+    '2N2': [2, -4, 2, 2, 2, -2, 0, 0, 0, 0, 0, 0],
+    'OO1': [1, 2, 1, 0, -2, -1, 0, 0, 0, 0, 0, -90],
+    'lambda2': [2, -1, 0, 1, 2, -2, 0, 0, 0, 0, 0, 180],
+    'S1': [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'M1': [1, -1, 1, 0, 1, -1, 0, 0, 0, 0, 1, -90],
+    'J1': [1, 1, 1, -1, 0, -1, 0, 0, 0, 0, 0, -90],
+    'Mm': [0, 1, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Ssa': [0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Sa': [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Msf': [0, 2, -2, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Mf': [0, 2, 0, 0, -2, 0, 0, 0, 0, 0, 0, 0],
+    'RHO': [1, -3, 3, -1, 2, -1, 0, 0, 0, 0, 0, 90],
+    'Q1': [1, -3, 1, 1, 2, -1, 0, 0, 0, 0, 0, 90],
+    'T2': [2, 0, -1, 0, 0, 0, 0, 0, 1, 0, 0, 0],
+    'R2': [2, 0, 1, 0, 0, 0, 0, 0, -1, 0, 0, 180],
+    '2Q1': [1, -4, 1, 2, 2, -1, 0, 0, 0, 0, 0, 90],
+    'P1': [1, 0, -1, 0, 0, 0, 0, 0, 0, 0, 0, 90],
+    '2SM2': [2, 2, -2, 0, -2, 2, 0, 0, 0, 0, 0, 0],
+    'M3': [3, -3, 3, 0, 3, -3, 0, 0, 0, 0, 0, 0],
+    'L2': [2, -1, 2, -1, 2, -2, 0, 0, 0, -1, 0, 180],
+    '2MK3': [3, -4, 3, 0, 4, -4, 1, 0, 0, 0, 0, 90],
+    'K2': [2, 0, 2, 0, 0, 0, 0, -2, 0, 0, 0, 0],
+    'M8': [8, -8, 8, 0, 8, -8, 0, 0, 0, 0, 0, 0],
+    'MS4': [4, -2, 2, 0, 2, -2, 0, 0, 0, 0, 0, 0],
+}
+
+# exponent of each nodal factor term (in the order of `NODAL_FACTOR_TERMS`) in the nodal factor of each constituent;
+# transcribed from `adcircpy.Tides.get_nodal_factor`
+NODAL_FACTOR_EXPONENTS = {
+    'M2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'S2': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'N2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'K1': [0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
+    'M4': [0, 0, 0, 0, 0, 2, 0, 0, 0, 0, 0],
+    'O1': [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'M6': [0, 0, 0, 0, 0, 3, 0, 0, 0, 0, 0],
+    'MK3': [0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0],
+    'S4': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'MN4': [0, 0, 0, 0, 0, 2, 0, 0, 0, 0, 0],
+    'Nu2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'S6': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'MU2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    '2N2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'OO1': [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
+    'lambda2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'S1': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'M1': [0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
+    'J1': [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0],
+    'Mm': [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Ssa': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Sa': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Msf': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'Mf': [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'RHO': [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'Q1': [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'T2': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    'R2': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    '2Q1': [0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0],
+    'P1': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    '2SM2': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+    'M3': [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
+    'L2': [0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0],
+    '2MK3': [0, 0, 0, 0, 0, 2, 0, 0, 0, 1, 0],
+    'K2': [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    'M8': [0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0],
+    'MS4': [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+}
+
+
+@lru_cache(maxsize=None)
+def tidal_arguments(
+    constituents: (str,), start_date: datetime, end_date: datetime, spinup_time: timedelta,
+) -> (numpy.ndarray, numpy.ndarray):
+    """
+    nodal factors and equilibrium arguments of the given constituents, computed together from one evaluation of the
+    astronomical arguments and shared by every `Tides` object with the same times
+
+    :param constituents: tidal constituents
+    :param start_date: start date of `Tides`
+    :param end_date: end date of `Tides`
+    :param spinup_time: tidal spinup duration of `Tides`
+    :return: nodal factor and equilibrium argument (in degrees) of each constituent, as read-only arrays
+    """
+
+    unrecognized = [
+        constituent
+        for constituent in constituents
+        if constituent not in EQUILIBRIUM_ARGUMENT_COEFFICIENTS
+    ]
+    if len(unrecognized) > 0:
+        raise TypeError(f'Unrecognized constituent {unrecognized[0]}')
+
+    # the astronomical arguments are evaluated by `adcircpy` itself, without opening a tidal database
+    tides = Tides.__new__(Tides)
+    tides.end_date = end_date
+    tides.start_date = start_date
+    tides.spinup_time = spinup_time
+
+    arguments = numpy.array(
+        [getattr(tides, term) for term in EQUILIBRIUM_ARGUMENT_TERMS] + [1.0]
+    )
+    terms = [getattr(tides, term) for term in NODAL_FACTOR_TERMS]
+
+    equilibrium_arguments = (
+        numpy.array(
+            [EQUILIBRIUM_ARGUMENT_COEFFICIENTS[constituent] for constituent in constituents],
+            dtype=float,
+        )
+        @ arguments
+    ) % 360.0
+
+    # take the products with scalar powers, as `adcircpy` does; vectorized powers are not bitwise identical
+    nodal_factors = numpy.ones(len(constituents))
+    for index, constituent in enumerate(constituents):
+        for term, exponent in zip(terms, NODAL_FACTOR_EXPONENTS[constituent]):
+            if exponent == 1:
+                nodal_factors[index] *= term
+            elif exponent != 0:
+                nodal_factors[index] *= term ** exponent
+
+    nodal_factors.flags.writeable = False
+    equilibrium_arguments.flags.writeable = False
+    return nodal_factors, equilibrium_arguments
+
+
+class WindowedTPXO(TidalDataset):
+    """
+    TPXO database that reads, for each requested constituent, only the window of the global grid around the sampled
+    locations (i.e. the open boundary of a regional mesh)
+
+    `adcircpy.TPXO` reads the amplitudes or phases of every constituent over the entire grid for each sample.
+    """
+
+    def __init__(self, tpxo: TPXO):
+        """
+        :param tpxo: opened TPXO database
+        """
+
+        super().__init__(tpxo.path)
+        self.tpxo = tpxo
+        self.__x = None
+        self.__y = None
+
+    def get_amplitude(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+        return self.__interpolate('ha', constituent, vertices)
+
+    def get_phase(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+        return self.__interpolate('hp', constituent, vertices)
+
+    @property
+    def x(self) -> numpy.ndarray:
+        if self.__x is None:
+            self.__x = self.tpxo.x
+        return self.__x
+
+    @property
+    def y(self) -> numpy.ndarray:
+        if self.__y is None:
+            self.__y = self.tpxo.y
+        return self.__y
+
+    @property
+    def constituents(self) -> [str]:
+        return self.tpxo.constituents
+
+    def window(self, vertices: numpy.ndarray) -> (slice, slice):
+        """
+        :param vertices: XY locations (Mx2), with longitudes in [0, 360)
+        :return: slices of the grid covering the bounding box of the given locations, buffered by `TIDAL_WINDOW_MARGIN` grid cells
+        """
+
+        windows = []
+        for axis, values in ((self.x, vertices[:, 0]), (self.y, vertices[:, 1])):
+            margin = TIDAL_WINDOW_MARGIN * numpy.mean(numpy.diff(axis))
+            indices = numpy.flatnonzero(
+                (axis >= numpy.min(values) - margin) & (axis <= numpy.max(values) + margin)
+            )
+            windows.append(slice(indices[0], indices[-1] + 1))
+        return tuple(windows)
+
+    def __interpolate(
+        self, variable: str, constituent: str, vertices: numpy.ndarray
+    ) -> numpy.ndarray:
+        if not isinstance(vertices, numpy.ndarray):
+            vertices = numpy.asarray(vertices)
+        self._assert_vertices(vertices)
+
+        vertices = numpy.stack(
+            [
+                numpy.where(vertices[:, 0] < 0, vertices[:, 0] + 360.0, vertices[:, 0]),
+                vertices[:, 1],
+            ],
+            axis=1,
+        )
+        constituent_index = [entry.lower() for entry in self.constituents].index(
+            constituent.lower()
+        )
+        x_window, y_window = self.window(vertices)
+
+        # only the window of the requested constituent is read from disk, and is released once interpolated
+        values = self.tpxo.dataset[variable][constituent_index, x_window, y_window].flatten()
+        x, y = numpy.meshgrid(self.x[x_window], self.y[y_window], indexing='ij')
+
+        # land cells are stored as zeros (or masked) and would pull coastal values toward zero
+        ocean = ~numpy.ma.getmaskarray(values) & (numpy.ma.getdata(values) != 0)
+        values = numpy.ma.getdata(values)[ocean]
+        points = (x.flatten()[ocean], y.flatten()[ocean])
+
+        interpolated = griddata(
+            points,
+            values,
+            (vertices[:, 0], vertices[:, 1]),
+            method='linear',
+            fill_value=numpy.nan,
+        )
+        missing = numpy.isnan(interpolated)
+        if numpy.any(missing):
+            interpolated[missing] = griddata(
+                points, values, (vertices[missing, 0], vertices[missing, 1]), method='nearest',
+            )
+        return interpolated
+
+
+class CachedTides(Tides):
+    """
+    `Tides` whose nodal factors and equilibrium arguments are read from a table shared between all `Tides` objects
+    with the same active constituents and times, instead of being evaluated for every constituent
+
+    A TPXO database is read through `WindowedTPXO`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if isinstance(self.tidal_dataset, TPXO):
+            self.tidal_dataset = WindowedTPXO(self.tidal_dataset)
+
+    def get_nodal_factor(self, constituent: str) -> float:
+        return self.__tidal_arguments(constituent)[0]
+
+    def get_greenwich_factor(self, constituent: str) -> float:
+        return self.__tidal_arguments(constituent)[1]
+
+    def __tidal_arguments(self, constituent: str) -> (float, float):
+        constituents = tuple(self.active_constituents)
+        if constituent not in constituents:
+            constituents = (constituent,)
+
+        nodal_factors, equilibrium_arguments = tidal_arguments(
+            constituents, self.start_date, self.end_date, self.spinup_time
+        )
+
+        index = constituents.index(constituent)
+        return nodal_factors[index], equilibrium_arguments[index]
@@ -15,6 +15,7 @@ from coupledmodeldriver.configure import Model, ModelJSON, SlurmJSON
 from coupledmodeldriver.configure.base import AttributeJSON, NEMSCapJSON
 from coupledmodeldriver.configure.configure import from_user_input
 from coupledmodeldriver.configure.forcings.base import ForcingJSON
+from coupledmodeldriver.generate.adcirc.mesh import SharedMesh
 from coupledmodeldriver.utilities import LOGGER
 
 ADCIRCPY_ATTRIBUTES = [
@@ -218,6 +219,8 @@ class ADCIRCJSON(ModelJSON, NEMSCapJSON, AttributeJSON):
         """
 
         self.__base_mesh = None
+        self.__nodal_attributes = {}
+        self.__forcing_cache = {}
 
         if tidal_spinup_timestep is None:
             tidal_spinup_timestep = modeled_timestep
@@ -308,33 +311,90 @@ class ADCIRCJSON(ModelJSON, NEMSCapJSON, AttributeJSON):
         return [forcing.adcircpy_forcing for forcing in self.forcings]
 
     @property
-    def adcircpy_mesh(self) -> AdcircMesh:
-        if self.__base_mesh is None:
-            self.__base_mesh = self['fort_14_path']
-
-        if not isinstance(self.__base_mesh, AdcircMesh):
-            LOGGER.info(f'opening mesh "{self.__base_mesh}"')
-            self.__base_mesh = AdcircMesh.open(self.__base_mesh, crs=4326)
+    def cached_adcircpy_forcings(self) -> [Forcing]:
+        """
+        forcing objects, reused between meshes (and copies of this configuration) as long as their configuration is unchanged
+        """
 
-        mesh = self.__base_mesh.copy()
+        modeled_times = (
+            self['modeled_start_time'],
+            self['modeled_end_time'],
+            self['tidal_spinup_duration'],
+        )
 
-        if self['fort_13_path'] is not None:
-            LOGGER.info(
-                f'reading attributes from "{os.path.relpath(self["fort_13_path"].resolve(), Path.cwd())}"'
-            )
-            if self['fort_13_path'].exists():
-                mesh.import_nodal_attributes(self['fort_13_path'])
-                for attribute_name in mesh.get_nodal_attribute_names():
-                    mesh.set_nodal_attribute_state(
-                        attribute_name, coldstart=True, hotstart=True
-                    )
+        adcircpy_forcings = []
+        for forcing in self.forcings:
+            key = (repr(forcing), *modeled_times)
+            if key not in self.__forcing_cache:
+                adcircpy_forcing = forcing.adcircpy_forcing
+                if any(
+                    cached_forcing is adcircpy_forcing
+                    for cached_forcing in self.__forcing_cache.values()
+                ):
+                    # forcing objects are set to the modeled times of each mesh, so each set of times has its own
+                    adcircpy_forcing = forcing.build_adcircpy_forcing()
+                # building the forcing may fill in entries of its configuration
+                self.__forcing_cache[(repr(forcing), *modeled_times)] = adcircpy_forcing
             else:
-                LOGGER.warning(
-                    f'mesh values (nodal attributes) not found at "{os.path.relpath(self["fort_13_path"].resolve(), Path.cwd())}"'
+                adcircpy_forcing = self.__forcing_cache[key]
+            adcircpy_forcings.append(adcircpy_forcing)
+        return adcircpy_forcings
+
+    @property
+    def adcircpy_mesh(self) -> AdcircMesh:
+        if isinstance(self.__base_mesh, SharedMesh):
+            mesh = self.__base_mesh.adcircpy_mesh
+        else:
+            mesh = self.__open_base_mesh().copy()
+
+        # nodal attributes (including generated tau0) depend only on the base mesh and `fort.13`,
+        # so they are computed once and shared between meshes (and copies of this configuration);
+        # each mesh receives its own copy of the values, so that changes to one mesh do not affect others
+        if self['fort_13_path'] in self.__nodal_attributes:
+            for attribute_name, attribute in self.__nodal_attributes[
+                self['fort_13_path']
+            ].items():
+                if attribute_name not in mesh.get_nodal_attribute_names():
+                    mesh.add_nodal_attribute(attribute_name, attribute['units'])
+                mesh.set_nodal_attribute(
+                    attribute_name,
+                    attribute['values'].copy(),
+                    coldstart=attribute['coldstart'],
+                    hotstart=attribute['hotstart'],
                 )
+        else:
+            if self['fort_13_path'] is not None:
+                LOGGER.info(
+                    f'reading attributes from "{os.path.relpath(self["fort_13_path"].resolve(), Path.cwd())}"'
+                )
+                if self['fort_13_path'].exists():
+                    mesh.import_nodal_attributes(self['fort_13_path'])
+                    for attribute_name in mesh.get_nodal_attribute_names():
+                        mesh.set_nodal_attribute_state(
+                            attribute_name, coldstart=True, hotstart=True
+                        )
+                else:
+                    LOGGER.warning(
+                        f'mesh values (nodal attributes) not found at "{os.path.relpath(self["fort_13_path"].resolve(), Path.cwd())}"'
+                    )
+
+            if not mesh.has_nodal_attribute('primitive_weighting_in_continuity_equation'):
+                LOGGER.debug(f'generating tau0 in mesh')
+                mesh.generate_tau0()
+
+            nodal_attributes = {}
+            for attribute_name in mesh.get_nodal_attribute_names():
+                attribute = mesh.get_nodal_attribute(attribute_name)
+                nodal_attributes[attribute_name] = {
+                    'units': attribute['units'],
+                    'values': attribute['values'].copy(),
+                    'coldstart': attribute['coldstart'],
+                    'hotstart': attribute['hotstart'],
+                }
+            self.__nodal_attributes[self['fort_13_path']] = nodal_attributes
 
         LOGGER.debug(f'adding {len(self.forcings)} forcing(s) to mesh')
-        for adcircpy_forcing in self.adcircpy_forcings:
+        for adcircpy_forcing in self.cached_adcircpy_forcings:
             if isinstance(adcircpy_forcing, (Tides, BestTrackForcing)):
                 adcircpy_forcing.start_date = self['modeled_start_time']
                 adcircpy_forcing.end_date = self['modeled_end_time']
@@ -350,14 +410,10 @@ class ADCIRCJSON(ModelJSON, NEMSCapJSON, AttributeJSON):
 
             mesh.add_forcing(adcircpy_forcing)
 
-        if not mesh.has_nodal_attribute('primitive_weighting_in_continuity_equation'):
-            LOGGER.debug(f'generating tau0 in mesh')
-            mesh.generate_tau0()
-
         return mesh
 
     @adcircpy_mesh.setter
-    def adcircpy_mesh(self, adcircpy_mesh: Union[AdcircMesh, PathLike]):
+    def adcircpy_mesh(self, adcircpy_mesh: Union[AdcircMesh, SharedMesh, PathLike]):
         if isinstance(adcircpy_mesh, AdcircMesh):
             try:
                 adcircpy_mesh = adcircpy_mesh.copy()
@@ -365,16 +421,47 @@ class ADCIRCJSON(ModelJSON, NEMSCapJSON, AttributeJSON):
             except Exception as error:
                 LOGGER.warning(f'unable to copy mesh object: {error}')
 
-        self.__base_mesh = adcircpy_mesh
+        self.base_mesh = adcircpy_mesh
 
     @property
-    def base_mesh(self) -> AdcircMesh:
+    def base_mesh(self) -> Union[AdcircMesh, SharedMesh]:
         return self.__base_mesh
 
     @base_mesh.setter
-    def base_mesh(self, base_mesh: AdcircMesh):
+    def base_mesh(self, base_mesh: Union[AdcircMesh, SharedMesh]):
+        if base_mesh is not self.__base_mesh:
+            self.__nodal_attributes = {}
         self.__base_mesh = base_mesh
 
+    def share_base_mesh(self) -> SharedMesh:
+        """
+        move the base mesh into shared memory, so that copies of this configuration sent to worker processes attach to it
+
+        :return: shared mesh, which should be closed by the caller when all workers are finished
+        """
+
+        if not isinstance(self.__base_mesh, SharedMesh):
+            # share the same copy that `adcircpy_mesh` would otherwise make on every access
+            self.base_mesh = SharedMesh.from_adcircpy(self.__open_base_mesh().copy())
+        return self.__base_mesh
+
+    def preload(self):
+        """
+        build the mesh once, caching nodal attributes and forcing objects for subsequent copies of this configuration
+        """
+
+        self.adcircpy_mesh
+
+    def __open_base_mesh(self) -> AdcircMesh:
+        if self.__base_mesh is None:
+            self.__base_mesh = self['fort_14_path']
+
+        if not isinstance(self.__base_mesh, AdcircMesh):
+            LOGGER.info(f'opening mesh "{self.__base_mesh}"')
+            self.__base_mesh = AdcircMesh.open(self.__base_mesh, crs=4326)
+
+        return self.__base_mesh
+
     @property
     def adcircpy_driver(self) -> AdcircRun:
         # instantiate AdcircRun object.
@@ -504,4 +591,20 @@ class ADCIRCJSON(ModelJSON, NEMSCapJSON, AttributeJSON):
     def __copy__(self) -> 'ADCIRCJSON':
         instance = super().__copy__()
         instance.base_mesh = self.base_mesh
+        instance.__nodal_attributes = self.__nodal_attributes
+        instance.__forcing_cache = self.__forcing_cache
         return instance
+
+    def overlay(self) -> 'ADCIRCJSON':
+        instance = super().overlay()
+        # as with `copy`, forcings are added back by the run configuration
+        instance.__forcings = []
+        instance.slurm_configuration = None
+        return instance
+
+    def __getstate__(self) -> {str: Any}:
+        state = self.__dict__.copy()
+        # cached attributes and forcings are rebuilt in the receiving process
+        state['_ADCIRCJSON__nodal_attributes'] = {}
+        state['_ADCIRCJSON__forcing_cache'] = {}
+        return state
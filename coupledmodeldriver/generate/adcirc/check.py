@@ -1,10 +1,115 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
+from fnmatch import fnmatch
+from functools import lru_cache
 from glob import glob
+import json
 import os
 from os import PathLike
 from pathlib import Path
 import re
-from typing import Dict, Union
+import struct
+from threading import Lock
+from typing import Any, Collection, Dict, Union
+
+from dateutil.parser import parse as parse_date
+import netCDF4
+
+from coupledmodeldriver.scheduler import FAILED_JOB_STATES, JobState
+from coupledmodeldriver.utilities import convert_value, LOGGER
+
+# files read or inspected by `collect_adcirc_errors`; a change to any of them changes the completion status
+COMPLETION_FILE_PATTERNS = [
+    'fort.14',
+    'fort.15',
+    'fort.16',
+    'ADCIRC_*_*.err.log',
+    'ADCIRC_*_*.out.log',
+    'PET*.ESMF_LogFile',
+    'fort.*.nc',
+]
+
+# configuration files read by `collect_adcirc_errors` (through `ensemble_configuration`), from the run directory or
+# the ensemble directory above it
+COMPLETION_CONFIGURATION_FILENAMES = ['configure_adcirc.json', 'configure_slurm.json']
+
+# known classes of errors in ADCIRC, Slurm, and ESMF logs, as lowercase keywords matched anywhere in a line
+LOG_ERROR_KEYWORDS = {
+    'error': ['error'],
+    'fatal': ['fatal'],
+    'abort': ['abort'],
+    'segmentation_fault': ['segmentation fault', 'sigsegv'],
+    'out_of_memory': ['out of memory', 'oom-kill'],
+    'killed': ['killed'],
+    'cancelled': ['cancelled'],
+    'terminating': ['adcirc terminating'],
+}
+# logs are lowercased before matching, which is much faster than a case-insensitive expression
+LOG_ERROR_PATTERN = re.compile(
+    b'|'.join(
+        re.escape(keyword.encode())
+        for keywords in LOG_ERROR_KEYWORDS.values()
+        for keyword in keywords
+    )
+)
+
+# matches any line that is not blank, for logs in which every line is an error
+NONBLANK_LINE_PATTERN = re.compile(rb'\S')
+
+# number of matching lines kept from each end of a log
+MAX_LOG_MATCHES = 10
+
+# number of bytes read at a time when scanning logs
+LOG_CHUNK_SIZE = 2 ** 20
+
+# hotstart files are linked from the spinup, so their times do not reflect the progress of the run
+HOTSTART_NETCDF_FILENAMES = ['fort.67.nc', 'fort.68.nc']
+
+# number of progress samples kept for each run, from which throughput is estimated
+PROGRESS_HISTORY_SAMPLES = 10
+
+# variables that must be defined in the header of each ADCIRC output file
+ADCIRC_OUTPUT_VARIABLES = {
+    'fort.61.nc': ['time', 'zeta'],
+    'fort.62.nc': ['time', 'u-vel', 'v-vel'],
+    'fort.63.nc': ['time', 'zeta'],
+    'fort.64.nc': ['time', 'u-vel', 'v-vel'],
+    'fort.67.nc': ['time'],
+    'fort.68.nc': ['time'],
+    'fort.71.nc': ['time'],
+    'fort.72.nc': ['time'],
+    'fort.73.nc': ['time', 'pressure'],
+    'fort.74.nc': ['time', 'windx', 'windy'],
+}
+
+# maximum number of output files validated at once
+MAX_VALIDATION_WORKERS = 8
+
+# sizes and `struct` formats of NetCDF classic data types, by type code
+NETCDF_CLASSIC_TYPES = {
+    1: (1, 'b'),
+    2: (1, 'c'),
+    3: (2, 'h'),
+    4: (4, 'i'),
+    5: (4, 'f'),
+    6: (8, 'd'),
+    7: (1, 'B'),
+    8: (2, 'H'),
+    9: (4, 'I'),
+    10: (8, 'q'),
+    11: (8, 'Q'),
+}
+
+# model time (seconds since coldstart) written to `fort.16` and to the screen every `NSCREEN` timesteps
+MODEL_TIME_PATTERN = re.compile(r'TIME\s*=\s*([-+0-9.Ee]+)')
+
+
+class OutputStatus(Enum):
+    TRUNCATED = 'truncated'
+    IN_PROGRESS = 'in_progress'
+    COMPLETE = 'complete'
 
 
 class CompletionStatus(Enum):
@@ -43,6 +148,316 @@ def tail(file, lines: int = 20) -> [str]:
     return [line.decode() for line in all_read_text.splitlines()[-total_lines_wanted:]]
 
 
+def scan_log(
+    filename: PathLike, pattern: re.Pattern = None, limit: int = None, chunk_size: int = None,
+) -> [str]:
+    """
+    stream a log in fixed-size chunks, keeping only the first and last matching lines
+
+    :param filename: path to log file
+    :param pattern: compiled bytes expression to search for in each lowercased line, defaulting to all known error classes
+    :param limit: number of matching lines to keep from each end of the log
+    :param chunk_size: number of bytes to read at a time
+    :return: matching lines, with a note in place of any lines that were skipped
+    """
+
+    if pattern is None:
+        pattern = LOG_ERROR_PATTERN
+    if limit is None:
+        limit = MAX_LOG_MATCHES
+    if chunk_size is None:
+        chunk_size = LOG_CHUNK_SIZE
+
+    first_lines = []
+    last_lines = deque(maxlen=limit)
+    num_matches = 0
+
+    with open(filename, 'rb') as log_file:
+        remainder = b''
+        while True:
+            chunk = log_file.read(chunk_size)
+            if len(chunk) > 0:
+                # only scan complete lines; the partial last line is carried over to the next chunk
+                lines = remainder + chunk
+                end = lines.rfind(b'\n')
+                if end > -1:
+                    remainder = lines[end + 1 :]
+                    lines = lines[: end + 1]
+                elif len(lines) < max(chunk_size, LOG_CHUNK_SIZE):
+                    remainder = lines
+                    continue
+                else:
+                    # scan lines longer than a chunk in pieces, to keep memory bounded
+                    remainder = b''
+            else:
+                lines = remainder
+
+            # lowercasing bytes keeps their positions, so matches index the original lines
+            lowercase_lines = lines.lower()
+            position = 0
+            while True:
+                match = pattern.search(lowercase_lines, position)
+                if match is None:
+                    break
+                line_start = lines.rfind(b'\n', 0, match.start()) + 1
+                line_end = lines.find(b'\n', match.end())
+                if line_end == -1:
+                    line_end = len(lines)
+                line = lines[line_start:line_end].decode(errors='replace').rstrip('\r')
+                if len(first_lines) < limit:
+                    first_lines.append(line)
+                else:
+                    last_lines.append(line)
+                num_matches += 1
+                position = line_end + 1
+
+            if len(chunk) == 0:
+                break
+
+    if num_matches > len(first_lines) + len(last_lines):
+        first_lines.append(
+            f'... {num_matches - len(first_lines) - len(last_lines)} more matching line(s) ...'
+        )
+
+    return [*first_lines, *last_lines]
+
+
+def read_netcdf_header(filename: PathLike) -> {str: Any}:
+    """
+    parse the header of a NetCDF classic (CDF-1, CDF-2, or CDF-5) file, without reading any data
+
+    :param filename: path to NetCDF file
+    :return: format version, number of records, dimension lengths, variables, and size of one record
+    """
+
+    with open(filename, 'rb') as netcdf_file:
+        magic = netcdf_file.read(4)
+        if len(magic) < 4 or magic[:3] != b'CDF' or magic[3] not in (1, 2, 5):
+            raise ValueError(f'not a NetCDF classic file: {magic}')
+        version = magic[3]
+
+        # CDF-5 uses 64-bit counts, and CDF-2 and CDF-5 use 64-bit offsets
+        count_format = '>Q' if version == 5 else '>I'
+        offset_format = '>I' if version == 1 else '>Q'
+
+        def read(format: str) -> Any:
+            size = struct.calcsize(format)
+            values = netcdf_file.read(size)
+            if len(values) < size:
+                raise ValueError('header ends before it is complete')
+            return struct.unpack(format, values)[0]
+
+        def read_name() -> str:
+            length = read(count_format)
+            name = netcdf_file.read(length)
+            netcdf_file.read(-length % 4)
+            return name.decode(errors='replace')
+
+        def read_list(read_element) -> list:
+            read('>I')
+            return [read_element() for _ in range(read(count_format))]
+
+        def read_attribute() -> (str, Any):
+            name = read_name()
+            type_code = read('>I')
+            length = read(count_format)
+            type_size, type_format = NETCDF_CLASSIC_TYPES[type_code]
+            values = netcdf_file.read(length * type_size)
+            netcdf_file.read(-(length * type_size) % 4)
+            if type_code == 2:
+                values = values.decode(errors='replace').rstrip('\x00')
+            else:
+                values = struct.unpack(f'>{length}{type_format}', values)
+            return name, values
+
+        def read_variable() -> (str, {str: Any}):
+            name = read_name()
+            dimension_ids = [read(count_format) for _ in range(read(count_format))]
+            attributes = dict(read_list(read_attribute))
+            type_code = read('>I')
+            read(count_format)
+            begin = read(offset_format)
+            return (
+                name,
+                {
+                    'dimensions': dimension_ids,
+                    'attributes': attributes,
+                    'type': type_code,
+                    'begin': begin,
+                },
+            )
+
+        num_records = read(count_format)
+        dimensions = read_list(lambda: (read_name(), read(count_format)))
+        read_list(read_attribute)
+        variables = dict(read_list(read_variable))
+
+    # the record dimension is stored with a length of zero
+    record_dimensions = [index for index, (_, length) in enumerate(dimensions) if length == 0]
+    for variable in variables.values():
+        variable['record'] = (
+            len(variable['dimensions']) > 0 and variable['dimensions'][0] in record_dimensions
+        )
+        type_size = NETCDF_CLASSIC_TYPES[variable['type']][0]
+        size = type_size
+        for dimension_id in variable['dimensions'][1 if variable['record'] else 0 :]:
+            size *= dimensions[dimension_id][1]
+        variable['size'] = size
+
+    # records are padded to 4 bytes, unless there is only one record variable
+    record_variables = [variable for variable in variables.values() if variable['record']]
+    if len(record_variables) == 1:
+        record_size = record_variables[0]['size']
+    else:
+        record_size = sum(
+            variable['size'] + -variable['size'] % 4 for variable in record_variables
+        )
+
+    return {
+        'version': version,
+        'num_records': num_records,
+        'dimensions': dict(dimensions),
+        'variables': variables,
+        'record_size': record_size,
+    }
+
+
+def validate_adcirc_output(
+    filename: PathLike, end_time: datetime = None
+) -> (OutputStatus, str):
+    """
+    check an ADCIRC output file from its header alone, comparing the offset of its last record to the file size
+
+    :param filename: path to NetCDF output file
+    :param end_time: modeled end time of the run; without it, any file with records is considered complete
+    :return: status of output file, and a description of any problem
+    """
+
+    if not isinstance(filename, Path):
+        filename = Path(filename)
+
+    file_size = filename.stat().st_size
+    expected_variables = ADCIRC_OUTPUT_VARIABLES.get(filename.name, ['time'])
+
+    try:
+        header = read_netcdf_header(filename)
+    except ValueError as error:
+        header = None
+        if str(error).startswith('not a NetCDF classic file'):
+            # NetCDF-4 (HDF5) files are indexed internally, so only their metadata can be checked
+            try:
+                with netCDF4.Dataset(filename) as dataset:
+                    variables = list(dataset.variables)
+                    num_records = dataset['time'].shape[0] if 'time' in variables else 0
+                    times = (
+                        dataset['time'][max(num_records - 2, 0) : num_records].tolist()
+                        if num_records > 0
+                        else []
+                    )
+                    time_units = (
+                        getattr(dataset['time'], 'units', None)
+                        if 'time' in variables
+                        else None
+                    )
+            except Exception as error:
+                return OutputStatus.TRUNCATED, f'unreadable header ({error})'
+        else:
+            return OutputStatus.TRUNCATED, f'incomplete header ({error})'
+
+    if header is not None:
+        variables = list(header['variables'])
+
+    missing_variables = [name for name in expected_variables if name not in variables]
+    if len(missing_variables) > 0:
+        return OutputStatus.TRUNCATED, f'missing variable(s) {missing_variables}'
+
+    if header is not None:
+        num_records = header['num_records']
+        if num_records == 2 ** (64 if header['version'] == 5 else 32) - 1:
+            return OutputStatus.IN_PROGRESS, 'number of records is still being written'
+
+        expected_size = 0
+        for variable in header['variables'].values():
+            if variable['record']:
+                if num_records == 0:
+                    continue
+                end = (
+                    variable['begin']
+                    + (num_records - 1) * header['record_size']
+                    + variable['size']
+                )
+            else:
+                end = variable['begin'] + variable['size']
+            expected_size = max(expected_size, end)
+        if file_size < expected_size:
+            return (
+                OutputStatus.TRUNCATED,
+                f'file size {file_size} is less than the end of record {num_records} at {expected_size}',
+            )
+
+        time = header['variables']['time']
+        time_units = time['attributes'].get('units')
+        type_size, type_format = NETCDF_CLASSIC_TYPES[time['type']]
+        times = []
+        with open(filename, 'rb') as netcdf_file:
+            for record in range(max(num_records - 2, 0), num_records):
+                netcdf_file.seek(time['begin'] + record * header['record_size'])
+                times.extend(struct.unpack(f'>{type_format}', netcdf_file.read(type_size)))
+
+    if num_records == 0:
+        return OutputStatus.IN_PROGRESS, 'no records written'
+
+    if end_time is not None and filename.name not in HOTSTART_NETCDF_FILENAMES:
+        try:
+            reference_time = parse_date(time_units.split('since', 1)[-1].strip())
+        except Exception:
+            reference_time = None
+        if reference_time is not None:
+            model_time = reference_time + timedelta(seconds=float(times[-1]))
+            # the run is complete once no further output interval fits before the end time
+            interval = (
+                timedelta(seconds=float(times[-1] - times[0])) if len(times) > 1 else None
+            )
+            if model_time < end_time and (
+                interval is None or model_time + interval <= end_time
+            ):
+                return (
+                    OutputStatus.IN_PROGRESS,
+                    f'{num_records} record(s) written, up to {model_time.isoformat()}',
+                )
+
+    return OutputStatus.COMPLETE, None
+
+
+def validate_adcirc_outputs(
+    filenames: Collection[PathLike], end_time: datetime = None, workers: int = None
+) -> {Path: (OutputStatus, str)}:
+    """
+    validate the headers of the given ADCIRC output files in parallel
+
+    :param filenames: paths to NetCDF output files, from any number of run directories
+    :param end_time: modeled end time of the runs
+    :param workers: maximum number of files to validate at once
+    :return: status of each output file, and a description of any problem
+    """
+
+    filenames = [Path(filename) for filename in filenames]
+    if workers is None:
+        workers = MAX_VALIDATION_WORKERS
+
+    if len(filenames) <= 1 or workers <= 1:
+        statuses = [validate_adcirc_output(filename, end_time) for filename in filenames]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(filenames))) as pool:
+            statuses = list(
+                pool.map(
+                    lambda filename: validate_adcirc_output(filename, end_time), filenames
+                )
+            )
+
+    return dict(zip(filenames, statuses))
+
+
 def is_adcirc_run_directory(directory: PathLike = None) -> bool:
     if directory is None:
         directory = Path.cwd()
@@ -90,12 +505,12 @@ def collect_adcirc_errors(directory: PathLike = None) -> {str: Union[str, Dict[s
     ]
     if len(slurm_error_log_filenames) > 0:
         for filename in slurm_error_log_filenames:
-            with open(filename) as log_file:
-                lines = list(log_file.readlines())
-                if len(lines) > 0:
-                    if filename.name not in errors:
-                        errors[filename.name] = []
-                    errors[filename.name].extend(lines)
+            # anything written to standard error is reported
+            lines = scan_log(filename, pattern=NONBLANK_LINE_PATTERN)
+            if len(lines) > 0:
+                if filename.name not in errors:
+                    errors[filename.name] = []
+                errors[filename.name].extend(lines)
     else:
         not_started[
             slurm_error_log_pattern.name
@@ -105,7 +520,6 @@ def collect_adcirc_errors(directory: PathLike = None) -> {str: Union[str, Dict[s
         Path(filename) for filename in glob(str(slurm_out_log_pattern))
     ]
     if len(slurm_output_log_filenames) > 0:
-        error_pattern = re.compile('error', re.IGNORECASE)
         for filename in slurm_output_log_filenames:
             with open(filename, 'rb') as log_file:
                 lines = tail(log_file, lines=100)
@@ -115,7 +529,7 @@ def collect_adcirc_errors(directory: PathLike = None) -> {str: Union[str, Dict[s
                     completion_percentage = float(percentages[-1].split('%')[0])
 
                 for line in lines:
-                    if re.match(error_pattern, line):
+                    if LOG_ERROR_PATTERN.search(line.lower().encode()):
                         if filename.name not in errors:
                             errors[filename.name] = []
                         errors[filename.name].append(line)
@@ -132,37 +546,52 @@ def collect_adcirc_errors(directory: PathLike = None) -> {str: Union[str, Dict[s
 
     esmf_log_filenames = [Path(filename) for filename in glob(str(esmf_log_pattern))]
     if len(esmf_log_filenames) > 0:
-        error_pattern = re.compile('error', re.IGNORECASE)
         for filename in esmf_log_filenames:
-            with open(filename) as log_file:
-                lines = list(log_file.readlines())
-                if len(lines) == 0:
-                    failures[filename.name] = 'empty ESMF log file'
-                else:
-                    for line in lines:
-                        if re.match(error_pattern, line):
-                            if filename.name not in errors:
-                                errors[filename.name] = []
-                            errors[filename.name].append(line)
+            if filename.stat().st_size == 0:
+                failures[filename.name] = 'empty ESMF log file'
+            else:
+                lines = scan_log(filename)
+                if len(lines) > 0:
+                    if filename.name not in errors:
+                        errors[filename.name] = []
+                    errors[filename.name].extend(lines)
     else:
         not_started[
             esmf_log_pattern.name
         ] = f'no ESMF log files found with pattern `{os.path.relpath(esmf_log_pattern, directory)}`'
 
+    window = adcirc_modeled_window(directory)
+    output_netcdf_filenames = []
     for filename in [Path(filename) for filename in glob(str(output_netcdf_pattern))]:
         if filename.exists():
-            minimum_file_size = 43081
-
-            if filename.stat().st_size <= minimum_file_size:
-                if filename.name not in failures:
-                    running[
-                        filename.name
-                    ] = f'empty file (size {filename.stat().st_size} not greater than {minimum_file_size})'
+            output_netcdf_filenames.append(filename)
         else:
             not_started[filename.name] = f'output file not found {filename}'
 
+    for filename, (output_status, message) in validate_adcirc_outputs(
+        output_netcdf_filenames, end_time=window[2] if window is not None else None
+    ).items():
+        if output_status == OutputStatus.TRUNCATED:
+            # a file may appear truncated while its records are still being flushed by a running job
+            if any(name.endswith('.out.log') for name in running):
+                running[filename.name] = f'truncated file, still being written ({message})'
+            else:
+                failures[filename.name] = f'truncated file ({message})'
+        elif output_status == OutputStatus.IN_PROGRESS:
+            if filename.name not in failures:
+                running[filename.name] = f'incomplete file ({message})'
+
+    progress = adcirc_progress(directory)
+    if progress is not None:
+        # modeled time is exact, whereas the percentage printed to the log may be buffered or missing
+        completion_percentage = progress['completion_percentage']
+
     completion = {'completion_percentage': completion_percentage}
 
+    if progress is not None:
+        completion['progress'] = {
+            key: value for key, value in progress.items() if key != 'completion_percentage'
+        }
     if len(not_configured) > 0:
         completion['not_configured'] = not_configured
     if len(not_started) > 0:
@@ -178,12 +607,29 @@ def collect_adcirc_errors(directory: PathLike = None) -> {str: Union[str, Dict[s
 
 
 def check_adcirc_completion(directory: PathLike = None) -> (CompletionStatus, float):
-    completion_status = collect_adcirc_errors(directory)
+    return adcirc_completion_status(collect_adcirc_errors(directory))
+
+
+def adcirc_completion_status(
+    completion_status: {str: Union[str, Dict[str, str]]}
+) -> (CompletionStatus, float):
+    """
+    :param completion_status: errors and problems collected by `collect_adcirc_errors`, with the states of the run's jobs (`jobs`) if known
+    :return: completion status and percentage
+    """
 
     completion_percentage = completion_status['completion_percentage']
 
+    job_states = {
+        job: JobState(entry['state'])
+        for job, entry in completion_status.get('jobs', {}).items()
+    }
+
     if not isinstance(completion_status, CompletionStatus):
-        if len(completion_status) > 1:
+        if any(
+            key in completion_status
+            for key in ['not_configured', 'not_started', 'failures', 'errors', 'running']
+        ):
             if 'not_configured' in completion_status:
                 completion_status = CompletionStatus.NOT_CONFIGURED
             elif 'not_started' in completion_status:
@@ -199,4 +645,320 @@ def check_adcirc_completion(directory: PathLike = None) -> (CompletionStatus, fl
         else:
             completion_status = CompletionStatus.COMPLETED
 
+    # the scheduler knows of failures, and of jobs not yet started, before they show in the log files
+    if completion_status != CompletionStatus.NOT_CONFIGURED and len(job_states) > 0:
+        if any(state in FAILED_JOB_STATES for state in job_states.values()):
+            completion_status = CompletionStatus.FAILED
+        elif job_states.get('setup') == JobState.RUNNING:
+            completion_status = CompletionStatus.IN_SETUP
+        elif any(job_states.get(job) == JobState.PENDING for job in ['setup', 'adcirc']):
+            # later hotstart segments wait in the queue while earlier segments run
+            completion_status = CompletionStatus.NOT_STARTED
+        elif (
+            any(
+                state == JobState.RUNNING
+                for job, state in job_states.items()
+                if job.startswith('adcirc')
+            )
+            and completion_status == CompletionStatus.NOT_STARTED
+        ):
+            completion_status = CompletionStatus.RUNNING
+
     return completion_status, completion_percentage
+
+
+def adcirc_progress(directory: PathLike = None) -> {str: Any}:
+    """
+    compute progress from the modeled time reached, read from the headers of output NetCDF files or from `fort.16`
+
+    :param directory: ADCIRC run directory, within an ensemble directory containing `configure_adcirc.json`
+    :return: completion percentage, modeled time reached, and the wall time at which it was written, or `None` if unknown
+    """
+
+    if directory is None:
+        directory = Path.cwd()
+    elif not isinstance(directory, Path):
+        directory = Path(directory)
+
+    window = adcirc_modeled_window(directory)
+    if window is None:
+        return None
+    coldstart_time, start_time, end_time = window
+
+    model_time = None
+    wall_time = None
+
+    for filename in sorted(directory.glob('fort.*.nc')):
+        if filename.name in HOTSTART_NETCDF_FILENAMES:
+            continue
+        try:
+            # only the header and the last time value are read
+            with netCDF4.Dataset(filename) as dataset:
+                times = dataset['time']
+                if times.shape[0] == 0:
+                    continue
+                reference_time = parse_date(times.units.split('since', 1)[-1].strip())
+                file_model_time = reference_time + timedelta(
+                    seconds=float(times[times.shape[0] - 1])
+                )
+        except Exception as error:
+            LOGGER.debug(f'could not read time from "{filename}": {error}')
+            continue
+        if model_time is None or file_model_time > model_time:
+            model_time = file_model_time
+            wall_time = filename.stat().st_mtime
+
+    output_log_filename = directory / 'fort.16'
+    if output_log_filename.exists():
+        with open(output_log_filename, 'rb') as log_file:
+            times = MODEL_TIME_PATTERN.findall('\n'.join(tail(log_file, lines=20)))
+        if len(times) > 0:
+            log_model_time = coldstart_time + timedelta(seconds=float(times[-1]))
+            if model_time is None or log_model_time > model_time:
+                model_time = log_model_time
+                wall_time = output_log_filename.stat().st_mtime
+
+    if model_time is None:
+        return None
+
+    completion_percentage = (model_time - start_time) / (end_time - start_time) * 100
+    completion_percentage = round(min(max(completion_percentage, 0), 100), 2)
+
+    slurm_configuration = ensemble_configuration(directory, 'configure_slurm.json')
+    if slurm_configuration is not None:
+        job_duration = convert_value(slurm_configuration.get('job_duration'), timedelta)
+    else:
+        job_duration = None
+
+    return {
+        'completion_percentage': completion_percentage,
+        'model_time': model_time.isoformat(),
+        'wall_time': datetime.fromtimestamp(wall_time).isoformat(),
+        'start_time': start_time.isoformat(),
+        'end_time': end_time.isoformat(),
+        'job_duration': job_duration.total_seconds() if job_duration is not None else None,
+    }
+
+
+def adcirc_modeled_window(directory: Path) -> (datetime, datetime, datetime):
+    """
+    :param directory: ADCIRC run directory, within an ensemble directory containing `configure_adcirc.json`
+    :return: coldstart time, and modeled start and end times of the given run directory, or `None` if not configured
+    """
+
+    configuration = ensemble_configuration(directory, 'configure_adcirc.json')
+    if configuration is None:
+        return None
+
+    start_time = convert_value(configuration.get('modeled_start_time'), datetime)
+    end_time = convert_value(configuration.get('modeled_end_time'), datetime)
+    spinup_duration = convert_value(configuration.get('tidal_spinup_duration'), timedelta)
+    if start_time is None or end_time is None:
+        return None
+
+    if spinup_duration is None:
+        spinup_duration = timedelta(0)
+    coldstart_time = start_time - spinup_duration
+
+    if directory.name == 'spinup':
+        return coldstart_time, coldstart_time, start_time
+    else:
+        return coldstart_time, start_time, end_time
+
+
+def ensemble_configuration(directory: Path, filename: str) -> {str: Any}:
+    """
+    :param directory: run directory
+    :param filename: name of configuration file, in the run directory or in its ensemble directory
+    :return: configuration values, or `None` if not found
+    """
+
+    for configuration_directory in [directory, directory.parent, directory.parent.parent]:
+        configuration_filename = configuration_directory / filename
+        if configuration_filename.exists():
+            return read_configuration(
+                configuration_filename.absolute().as_posix(),
+                configuration_filename.stat().st_mtime_ns,
+            )
+    return None
+
+
+@lru_cache(maxsize=None)
+def read_configuration(filename: str, modified_time: int) -> {str: Any}:
+    """ read a configuration file once for all run directories, until the file is modified """
+
+    with open(filename) as configuration_file:
+        return json.load(configuration_file)
+
+
+def update_progress(previous_progress: {str: Any}, progress: {str: Any}) -> {str: Any}:
+    """
+    add the given progress to the history of previous checks, and estimate throughput and time remaining from it
+
+    :param previous_progress: progress from the previous check
+    :param progress: current progress
+    :return: progress, with history, throughput (modeled seconds per wall-clock second), and estimates of remaining and total wall-clock time
+    """
+
+    if progress is None:
+        return None
+
+    history = []
+    if previous_progress is not None:
+        history.extend(previous_progress.get('history', []))
+    sample = [progress['wall_time'], progress['model_time']]
+    if len(history) == 0 or history[-1][0] != sample[0]:
+        history.append(sample)
+    history = history[-PROGRESS_HISTORY_SAMPLES:]
+    progress['history'] = history
+
+    # throughput over the whole history smooths out variation between individual checks
+    throughput = None
+    if len(history) > 1:
+        wall_seconds = (
+            datetime.fromisoformat(history[-1][0]) - datetime.fromisoformat(history[0][0])
+        ).total_seconds()
+        model_seconds = (
+            datetime.fromisoformat(history[-1][1]) - datetime.fromisoformat(history[0][1])
+        ).total_seconds()
+        if wall_seconds > 0 and model_seconds > 0:
+            throughput = model_seconds / wall_seconds
+    progress['throughput'] = throughput
+
+    if throughput is not None and 'end_time' in progress:
+        start_time = datetime.fromisoformat(progress['start_time'])
+        end_time = datetime.fromisoformat(progress['end_time'])
+        model_time = datetime.fromisoformat(progress['model_time'])
+        remaining = max((end_time - model_time).total_seconds(), 0) / throughput
+        progress['remaining'] = remaining
+        progress['estimated_completion'] = (
+            datetime.fromisoformat(progress['wall_time']) + timedelta(seconds=remaining)
+        ).isoformat()
+        progress['estimated_duration'] = (end_time - start_time).total_seconds() / throughput
+        if progress.get('job_duration') is not None:
+            progress['exceeds_job_duration'] = (
+                progress['estimated_duration'] > progress['job_duration']
+            )
+
+    return progress
+
+
+def adcirc_completion_fingerprint(directory: PathLike = None) -> {str: [int]}:
+    """
+    :param directory: ADCIRC run directory
+    :return: modification time (ns) and size of every file inspected for completion, read in a single directory scan (along with the ensemble configuration files)
+    """
+
+    if directory is None:
+        directory = Path.cwd()
+
+    fingerprint = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if any(fnmatch(entry.name, pattern) for pattern in COMPLETION_FILE_PATTERNS):
+                    try:
+                        status = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    fingerprint[entry.name] = [status.st_mtime_ns, status.st_size]
+    except FileNotFoundError:
+        pass
+
+    # the modeled window and job duration are read from the first configuration file found, as by `ensemble_configuration`
+    for filename in COMPLETION_CONFIGURATION_FILENAMES:
+        for relative_filename in [filename, f'../{filename}', f'../../{filename}']:
+            try:
+                status = os.stat(os.path.join(directory, relative_filename))
+            except FileNotFoundError:
+                continue
+            fingerprint[relative_filename] = [status.st_mtime_ns, status.st_size]
+            break
+
+    return fingerprint
+
+
+class CompletionCache:
+    """
+    completion status of run directories, stored in a sidecar file and keyed by the modification times and sizes of
+    their log and output files, so that only directories whose files changed since the last check are scanned again
+    """
+
+    def __init__(self, filename: PathLike):
+        """
+        :param filename: path to sidecar file
+        """
+
+        if not isinstance(filename, Path):
+            filename = Path(filename)
+
+        self.filename = filename
+
+        self.__entries = {}
+        if self.filename.exists():
+            try:
+                with open(self.filename) as cache_file:
+                    self.__entries = json.load(cache_file)
+            except Exception as error:
+                LOGGER.warning(f'could not read completion cache "{self.filename}": {error}')
+
+        self.__lock = Lock()
+        self.__modified = False
+
+    def get(self, directory: PathLike, fingerprint: {str: [int]}) -> Any:
+        """
+        :param directory: run directory
+        :param fingerprint: current fingerprint of run directory
+        :return: cached completion, or `None` if the directory changed since it was cached
+        """
+
+        entry = self.__entries.get(self.__key(directory))
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            return entry['completion']
+        return None
+
+    def previous(self, directory: PathLike) -> Any:
+        """
+        :param directory: run directory
+        :return: completion from the last check, even if the directory changed since, or `None` if never checked
+        """
+
+        entry = self.__entries.get(self.__key(directory))
+        if entry is not None:
+            return entry['completion']
+        return None
+
+    def set(self, directory: PathLike, fingerprint: {str: [int]}, completion: Any):
+        """
+        :param directory: run directory
+        :param fingerprint: fingerprint of run directory at the time the completion was collected
+        :param completion: completion of run directory
+        """
+
+        with self.__lock:
+            self.__entries[self.__key(directory)] = {
+                'fingerprint': fingerprint,
+                'completion': completion,
+            }
+            self.__modified = True
+
+    def write(self):
+        if self.__modified:
+            try:
+                with open(self.filename, 'w') as cache_file:
+                    json.dump(self.__entries, cache_file)
+                self.__modified = False
+            except OSError as error:
+                LOGGER.warning(f'could not write completion cache "{self.filename}": {error}')
+
+    def __key(self, directory: PathLike) -> str:
+        if not isinstance(directory, Path):
+            directory = Path(directory)
+        try:
+            directory = directory.absolute().relative_to(self.filename.parent.absolute())
+        except ValueError:
+            directory = directory.absolute()
+        return directory.as_posix()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.filename)})'
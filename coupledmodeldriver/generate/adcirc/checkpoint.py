@@ -0,0 +1,154 @@
+from datetime import timedelta
+import math
+from os import PathLike
+from pathlib import Path
+
+from coupledmodeldriver.platforms import Platform
+
+# approximate size of a NetCDF hotstart file (`fort.67.nc`), from its double-precision nodal variables
+# (`zeta1`, `zeta2`, `zetad`, `u-vel`, `v-vel`, `x`, `y`, `depth`), integer `nodecode`, and integer `noff` and
+# element connectivity
+HOTSTART_BYTES_PER_NODE = 8 * 8 + 4
+HOTSTART_BYTES_PER_ELEMENT = 4 + 3 * 4
+
+# hotstart file format (`NHSTAR`) written by planned hotstart output, read by `IHOT = 567`
+PLANNED_HOTSTART_FORMAT = 5
+
+
+def read_mesh_size(fort14_filename: PathLike) -> (int, int):
+    """
+    :param fort14_filename: path to `fort.14`
+    :return: number of nodes and number of elements, read from the header of the mesh
+    """
+
+    if not isinstance(fort14_filename, Path):
+        fort14_filename = Path(fort14_filename)
+
+    with open(fort14_filename) as fort14_file:
+        fort14_file.readline()
+        elements, nodes = (int(value) for value in fort14_file.readline().split()[:2])
+
+    return nodes, elements
+
+
+def hotstart_size(nodes: int, elements: int) -> int:
+    """
+    :param nodes: number of mesh nodes
+    :param elements: number of mesh elements
+    :return: estimated size in bytes of a hotstart file
+    """
+
+    return nodes * HOTSTART_BYTES_PER_NODE + elements * HOTSTART_BYTES_PER_ELEMENT
+
+
+def optimal_checkpoint_interval(
+    write_duration: timedelta, mean_time_between_failures: timedelta
+) -> timedelta:
+    """
+    wall-clock interval between checkpoints that minimizes the expected sum of checkpoint cost and lost work,
+    following Daly's (2006) refinement `sqrt(2 C M) - C` of Young's (1974) approximation `sqrt(2 C M)`
+
+    :param write_duration: wall-clock duration of writing one checkpoint (`C`)
+    :param mean_time_between_failures: mean wall-clock time between failures of the job (`M`)
+    :return: wall-clock interval between checkpoints
+    """
+
+    write_duration = write_duration.total_seconds()
+    mean_time_between_failures = mean_time_between_failures.total_seconds()
+
+    if write_duration >= 2 * mean_time_between_failures:
+        # checkpoints cost more than the work they save
+        return timedelta(seconds=mean_time_between_failures)
+
+    return timedelta(
+        seconds=math.sqrt(2 * write_duration * mean_time_between_failures) - write_duration
+    )
+
+
+class HotstartPlanner:
+    """
+    plans the hotstart output interval (`NHSINC`) of ADCIRC runs, trading the cost of writing hotstart files
+    against the expected work lost to node failures
+    """
+
+    def __init__(
+        self,
+        nodes: int,
+        elements: int,
+        write_bandwidth: float,
+        node_failure_rate: float,
+        throughput: float,
+        platform: Platform = None,
+    ):
+        """
+        :param nodes: number of mesh nodes
+        :param elements: number of mesh elements
+        :param write_bandwidth: measured write bandwidth of the platform, in megabytes per second
+        :param node_failure_rate: expected failures of each compute node per hour
+        :param throughput: estimated modeled seconds per wall-clock second
+        :param platform: HPC platform, for the number of processors on each node
+        """
+
+        if platform is None:
+            platform = Platform.LOCAL
+
+        self.nodes = nodes
+        self.elements = elements
+        self.write_bandwidth = write_bandwidth
+        self.node_failure_rate = node_failure_rate
+        self.throughput = throughput
+        self.platform = platform
+
+    @property
+    def write_duration(self) -> timedelta:
+        """ wall-clock duration of writing one hotstart file """
+
+        return timedelta(
+            seconds=hotstart_size(self.nodes, self.elements) / (self.write_bandwidth * 1e6)
+        )
+
+    def mean_time_between_failures(self, processors: int) -> timedelta:
+        """
+        :param processors: number of processors of the job
+        :return: mean wall-clock time between failures of any node of the job
+        """
+
+        compute_nodes = math.ceil(processors / self.platform.value['processors_per_node'])
+        return timedelta(hours=1 / (compute_nodes * self.node_failure_rate))
+
+    def interval(self, processors: int) -> timedelta:
+        """
+        :param processors: number of processors of the job
+        :return: wall-clock interval between hotstart files
+        """
+
+        return optimal_checkpoint_interval(
+            self.write_duration, self.mean_time_between_failures(processors)
+        )
+
+    def attributes(
+        self, processors: int, timestep: timedelta, run_duration: timedelta
+    ) -> {str: int}:
+        """
+        :param processors: number of processors of the job
+        :param timestep: model timestep of the run
+        :param run_duration: modeled duration of the run
+        :return: `NHSTAR` and `NHSINC` of the run, or nothing if the run is expected to finish before its first hotstart
+        """
+
+        steps = max(
+            int(
+                self.interval(processors).total_seconds()
+                * self.throughput
+                / timestep.total_seconds()
+            ),
+            1,
+        )
+
+        if steps >= run_duration / timestep:
+            return {}
+
+        return {'NHSTAR': PLANNED_HOTSTART_FORMAT, 'NHSINC': steps}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.nodes}, {self.elements}, {self.write_bandwidth}, {self.node_failure_rate}, {self.throughput}, {self.platform})'
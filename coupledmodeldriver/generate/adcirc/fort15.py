@@ -0,0 +1,316 @@
+from copy import copy
+from os import PathLike
+from pathlib import Path
+import tempfile
+from typing import Any, Union
+
+from coupledmodeldriver.generate.adcirc.configure import (
+    ADCIRCRunConfiguration,
+    NEMSADCIRCRunConfiguration,
+)
+from coupledmodeldriver.utilities import LOGGER
+
+# values of `fort.15` lines by label, formatted as in `adcircpy.fort15.Fort15.fort15`; lines formatted differently by the
+# installed version of `adcircpy` are found by `Fort15Template.is_templated`, and runs changing them are rendered in full
+FORT15_LINE_VALUES = {
+    'NFOVER': lambda driver: f'{driver.NFOVER}',
+    'NABOUT': lambda driver: f'{driver.NABOUT:d}',
+    'NSCREEN': lambda driver: f'{driver.NSCREEN:d}',
+    'ICS': lambda driver: f'{driver.ICS:d}',
+    'NCOR': lambda driver: f'{driver.NCOR:d}',
+    'NTIP': lambda driver: f'{driver.NTIP:d}',
+    'G': lambda driver: f'{driver.G:G}',
+    'DRAMP': lambda driver: f'{driver.DRAMP}',
+    'H0 NODEDRYMIN NODEWETRMP VELMIN': lambda driver: f'{driver.H0:G} 0 0 {driver.VELMIN:G}',
+    'SLAM0 SFEA0': lambda driver: f'{driver.SLAM0} {driver.SFEA0}',
+    'CF HBREAK FTHETA FGAMMA': lambda driver: f'{driver.FFACTOR}',
+    'FFACTOR': lambda driver: f'{driver.FFACTOR}',
+    'ESL': lambda driver: f'{driver.ESLM:G}',
+    'smagorinsky coefficient': lambda driver: f'{driver.ESLM:G}',
+    'CORI': lambda driver: f'{driver.CORI:G}',
+    'ANGINN': lambda driver: f'{driver.ANGINN:G}',
+    'THAS THAF NHAINC FMV': lambda driver: f'{driver.THAS:G} {driver.THAF:G} {driver.NHAINC} {driver.FMV}',
+    'NHSTAR NHSINC': lambda driver: f'{driver.NHSTAR:d} {driver.NHSINC:d}',
+    'ITITER ISLDIA CONVCR ITMAX': lambda driver: f'{driver.ITITER:<1d} {driver.ISLDIA:<1d} {driver.CONVCR:<.15G} {driver.ITMAX:<4d}',
+    'NCPROJ': lambda driver: f'{driver.NCPROJ}',
+    'NCINST': lambda driver: f'{driver.NCINST}',
+    'NCSOUR': lambda driver: f'{driver.NCSOUR}',
+    'NCHIST': lambda driver: f'{driver.NCHIST}',
+    'NCREF': lambda driver: f'{driver.NCREF}',
+    'NCCOM': lambda driver: f'{driver.NCCOM}',
+    'NCHOST': lambda driver: f'{driver.NCHOST}',
+    'NCONV': lambda driver: f'{driver.NCCONV}',
+}
+
+# `fort.15` lines affected by each `AdcircRun` attribute; attributes not listed here require a full rendering
+ATTRIBUTE_LINES = {
+    'NFOVER': ['NFOVER'],
+    'NABOUT': ['NABOUT'],
+    'NSCREEN': ['NSCREEN'],
+    'ICS': ['ICS'],
+    'NCOR': ['NCOR', 'CORI'],
+    'NTIP': ['NTIP'],
+    'G': ['G'],
+    'DRAMP': ['DRAMP'],
+    'H0': ['H0 NODEDRYMIN NODEWETRMP VELMIN'],
+    'VELMIN': ['H0 NODEDRYMIN NODEWETRMP VELMIN'],
+    'SLAM0': ['SLAM0 SFEA0'],
+    'SFEA0': ['SLAM0 SFEA0'],
+    'FFACTOR': ['CF HBREAK FTHETA FGAMMA', 'FFACTOR'],
+    'CF': ['CF HBREAK FTHETA FGAMMA', 'FFACTOR'],
+    'HBREAK': ['CF HBREAK FTHETA FGAMMA'],
+    'FTHETA': ['CF HBREAK FTHETA FGAMMA'],
+    'FGAMMA': ['CF HBREAK FTHETA FGAMMA'],
+    'ESLM': ['ESL', 'smagorinsky coefficient'],
+    'CORI': ['CORI'],
+    'ANGINN': ['ANGINN'],
+    'THAS': ['THAS THAF NHAINC FMV'],
+    'THAF': ['THAS THAF NHAINC FMV'],
+    'NHAINC': ['THAS THAF NHAINC FMV'],
+    'FMV': ['THAS THAF NHAINC FMV'],
+    'NHSTAR': ['NHSTAR NHSINC'],
+    'NHSINC': ['NHSTAR NHSINC'],
+    'ITITER': ['ITITER ISLDIA CONVCR ITMAX'],
+    'ISLDIA': ['ITITER ISLDIA CONVCR ITMAX'],
+    'CONVCR': ['ITITER ISLDIA CONVCR ITMAX'],
+    'ITMAX': ['ITITER ISLDIA CONVCR ITMAX'],
+    'NCPROJ': ['NCPROJ'],
+    'NCINST': ['NCINST'],
+    'NCSOUR': ['NCSOUR'],
+    'NCHIST': ['NCHIST'],
+    'NCREF': ['NCREF'],
+    'NCCOM': ['NCCOM'],
+    'NCHOST': ['NCHOST'],
+    'NCCONV': ['NCONV'],
+}
+
+# width of the value column in `fort.15` lines
+VALUE_WIDTH = 63
+
+
+class Fort15Template:
+    """
+    `fort.15` rendered once from an unperturbed run configuration
+
+    Runs that differ from the unperturbed configuration only in `AdcircRun` attributes are written by re-rendering
+    the lines of the changed attributes, instead of building a new mesh and driver for every run.
+    """
+
+    def __init__(
+        self, configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration]
+    ):
+        """
+        :param configuration: unperturbed run configuration
+        """
+
+        self.driver = configuration.adcircpy_driver
+        self.attributes = dict(configuration['adcirc']['attributes'])
+        self.__configurations = {
+            name: self.__comparable(name, entry) for name, entry in configuration.items()
+        }
+
+        self.lines = self.__rendered_lines(self.driver)
+
+        self.__labels = {}
+        for index, line in enumerate(self.lines):
+            separator = line.find(' ! ', VALUE_WIDTH)
+            if separator > -1:
+                label = line[separator + 3 :].split(' - ', 1)[0].strip()
+                self.__labels.setdefault(label, []).append(index)
+
+        self.__templated_attributes = {}
+        self.__fort13 = None
+
+    def perturbed_attributes(
+        self, configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration]
+    ) -> {str: Any}:
+        """
+        :param configuration: perturbed run configuration
+        :return: attributes that differ from the template, or `None` if the run cannot be written from the template
+        """
+
+        configurations = {
+            name: self.__comparable(name, entry) for name, entry in configuration.items()
+        }
+        if configurations != self.__configurations:
+            return None
+
+        attributes = configuration['adcirc']['attributes']
+        perturbed_attributes = {}
+        for name in set(attributes) | set(self.attributes):
+            value = attributes.get(name)
+            if value != self.attributes.get(name):
+                if value is None or not self.is_templated(name, value):
+                    return None
+                perturbed_attributes[name] = value
+
+        return perturbed_attributes
+
+    def render(self, attributes: {str: Any} = None) -> str:
+        """
+        :param attributes: `AdcircRun` attributes to change
+        :return: contents of `fort.15`
+        """
+
+        if attributes is None or len(attributes) == 0:
+            return '\n'.join(self.lines)
+
+        driver = copy(self.driver)
+        driver._runtype = 'hotstart'
+        for name, value in attributes.items():
+            try:
+                setattr(driver, name, value)
+            except:
+                LOGGER.warning(
+                    f'could not set `{driver.__class__.__name__}` attribute `{name}` to `{value}`'
+                )
+
+        lines = list(self.lines)
+        for label in {label for name in attributes for label in ATTRIBUTE_LINES[name]}:
+            for index in self.__labels.get(label, []):
+                line = lines[index]
+                separator = line.find(' ! ', VALUE_WIDTH)
+                lines[
+                    index
+                ] = f'{FORT15_LINE_VALUES[label](driver):<{VALUE_WIDTH}}{line[separator:]}'
+
+        return '\n'.join(lines)
+
+    def write(
+        self,
+        output_directory: PathLike,
+        attributes: {str: Any} = None,
+        overwrite: bool = False,
+        fort13: str = 'fort.13',
+        fort15: str = 'fort.15',
+        fort22: str = 'fort.22',
+    ):
+        """
+        write run files, as `AdcircRun.write` would for the run
+
+        :param output_directory: directory in which to write files
+        :param attributes: `AdcircRun` attributes to change
+        :param overwrite: whether to overwrite existing files
+        :param fort13: filename of `fort.13`
+        :param fort15: filename of `fort.15`
+        :param fort22: filename of `fort.22`
+        """
+
+        if not isinstance(output_directory, Path):
+            output_directory = Path(output_directory)
+        output_directory.mkdir(parents=True, exist_ok=True)
+
+        if fort13 and len(self.driver.mesh.get_nodal_attribute_names()) > 0:
+            if self.__fort13 is None:
+                self.__fort13 = str(self.driver.mesh.nodal_attributes)
+            write_file(output_directory / fort13, self.__fort13, overwrite)
+
+        if fort22 and self.driver.wind_forcing is not None:
+            self.driver.wind_forcing.write(output_directory / fort22, overwrite)
+
+        if fort15:
+            write_file(output_directory / fort15, self.render(attributes), overwrite)
+
+    def is_templated(self, name: str, value: Any) -> bool:
+        """
+        render `fort.15` once with the given attribute changed (to a value of full precision, if floating-point), and
+        compare its lines to the lines formatted from `FORT15_LINE_VALUES`
+
+        :param name: `AdcircRun` attribute
+        :param value: value of attribute
+        :return: whether runs changing the given attribute are written from the template, exactly as by `adcircpy`
+        """
+
+        if name not in ATTRIBUTE_LINES:
+            return False
+
+        if name not in self.__templated_attributes:
+            if isinstance(value, float):
+                value = value * (1 + 1e-9) + 1e-12
+
+            driver = copy(self.driver)
+            try:
+                setattr(driver, name, value)
+                lines = self.__rendered_lines(driver)
+                templated = len(lines) == len(self.lines)
+                if templated:
+                    for label in ATTRIBUTE_LINES[name]:
+                        for index in self.__labels.get(label, []):
+                            separator = lines[index].find(' ! ', VALUE_WIDTH)
+                            if (
+                                f'{FORT15_LINE_VALUES[label](driver):<{VALUE_WIDTH}}{lines[index][separator:]}'
+                                != lines[index]
+                            ):
+                                templated = False
+            except:
+                templated = False
+
+            if not templated:
+                LOGGER.debug(
+                    f'`{name}` is not formatted here as by `adcircpy`; runs changing `{name}` are rendered in full'
+                )
+            self.__templated_attributes[name] = templated
+
+        return self.__templated_attributes[name]
+
+    @staticmethod
+    def __rendered_lines(driver) -> [str]:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            driver.write(
+                temporary_directory,
+                overwrite=True,
+                fort13=None,
+                fort14=None,
+                fort22=None,
+                coldstart=None,
+                hotstart='fort.15',
+                driver=None,
+            )
+            with open(Path(temporary_directory) / 'fort.15') as fort15_file:
+                return fort15_file.read().split('\n')
+
+    @staticmethod
+    def __comparable(name: str, configuration) -> {str: Any}:
+        configuration = dict(configuration.configuration)
+        if name == 'adcirc':
+            configuration.pop('attributes', None)
+        return configuration
+
+
+def write_file(filename: Path, contents: str, overwrite: bool = False):
+    if filename.exists() and not overwrite:
+        raise FileExistsError(f'{filename} exists; pass `overwrite=True` to overwrite')
+    with open(filename, 'w', newline='\n') as file:
+        file.write(contents)
+
+
+def fort15_values(contents: str) -> {str: str}:
+    """
+    :param contents: contents of `fort.15`
+    :return: value of each labelled line, by label (the first line of each label)
+    """
+
+    values = {}
+    for line in contents.split('\n'):
+        separator = line.find(' ! ', VALUE_WIDTH)
+        if separator > -1:
+            label = line[separator + 3 :].split(' - ', 1)[0].strip()
+            values.setdefault(label, line[:separator].strip())
+    return values
+
+
+def replace_fort15_values(contents: str, values: {str: str}) -> str:
+    """
+    :param contents: contents of `fort.15`
+    :param values: values of labelled lines to replace, by label
+    :return: contents of `fort.15` with the given lines replaced
+    """
+
+    lines = contents.split('\n')
+    for index, line in enumerate(lines):
+        separator = line.find(' ! ', VALUE_WIDTH)
+        if separator > -1:
+            label = line[separator + 3 :].split(' - ', 1)[0].strip()
+            if label in values:
+                lines[index] = f'{values[label]:<{VALUE_WIDTH}}{line[separator:]}'
+    return '\n'.join(lines)
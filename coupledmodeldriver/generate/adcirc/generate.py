@@ -1,5 +1,5 @@
 import concurrent.futures
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import Future, ProcessPoolExecutor
 from copy import copy, deepcopy
 from datetime import datetime, timedelta
 from enum import Enum
@@ -7,21 +7,46 @@ import logging
 import os
 from os import PathLike
 from pathlib import Path
-from typing import Union
+import shutil
+from typing import Any, Iterable, Iterator, Tuple, Union
 
 from nemspy import ModelingSystem
 
 from coupledmodeldriver import Platform
+from coupledmodeldriver.configure.forcings import BestTrackForcingJSON, TidalForcingJSON
+from coupledmodeldriver.configure.forcings.cache import BestTrackCache, TidalBoundaryCache
+from coupledmodeldriver.generate.adcirc.checkpoint import HotstartPlanner, read_mesh_size
 from coupledmodeldriver.generate.adcirc.configure import (
     ADCIRCRunConfiguration,
     NEMSADCIRCRunConfiguration,
 )
+from coupledmodeldriver.generate.adcirc.fort15 import Fort15Template
+from coupledmodeldriver.generate.adcirc.manifest import GenerationManifest
 from coupledmodeldriver.generate.adcirc.script import (
+    AdcircMeshPartitionJob,
     AdcircRunJob,
     AdcircSetupJob,
     AswipCommand,
 )
-from coupledmodeldriver.script import EnsembleCleanupScript, EnsembleRunScript, SlurmEmailType
+from coupledmodeldriver.generate.adcirc.segment import (
+    detach_hotstart_commands,
+    segment_commands,
+    SEGMENT_FORT15_FILENAME,
+    SEGMENT_JOB_FILENAME,
+    write_segments,
+)
+from coupledmodeldriver.generate.adcirc.spinup import (
+    HOTSTART_FILENAMES,
+    SpinupCache,
+    store_spinup_commands,
+)
+from coupledmodeldriver.script import (
+    EnsembleCleanupScript,
+    EnsembleRunScript,
+    SLURM_ARRAY_FILENAMES,
+    SLURM_ARRAY_LOG_DIRECTORY,
+    SlurmEmailType,
+)
 from coupledmodeldriver.utilities import create_symlink, get_logger, LOGGER
 
 
@@ -37,6 +62,21 @@ def generate_adcirc_configuration(
     overwrite: bool = False,
     parallel: bool = True,
     verbose: bool = False,
+    incremental: bool = False,
+    remove_stale: bool = False,
+    job_array: bool = False,
+    job_array_throttle: int = None,
+    share_partition: bool = False,
+    spinup_cache_directory: PathLike = None,
+    job_registry: bool = False,
+    segment_duration: timedelta = None,
+    throughput: float = None,
+    hotstart_write_bandwidth: float = None,
+    node_failure_rate: float = None,
+    besttrack_cache_directory: PathLike = None,
+    besttrack_cache_ttl: timedelta = None,
+    offline: bool = False,
+    tidal_cache_directory: PathLike = None,
 ):
     """
     Generate ADCIRC run configuration for given variable values.
@@ -47,6 +87,21 @@ def generate_adcirc_configuration(
     :param overwrite: whether to overwrite existing files
     :param parallel: generate configuations concurrently
     :param verbose: whether to show more verbose log messages
+    :param incremental: only regenerate directories whose configuration or input files changed since the last generation
+    :param remove_stale: remove run directories of the last generation that are no longer part of the ensemble
+    :param job_array: submit runs as Slurm job arrays, instead of submitting two jobs for every run
+    :param job_array_throttle: maximum number of array tasks to run at once
+    :param share_partition: partition the mesh once for the whole ensemble, instead of once in every run directory
+    :param spinup_cache_directory: directory of completed tidal spinups shared between ensembles; a matching spinup is linked instead of run again
+    :param job_registry: record the Slurm job IDs of each run in `jobs.txt`, so that `check_completion` can query their states
+    :param segment_duration: maximum wall-clock duration of an ADCIRC job; longer runs are split into a chain of hotstart segments, each depending on the last
+    :param throughput: estimated modeled seconds per wall-clock second, used to size segments and hotstart intervals
+    :param hotstart_write_bandwidth: measured write bandwidth of the platform in megabytes per second, used to plan hotstart intervals
+    :param node_failure_rate: expected failures of each compute node per hour, used to plan hotstart intervals
+    :param besttrack_cache_directory: directory of downloaded best tracks, shared between ensembles
+    :param besttrack_cache_ttl: age after which a cached best track is downloaded again (defaults to never)
+    :param offline: read best tracks only from the cache directory, as a pre-populated mirror
+    :param tidal_cache_directory: directory of tidal constituents interpolated onto mesh boundaries, shared between ensembles
     """
 
     start_time = datetime.now()
@@ -68,6 +123,11 @@ def generate_adcirc_configuration(
     if not output_directory.exists():
         os.makedirs(output_directory, exist_ok=True)
 
+    if offline and besttrack_cache_directory is None:
+        raise ValueError(
+            'offline generation requires a best track cache directory to read from'
+        )
+
     if configuration_directory.absolute().resolve() != Path.cwd():
         starting_directory = Path.cwd()
         os.chdir(configuration_directory)
@@ -75,151 +135,216 @@ def generate_adcirc_configuration(
     else:
         starting_directory = None
 
-    use_nems = 'configure_nems.json' in [
-        filename.name.lower() for filename in configuration_directory.iterdir()
-    ]
-
-    if use_nems:
-        LOGGER.debug(f'generating NEMS configuration')
-        base_configuration = NEMSADCIRCRunConfiguration.read_directory(configuration_directory)
+    if besttrack_cache_directory is not None:
+        besttrack_cache = BestTrackCache(
+            besttrack_cache_directory, ttl=besttrack_cache_ttl, offline=offline
+        )
     else:
-        LOGGER.debug(f'generating ADCIRC-only configuration')
-        base_configuration = ADCIRCRunConfiguration.read_directory(configuration_directory)
+        besttrack_cache = BestTrackForcingJSON.cache
+    previous_besttrack_cache = BestTrackForcingJSON.cache
+    BestTrackForcingJSON.cache = besttrack_cache
+
+    previous_tidal_cache = TidalForcingJSON.cache
+    if tidal_cache_directory is not None:
+        TidalForcingJSON.cache = TidalBoundaryCache(tidal_cache_directory)
+    tidal_cache = TidalForcingJSON.cache
+
+    # the caches (and working directory) are restored even if generation fails
+    try:
+        use_nems = 'configure_nems.json' in [
+            filename.name.lower() for filename in configuration_directory.iterdir()
+        ]
+
+        if use_nems:
+            LOGGER.debug(f'generating NEMS configuration')
+            base_configuration = NEMSADCIRCRunConfiguration.read_directory(
+                configuration_directory
+            )
+        else:
+            LOGGER.debug(f'generating ADCIRC-only configuration')
+            base_configuration = ADCIRCRunConfiguration.read_directory(configuration_directory)
 
-    base_configuration.move_paths(configuration_directory)
+        base_configuration.move_paths(configuration_directory)
 
-    platform = base_configuration['modeldriver']['platform']
+        platform = base_configuration['modeldriver']['platform']
 
-    job_duration = base_configuration['slurm']['job_duration']
-    partition = base_configuration['slurm']['partition']
-    email_type = base_configuration['slurm']['email_type']
-    email_address = base_configuration['slurm']['email_address']
+        job_duration = base_configuration['slurm']['job_duration']
+        partition = base_configuration['slurm']['partition']
+        email_type = base_configuration['slurm']['email_type']
+        email_address = base_configuration['slurm']['email_address']
 
-    original_fort13_filename = base_configuration['adcirc']['fort_13_path']
-    original_fort14_filename = base_configuration['adcirc']['fort_14_path']
-    adcirc_processors = base_configuration['adcirc']['processors']
-    spinup_duration = base_configuration['adcirc']['tidal_spinup_duration']
-    use_original_mesh = base_configuration['adcirc']['use_original_mesh']
+        original_fort13_filename = base_configuration['adcirc']['fort_13_path']
+        original_fort14_filename = base_configuration['adcirc']['fort_14_path']
+        adcirc_processors = base_configuration['adcirc']['processors']
+        spinup_duration = base_configuration['adcirc']['tidal_spinup_duration']
+        use_original_mesh = base_configuration['adcirc']['use_original_mesh']
 
-    if original_fort14_filename is None or not original_fort14_filename.exists():
-        raise FileNotFoundError(f'mesh XY not found at "{original_fort14_filename}"')
+        if original_fort14_filename is None or not original_fort14_filename.exists():
+            raise FileNotFoundError(f'mesh XY not found at "{original_fort14_filename}"')
 
-    local_fort13_filename = output_directory / 'fort.13'
-    local_fort14_filename = output_directory / 'fort.14'
-    local_fort15_filename = output_directory / 'fort.15'
+        local_fort13_filename = output_directory / 'fort.13'
+        local_fort14_filename = output_directory / 'fort.14'
+        local_fort15_filename = output_directory / 'fort.15'
 
-    do_spinup = spinup_duration is not None
+        do_spinup = spinup_duration is not None
 
-    run_phase = 'HOTSTART' if do_spinup else 'COLDSTART'
+        run_phase = 'HOTSTART' if do_spinup else 'COLDSTART'
 
-    slurm_account = platform.value['slurm_account']
+        slurm_account = platform.value['slurm_account']
 
-    ensemble_run_script_filename = output_directory / f'run_{platform.name.lower()}.sh'
-    ensemble_cleanup_script_filename = output_directory / f'cleanup.sh'
+        ensemble_run_script_filename = output_directory / f'run_{platform.name.lower()}.sh'
+        ensemble_cleanup_script_filename = output_directory / f'cleanup.sh'
 
-    if 'besttrack' in base_configuration:
-        nws = base_configuration['besttrack']['nws']
-        use_aswip = nws in [8, 19, 20, 21]
-        if use_aswip and base_configuration['adcirc']['aswip_executable_path'] is None:
+        if 'besttrack' in base_configuration:
+            nws = base_configuration['besttrack']['nws']
+            use_aswip = nws in [8, 19, 20, 21]
+            if use_aswip and base_configuration['adcirc']['aswip_executable_path'] is None:
+                use_aswip = False
+                LOGGER.warning(
+                    f'wind parameter {nws} but no `aswip` executable given; `aswip` will not be used'
+                )
+        else:
             use_aswip = False
-            LOGGER.warning(
-                f'wind parameter {nws} but no `aswip` executable given; `aswip` will not be used'
-            )
-    else:
-        use_aswip = False
 
-    if use_original_mesh:
-        LOGGER.info(
-            f'using original mesh from "{os.path.relpath(original_fort14_filename.resolve(), Path.cwd())}"'
-        )
-        if original_fort13_filename.exists():
-            create_symlink(original_fort13_filename, local_fort13_filename)
-        create_symlink(original_fort14_filename, local_fort14_filename)
-    else:
-        LOGGER.info(
-            f'rewriting original mesh to "{os.path.relpath(local_fort14_filename.resolve(), Path.cwd())}"'
-        )
-        adcircpy_driver = base_configuration.adcircpy_driver
-        try:
-            adcircpy_driver.write(
-                output_directory,
-                overwrite=overwrite,
-                fort13='fort.13' if original_fort13_filename.exists() else None,
-                fort14='fort.14',
-                fort15='fort.15',
-                fort22=None,
-                coldstart=None,
-                hotstart=None,
-                driver=None,
+        if segment_duration is not None and throughput is None:
+            raise ValueError(
+                'segmenting runs requires both a segment duration and a throughput'
+            )
+        if (hotstart_write_bandwidth is None) != (node_failure_rate is None) or (
+            hotstart_write_bandwidth is not None and throughput is None
+        ):
+            raise ValueError(
+                'planning hotstart intervals requires a write bandwidth, a node failure rate, and a throughput'
             )
-        except Exception as error:
-            LOGGER.warning(error)
-
-    if local_fort15_filename.exists():
-        os.remove(local_fort15_filename)
-
-    if local_fort13_filename.exists():
-        base_configuration['adcirc']['fort_13_path'] = local_fort13_filename
-    if local_fort14_filename.exists():
-        base_configuration['adcirc']['fort_14_path'] = local_fort14_filename
-
-    runs_directory = output_directory / 'runs'
-    if not runs_directory.exists():
-        runs_directory.mkdir(parents=True, exist_ok=True)
-
-    perturbations = base_configuration.perturb()
-
-    LOGGER.info(
-        f'generating {len(perturbations)} run configuration(s) in "{os.path.relpath(runs_directory.resolve(), Path.cwd())}"'
-    )
 
-    if parallel:
-        process_pool = ProcessPoolExecutor()
-        LOGGER.info(f'leveraging {os.cpu_count()} processor(s)')
-    else:
-        process_pool = None
+        segmented = segment_duration is not None
+        if segmented and use_nems:
+            LOGGER.warning('NEMS runs cannot be segmented; runs will not be segmented')
+            segmented = False
+            segment_duration = None
+        if segmented and job_array:
+            # job array tasks cannot each depend on a different number of segments
+            LOGGER.warning(
+                'segmented runs cannot be submitted as job arrays; job arrays will not be used'
+            )
+            job_array = False
+
+        if hotstart_write_bandwidth is not None:
+            mesh_nodes, mesh_elements = read_mesh_size(original_fort14_filename)
+            hotstart_planner = HotstartPlanner(
+                nodes=mesh_nodes,
+                elements=mesh_elements,
+                write_bandwidth=hotstart_write_bandwidth,
+                node_failure_rate=node_failure_rate,
+                throughput=throughput,
+                platform=platform,
+            )
+            LOGGER.info(
+                f'planning hotstart output every {hotstart_planner.interval(adcirc_processors)} of wall-clock time '
+                f'({hotstart_planner.write_duration} to write a hotstart file of {mesh_nodes} nodes)'
+            )
+        else:
+            hotstart_planner = None
 
-    futures = []
+        manifest = GenerationManifest(output_directory / 'manifest.json')
+        base_digest = manifest.configuration_hash(
+            base_configuration, relative_paths=relative_paths, use_nems=use_nems
+        )
+        manifest.record('.', base_digest)
 
-    if do_spinup:
-        spinup_directory = output_directory / 'spinup'
+        if use_original_mesh:
+            LOGGER.info(
+                f'using original mesh from "{os.path.relpath(original_fort14_filename.resolve(), Path.cwd())}"'
+            )
+            if original_fort13_filename.exists():
+                create_symlink(original_fort13_filename, local_fort13_filename)
+            create_symlink(original_fort14_filename, local_fort14_filename)
+        elif (
+            incremental
+            and manifest.is_unchanged('.', base_digest, local_fort14_filename)
+            and (local_fort13_filename.exists() or not original_fort13_filename.exists())
+        ):
+            LOGGER.info(
+                f'mesh unchanged at "{os.path.relpath(local_fort14_filename.resolve(), Path.cwd())}"'
+            )
+            # read the mesh from the original file, as if it had been rewritten
+            base_configuration['adcirc'].base_mesh = original_fort14_filename
+        else:
+            LOGGER.info(
+                f'rewriting original mesh to "{os.path.relpath(local_fort14_filename.resolve(), Path.cwd())}"'
+            )
+            adcircpy_driver = base_configuration.adcircpy_driver
+            try:
+                adcircpy_driver.write(
+                    output_directory,
+                    overwrite=overwrite,
+                    fort13='fort.13' if original_fort13_filename.exists() else None,
+                    fort14='fort.14',
+                    fort15='fort.15',
+                    fort22=None,
+                    coldstart=None,
+                    hotstart=None,
+                    driver=None,
+                )
+            except Exception as error:
+                LOGGER.warning(error)
 
-        spinup_kwargs = {
-            'directory': spinup_directory,
-            'configuration': copy(base_configuration),
-            'duration': spinup_duration,
-            'relative_paths': relative_paths,
-            'overwrite': overwrite,
-            'use_original_mesh': use_original_mesh,
-            'local_fort13_filename': local_fort13_filename,
-            'local_fort14_filename': local_fort14_filename,
-            'platform': platform,
-            'adcirc_processors': adcirc_processors,
-            'slurm_account': slurm_account,
-            'job_duration': job_duration,
-            'partition': partition,
-            'use_aswip': use_aswip,
-            'email_type': email_type,
-            'email_address': email_address,
-            'use_nems': use_nems,
-        }
+        if local_fort15_filename.exists():
+            os.remove(local_fort15_filename)
 
-        if parallel:
-            futures.append(process_pool.submit(write_spinup_directory, **spinup_kwargs))
+        if local_fort13_filename.exists():
+            base_configuration['adcirc']['fort_13_path'] = local_fort13_filename
+        if local_fort14_filename.exists():
+            base_configuration['adcirc']['fort_14_path'] = local_fort14_filename
+
+        runs_directory = output_directory / 'runs'
+        if not runs_directory.exists():
+            runs_directory.mkdir(parents=True, exist_ok=True)
+
+        perturbations = base_configuration['modeldriver']['perturbations']
+
+        run_spinup = do_spinup
+        spinup_cache_entry = None
+        if do_spinup:
+            spinup_directory = output_directory / 'spinup'
+            if spinup_cache_directory is not None:
+                spinup_cache = SpinupCache(spinup_cache_directory)
+                spinup_key = spinup_cache.key(base_configuration, manifest)
+                if spinup_cache.is_complete(spinup_key):
+                    # runs hotstart from the cached spinup, so no spinup needs to be written or submitted
+                    spinup_directory = spinup_cache.entry(spinup_key)
+                    run_spinup = False
+                    LOGGER.info(f'using cached spinup "{spinup_directory}"')
+                else:
+                    spinup_cache_entry = spinup_cache.entry(spinup_key)
+                    LOGGER.info(f'spinup will be stored in cache "{spinup_cache_entry}"')
         else:
-            spinup_directory = write_spinup_directory(**spinup_kwargs)
-            LOGGER.info(f'wrote configuration to "{spinup_directory}"')
-    else:
-        spinup_directory = None
-
-    for run_name, run_configuration in perturbations.items():
-        run_directory = runs_directory / run_name
+            spinup_directory = None
+
+        if share_partition:
+            # every run uses the same mesh and number of processors, so `adcprep --partmesh` gives the same result
+            mesh_partition_directory = write_mesh_partition_directory(
+                directory=output_directory / MESH_PARTITION_DIRECTORY,
+                configuration=base_configuration,
+                local_fort14_filename=local_fort14_filename,
+                relative_paths=relative_paths,
+                overwrite=overwrite,
+                platform=platform,
+                adcirc_processors=adcirc_processors,
+                slurm_account=slurm_account,
+                job_duration=job_duration,
+                partition=partition,
+                email_type=email_type,
+                email_address=email_address,
+            )
+            LOGGER.info(
+                f'wrote mesh partition configuration to "{os.path.relpath(mesh_partition_directory.resolve(), Path.cwd())}"'
+            )
+        else:
+            mesh_partition_directory = None
 
         run_kwargs = {
-            'directory': run_directory,
-            'name': run_name,
             'phase': run_phase,
-            'configuration': run_configuration,
             'relative_paths': relative_paths,
             'overwrite': overwrite,
             'use_original_mesh': use_original_mesh,
@@ -236,43 +361,308 @@ def generate_adcirc_configuration(
             'use_nems': use_nems,
             'do_spinup': do_spinup,
             'spinup_directory': spinup_directory,
+            'mesh_partition_directory': mesh_partition_directory,
+            'segment_duration': segment_duration,
+            'throughput': throughput if segmented else None,
+            'hotstart_planner': hotstart_planner,
         }
 
-        if parallel:
-            futures.append(process_pool.submit(write_run_directory, **run_kwargs))
+        if run_spinup:
+            spinup_kwargs = {
+                'directory': spinup_directory,
+                'duration': spinup_duration,
+                'relative_paths': relative_paths,
+                'overwrite': overwrite,
+                'use_original_mesh': use_original_mesh,
+                'local_fort13_filename': local_fort13_filename,
+                'local_fort14_filename': local_fort14_filename,
+                'platform': platform,
+                'adcirc_processors': adcirc_processors,
+                'slurm_account': slurm_account,
+                'job_duration': job_duration,
+                'partition': partition,
+                'use_aswip': use_aswip,
+                'email_type': email_type,
+                'email_address': email_address,
+                'use_nems': use_nems,
+                'mesh_partition_directory': mesh_partition_directory,
+                'spinup_cache_entry': spinup_cache_entry,
+            }
+
+            spinup_digest = manifest.hash(base_digest, **spinup_kwargs)
+            if incremental and manifest.is_unchanged(
+                'spinup', spinup_digest, spinup_directory
+            ):
+                LOGGER.info(
+                    f'spinup configuration unchanged at "{os.path.relpath(spinup_directory.resolve(), Path.cwd())}"'
+                )
+                manifest.record('spinup', spinup_digest)
+                do_write_spinup = False
+            else:
+                do_write_spinup = True
         else:
-            write_run_directory(**run_kwargs)
-            LOGGER.info(f'wrote configuration to "{run_directory}"')
+            spinup_kwargs = None
+            spinup_digest = None
+            do_write_spinup = False
+
+        # runs are keyed by their directory relative to the output directory
+        run_digests = {}
+        for run_name, run_perturbations in perturbations.items():
+            run_digest = manifest.hash(base_digest, run_name, run_perturbations, **run_kwargs)
+            run_directory = runs_directory / run_name
+            if incremental and manifest.is_unchanged(
+                f'runs/{run_name}', run_digest, run_directory
+            ):
+                manifest.record(f'runs/{run_name}', run_digest)
+            else:
+                run_digests[run_name] = run_digest
+
+        if len(run_digests) < len(perturbations):
+            LOGGER.info(
+                f'{len(perturbations) - len(run_digests)} run configuration(s) unchanged since last generation'
+            )
 
-    if parallel:
-        for completed_future in concurrent.futures.as_completed(futures):
-            LOGGER.info(f'wrote configuration to "{completed_future.result()}"')
+        LOGGER.info(
+            f'generating {len(run_digests)} run configuration(s) in "{os.path.relpath(runs_directory.resolve(), Path.cwd())}"'
+        )
 
-    cleanup_script = EnsembleCleanupScript()
-    LOGGER.debug(
-        f'writing cleanup script "{os.path.relpath(ensemble_cleanup_script_filename.resolve(), Path.cwd())}"'
-    )
-    cleanup_script.write(filename=ensemble_cleanup_script_filename, overwrite=overwrite)
+        parallel = parallel and (do_write_spinup or len(run_digests) > 0)
 
-    LOGGER.info(
-        f'writing ensemble run script "{os.path.relpath(ensemble_run_script_filename.resolve(), Path.cwd())}"'
-    )
-    run_job_script = EnsembleRunScript(
-        platform=platform,
-        commands=[
-            'echo deleting previous ADCIRC output',
-            f'sh {ensemble_cleanup_script_filename.name}',
-        ],
-        run_spinup=do_spinup,
-    )
-    run_job_script.write(ensemble_run_script_filename, overwrite=overwrite)
+        if parallel:
+            # parse the mesh once and let worker processes attach to it, instead of sending each one a copy
+            shared_mesh = base_configuration['adcirc'].share_base_mesh()
+
+            # each worker loads the base configuration once; tasks only carry the perturbations of each run
+            max_workers = os.cpu_count()
+            process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=initialize_worker,
+                initargs=(base_configuration, run_kwargs, besttrack_cache, tidal_cache),
+            )
+            LOGGER.info(f'leveraging {max_workers} processor(s)')
+
+            def submissions() -> Iterator[Tuple[Future, Tuple[str, str]]]:
+                if do_write_spinup:
+                    spinup_kwargs['configuration'] = copy(base_configuration)
+                    yield (
+                        process_pool.submit(write_spinup_directory, **spinup_kwargs),
+                        ('spinup', spinup_digest),
+                    )
+                for run_name, run_digest in run_digests.items():
+                    yield (
+                        process_pool.submit(
+                            write_perturbed_run_directory,
+                            run_name,
+                            perturbations[run_name],
+                            runs_directory / run_name,
+                        ),
+                        (f'runs/{run_name}', run_digest),
+                    )
+
+            try:
+                # runs are submitted lazily, keeping the number of queued tasks (and their results) bounded
+                for completed_future, entry in bounded_as_completed(
+                    submissions(), limit=MAX_TASKS_PER_WORKER * max_workers
+                ):
+                    LOGGER.info(f'wrote configuration to "{completed_future.result()}"')
+                    manifest.record(*entry)
+            finally:
+                process_pool.shutdown()
+                shared_mesh.close()
+        else:
+            if do_write_spinup:
+                spinup_kwargs['configuration'] = copy(base_configuration)
+                spinup_directory = write_spinup_directory(**spinup_kwargs)
+                manifest.record('spinup', spinup_digest)
+                LOGGER.info(f'wrote configuration to "{spinup_directory}"')
+
+            if len(run_digests) > 0:
+                fort15_template = create_fort15_template(base_configuration)
+
+                # perturbed configurations are created one at a time, as each run is written
+                for run_name, run_configuration in base_configuration.iterate_perturbed(
+                    runs=run_digests
+                ):
+                    run_directory = runs_directory / run_name
+                    write_run_directory(
+                        directory=run_directory,
+                        name=run_name,
+                        configuration=run_configuration,
+                        fort15_template=fort15_template,
+                        **run_kwargs,
+                    )
+                    manifest.record(f'runs/{run_name}', run_digests[run_name])
+                    LOGGER.info(f'wrote configuration to "{run_directory}"')
+
+        for stale_entry in manifest.stale:
+            stale_directory = output_directory / stale_entry
+            if stale_entry.startswith('runs/') and stale_directory.exists():
+                if remove_stale:
+                    LOGGER.info(
+                        f'removing stale run directory "{os.path.relpath(stale_directory.resolve(), Path.cwd())}"'
+                    )
+                    shutil.rmtree(stale_directory)
+                else:
+                    LOGGER.warning(
+                        f'run directory "{os.path.relpath(stale_directory.resolve(), Path.cwd())}" is no longer part of the ensemble'
+                    )
+                    manifest.record(stale_entry, manifest.previous_entries[stale_entry])
+
+        manifest.write()
+
+        if job_array and not platform.value['uses_slurm']:
+            LOGGER.warning(f'{platform.name} does not use Slurm; job arrays will not be used')
+            job_array = False
+
+        if job_array:
+            LOGGER.info(
+                f'writing Slurm job array scripts to "{os.path.relpath(output_directory.resolve(), Path.cwd())}"'
+            )
+            write_job_array_scripts(
+                directory=output_directory,
+                configuration=base_configuration,
+                # run directories are all at the same depth, so relative paths are the same for every run
+                run_directory=runs_directory / 'run',
+                phase=run_phase,
+                relative_paths=relative_paths,
+                overwrite=overwrite,
+                platform=platform,
+                adcirc_processors=adcirc_processors,
+                slurm_account=slurm_account,
+                job_duration=job_duration,
+                partition=partition,
+                use_aswip=use_aswip,
+                email_type=email_type,
+                email_address=email_address,
+                use_nems=use_nems,
+                mesh_partition_directory=mesh_partition_directory,
+            )
+
+        cleanup_script = EnsembleCleanupScript(shared_partition=share_partition)
+        LOGGER.debug(
+            f'writing cleanup script "{os.path.relpath(ensemble_cleanup_script_filename.resolve(), Path.cwd())}"'
+        )
+        cleanup_script.write(filename=ensemble_cleanup_script_filename, overwrite=overwrite)
+
+        LOGGER.info(
+            f'writing ensemble run script "{os.path.relpath(ensemble_run_script_filename.resolve(), Path.cwd())}"'
+        )
+        run_job_script = EnsembleRunScript(
+            platform=platform,
+            commands=[
+                'echo deleting previous ADCIRC output',
+                f'sh {ensemble_cleanup_script_filename.name}',
+            ],
+            run_spinup=run_spinup,
+            job_array=job_array,
+            job_array_throttle=job_array_throttle,
+            shared_partition=share_partition,
+            job_registry=job_registry,
+            segmented=segmented,
+        )
+        run_job_script.write(ensemble_run_script_filename, overwrite=overwrite)
+    finally:
+        BestTrackForcingJSON.cache = previous_besttrack_cache
+        TidalForcingJSON.cache = previous_tidal_cache
 
-    if starting_directory is not None:
-        os.chdir(starting_directory)
+        if starting_directory is not None:
+            os.chdir(starting_directory)
 
     LOGGER.info(f'finished in {datetime.now() - start_time}')
 
 
+# state loaded once in each worker process by `initialize_worker`
+WORKER_STATE = {}
+
+# number of tasks queued at a time for each worker process
+MAX_TASKS_PER_WORKER = 2
+
+# directory, relative to the output directory, in which the mesh is partitioned for all runs
+MESH_PARTITION_DIRECTORY = 'partition'
+
+
+def bounded_as_completed(
+    submissions: Iterable[Tuple[Future, Any]], limit: int
+) -> Iterator[Tuple[Future, Any]]:
+    """
+    consume lazily-submitted futures, keeping at most the given number in flight
+
+    :param submissions: iterable that submits a task on each iteration, yielding its future and a key
+    :param limit: maximum number of futures in flight
+    :return: generator of completed futures and their keys, in order of completion
+    """
+
+    in_flight = {}
+    for future, key in submissions:
+        in_flight[future] = key
+        if len(in_flight) >= limit:
+            completed_futures, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for completed_future in completed_futures:
+                yield completed_future, in_flight.pop(completed_future)
+
+    for completed_future in concurrent.futures.as_completed(list(in_flight)):
+        yield completed_future, in_flight.pop(completed_future)
+
+
+def initialize_worker(
+    configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration],
+    run_kwargs: {str: Any},
+    besttrack_cache: BestTrackCache = None,
+    tidal_cache: TidalBoundaryCache = None,
+):
+    """
+    load the unperturbed configuration (mesh, nodal attributes, and forcings) once per worker process
+
+    :param configuration: unperturbed run configuration
+    :param run_kwargs: keyword arguments to `write_run_directory` shared by all runs
+    :param besttrack_cache: cache of downloaded best tracks
+    :param tidal_cache: cache of tidal constituents interpolated onto mesh boundaries
+    """
+
+    BestTrackForcingJSON.cache = besttrack_cache
+    TidalForcingJSON.cache = tidal_cache
+    configuration['adcirc'].preload()
+    WORKER_STATE['configuration'] = configuration
+    WORKER_STATE['run_kwargs'] = {
+        **run_kwargs,
+        'fort15_template': create_fort15_template(configuration),
+    }
+
+
+def create_fort15_template(
+    configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration]
+) -> Fort15Template:
+    try:
+        return Fort15Template(configuration)
+    except Exception as error:
+        LOGGER.warning(
+            f'could not render `fort.15` template; rendering every run in full: {error}'
+        )
+
+
+def write_perturbed_run_directory(
+    name: str, perturbations: {str: {str: Any}}, directory: PathLike
+) -> Path:
+    """
+    write a run directory from the configuration loaded by `initialize_worker`
+
+    :param name: name of run
+    :param perturbations: dictionary of configuration names to parameter values
+    :param directory: path to run directory
+    :return: path to run directory
+    """
+
+    configuration = WORKER_STATE['configuration'].perturbed(perturbations)
+    return write_run_directory(
+        directory=directory,
+        name=name,
+        configuration=configuration,
+        **WORKER_STATE['run_kwargs'],
+    )
+
+
 def write_spinup_directory(
     directory: PathLike,
     configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration],
@@ -291,6 +681,8 @@ def write_spinup_directory(
     email_type: SlurmEmailType = None,
     email_address: str = None,
     use_nems: bool = False,
+    mesh_partition_directory: PathLike = None,
+    spinup_cache_entry: PathLike = None,
 ) -> Path:
     if not isinstance(directory, Path):
         directory = Path(directory)
@@ -332,6 +724,9 @@ def write_spinup_directory(
     adcprep_path = update_path_relative(adcprep_path, relative_paths, directory)
     aswip_path = update_path_relative(aswip_path, relative_paths, directory)
     source_filename = update_path_relative(source_filename, relative_paths, directory)
+    mesh_partition_directory = update_path_relative(
+        mesh_partition_directory, relative_paths, directory
+    )
 
     setup_script_filename = directory / 'setup.job'
     job_script_filename = directory / 'adcirc.job'
@@ -355,6 +750,7 @@ def write_spinup_directory(
         slurm_error_filename=f'{setup_job_name}.err.log',
         slurm_log_filename=f'{setup_job_name}.out.log',
         source_filename=source_filename,
+        mesh_partition_directory=mesh_partition_directory,
     )
 
     job_script = AdcircRunJob(
@@ -372,6 +768,12 @@ def write_spinup_directory(
         source_filename=source_filename,
     )
 
+    if spinup_cache_entry is not None:
+        spinup_cache_entry = update_path_relative(
+            spinup_cache_entry, relative_paths, directory
+        )
+        job_script.commands.extend(store_spinup_commands(spinup_cache_entry))
+
     setup_script.write(setup_script_filename, overwrite=overwrite)
     job_script.write(job_script_filename, overwrite=overwrite)
 
@@ -427,7 +829,18 @@ def write_run_directory(
     use_nems: bool = False,
     do_spinup: bool = False,
     spinup_directory: PathLike = None,
+    fort15_template: Fort15Template = None,
+    mesh_partition_directory: PathLike = None,
+    segment_duration: timedelta = None,
+    throughput: float = None,
+    hotstart_planner: HotstartPlanner = None,
 ) -> Path:
+    """
+    :param segment_duration: maximum wall-clock duration of an ADCIRC job; longer runs are split into a chain of hotstart segments
+    :param throughput: estimated modeled seconds per wall-clock second, used to size segments
+    :param hotstart_planner: planner of the hotstart output interval, used unless `NHSTAR` or `NHSINC` is set
+    """
+
     if not isinstance(directory, Path):
         directory = Path(directory)
     if spinup_directory is not None and not isinstance(spinup_directory, Path):
@@ -444,7 +857,39 @@ def write_run_directory(
     setup_job_name = f'ADCIRC_SETUP_{name}'
     job_name = f'ADCIRC_{phase}_{name}'
 
-    adcircpy_driver = configuration.adcircpy_driver
+    run_duration = (
+        configuration['adcirc']['modeled_end_time']
+        - configuration['adcirc']['modeled_start_time']
+    )
+
+    attributes = configuration['adcirc']['attributes']
+    if (
+        hotstart_planner is not None
+        and attributes.get('NHSTAR') is None
+        and attributes.get('NHSINC') is None
+    ):
+        hotstart_attributes = hotstart_planner.attributes(
+            processors=configuration.nemspy_modeling_system.processors
+            if use_nems
+            else adcirc_processors,
+            timestep=configuration['adcirc']['modeled_timestep'],
+            run_duration=run_duration,
+        )
+        if len(hotstart_attributes) > 0:
+            LOGGER.debug(
+                f'writing hotstart files every {hotstart_attributes["NHSINC"]} timesteps'
+            )
+            configuration['adcirc']['attributes'] = {**attributes, **hotstart_attributes}
+
+    if fort15_template is not None:
+        template_attributes = fort15_template.perturbed_attributes(configuration)
+    else:
+        template_attributes = None
+
+    if template_attributes is not None:
+        adcircpy_driver = None
+    else:
+        adcircpy_driver = configuration.adcircpy_driver
 
     if relative_paths:
         configuration.relative_to(directory, inplace=True)
@@ -466,6 +911,9 @@ def write_run_directory(
     adcprep_path = update_path_relative(adcprep_path, relative_paths, directory)
     aswip_path = update_path_relative(aswip_path, relative_paths, directory)
     source_filename = update_path_relative(source_filename, relative_paths, directory)
+    mesh_partition_directory = update_path_relative(
+        mesh_partition_directory, relative_paths, directory
+    )
 
     setup_script_filename = directory / 'setup.job'
     job_script_filename = directory / 'adcirc.job'
@@ -489,8 +937,13 @@ def write_run_directory(
         slurm_error_filename=f'{setup_job_name}.err.log',
         slurm_log_filename=f'{setup_job_name}.out.log',
         source_filename=source_filename,
+        mesh_partition_directory=mesh_partition_directory,
     )
 
+    segmented = segment_duration is not None and throughput is not None
+    if segmented:
+        job_duration = segment_duration
+
     job_script = AdcircRunJob(
         platform=platform,
         slurm_tasks=processors,
@@ -506,9 +959,6 @@ def write_run_directory(
         source_filename=source_filename,
     )
 
-    setup_script.write(setup_script_filename, overwrite=overwrite)
-    job_script.write(job_script_filename, overwrite=overwrite)
-
     if use_nems:
         nems.write(
             directory, overwrite=overwrite, include_version=True,
@@ -520,23 +970,36 @@ def write_run_directory(
         LOGGER.debug(
             f'writing ADCIRC run configuration to "{os.path.relpath(directory.resolve(), Path.cwd())}"'
         )
-    adcircpy_driver.write(
-        directory,
-        overwrite=overwrite,
-        fort13=None if use_original_mesh else 'fort.13',
-        fort14=None,
-        fort22='fort.22' if 'besttrack' in configuration else None,
-        coldstart=None,
-        hotstart='fort.15',
-        driver=None,
-    )
+    if template_attributes is not None:
+        LOGGER.debug(
+            f'writing `fort.15` from template with {len(template_attributes)} change(s)'
+        )
+        fort15_template.write(
+            directory,
+            template_attributes,
+            overwrite=overwrite,
+            fort13=None if use_original_mesh else 'fort.13',
+            fort15='fort.15',
+            fort22='fort.22' if 'besttrack' in configuration else None,
+        )
+    else:
+        adcircpy_driver.write(
+            directory,
+            overwrite=overwrite,
+            fort13=None if use_original_mesh else 'fort.13',
+            fort14=None,
+            fort22='fort.22' if 'besttrack' in configuration else None,
+            coldstart=None,
+            hotstart='fort.15',
+            driver=None,
+        )
     if use_original_mesh:
         if local_fort13_filename.exists():
             create_symlink(local_fort13_filename, directory / 'fort.13', relative=True)
     create_symlink(local_fort14_filename, directory / 'fort.14', relative=True)
 
     if do_spinup:
-        for hotstart_filename in ['fort.67.nc', 'fort.68.nc']:
+        for hotstart_filename in HOTSTART_FILENAMES:
             try:
                 create_symlink(
                     spinup_directory / hotstart_filename,
@@ -549,6 +1012,214 @@ def write_run_directory(
                     'you must manually link or copy this file after coldstart completes'
                 )
 
+    if segmented:
+        segment_fort15_filenames = write_segments(
+            directory,
+            maximum_duration=segment_duration,
+            throughput=throughput,
+            run_duration=run_duration,
+            overwrite=overwrite,
+        )
+    else:
+        segment_fort15_filenames = []
+
+    if len(segment_fort15_filenames) > 0:
+        # the first segment writes hotstart files, which must not overwrite those of the spinup
+        job_script.commands[-1:-1] = detach_hotstart_commands()
+
+    setup_script.write(setup_script_filename, overwrite=overwrite)
+    job_script.write(job_script_filename, overwrite=overwrite)
+
+    # segments of a previous generation would otherwise be submitted by the run script
+    for filename_pattern in [SEGMENT_FORT15_FILENAME, SEGMENT_JOB_FILENAME]:
+        for filename in directory.glob(filename_pattern.format('*')):
+            if filename.name not in [
+                filename_pattern.format(segment)
+                for segment in range(2, len(segment_fort15_filenames) + 2)
+            ]:
+                os.remove(filename)
+
+    for segment, segment_fort15_filename in enumerate(segment_fort15_filenames, start=2):
+        segment_job_name = f'{job_name}_SEGMENT_{segment}'
+        segment_script = AdcircRunJob(
+            platform=platform,
+            slurm_tasks=processors,
+            slurm_account=slurm_account,
+            slurm_duration=segment_duration,
+            slurm_run_name=segment_job_name,
+            executable=model_executable,
+            commands=segment_commands(
+                segment_fort15_filename, setup_script.adcprep_path, adcirc_processors
+            ),
+            slurm_partition=partition,
+            slurm_email_type=email_type,
+            slurm_email_address=email_address,
+            slurm_error_filename=f'{segment_job_name}.err.log',
+            slurm_log_filename=f'{segment_job_name}.out.log',
+            source_filename=source_filename,
+        )
+        segment_script.write(
+            directory / SEGMENT_JOB_FILENAME.format(segment), overwrite=overwrite
+        )
+
+    return directory
+
+
+def write_job_array_scripts(
+    directory: PathLike,
+    configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration],
+    run_directory: PathLike,
+    phase: str,
+    relative_paths: bool = False,
+    overwrite: bool = False,
+    platform: Platform = None,
+    adcirc_processors: int = None,
+    slurm_account: str = None,
+    job_duration: timedelta = None,
+    partition: str = None,
+    use_aswip: bool = False,
+    email_type: SlurmEmailType = None,
+    email_address: str = None,
+    use_nems: bool = False,
+    mesh_partition_directory: PathLike = None,
+) -> (Path, Path):
+    """
+    write setup and run job scripts for all runs, to be submitted as Slurm job arrays indexed over run directories
+
+    :param directory: ensemble directory, from which job arrays are submitted
+    :param configuration: unperturbed run configuration
+    :param run_directory: path to any run directory, to which paths are made relative
+    :return: paths to setup and run job array scripts
+    """
+
+    if not isinstance(directory, Path):
+        directory = Path(directory)
+
+    setup_job_name = 'ADCIRC_SETUP'
+    job_name = f'ADCIRC_{phase}'
+
+    if use_nems:
+        processors = configuration.nemspy_modeling_system.processors
+        model_executable = configuration['nems']['executable_path']
+    else:
+        processors = adcirc_processors
+        model_executable = configuration['adcirc']['adcirc_executable_path']
+
+    adcprep_path = configuration['adcirc']['adcprep_executable_path']
+    aswip_path = configuration['adcirc']['aswip_executable_path']
+    source_filename = configuration['adcirc']['source_filename']
+
+    model_executable = update_path_relative(model_executable, relative_paths, run_directory)
+    adcprep_path = update_path_relative(adcprep_path, relative_paths, run_directory)
+    aswip_path = update_path_relative(aswip_path, relative_paths, run_directory)
+    source_filename = update_path_relative(source_filename, relative_paths, run_directory)
+    mesh_partition_directory = update_path_relative(
+        mesh_partition_directory, relative_paths, run_directory
+    )
+
+    setup_script_filename = directory / SLURM_ARRAY_FILENAMES['setup']
+    job_script_filename = directory / SLURM_ARRAY_FILENAMES['adcirc']
+
+    if use_aswip:
+        aswip_command = AswipCommand(path=aswip_path, nws=configuration['besttrack']['nws'])
+    else:
+        aswip_command = None
+
+    setup_script = AdcircSetupJob(
+        platform=platform,
+        adcirc_mesh_partitions=adcirc_processors,
+        slurm_account=slurm_account,
+        slurm_duration=job_duration,
+        slurm_partition=partition,
+        slurm_run_name=setup_job_name,
+        adcprep_path=adcprep_path,
+        aswip_command=aswip_command,
+        slurm_email_type=email_type,
+        slurm_email_address=email_address,
+        slurm_error_filename=f'{SLURM_ARRAY_LOG_DIRECTORY}/{setup_job_name}_%A_%a.err.log',
+        slurm_log_filename=f'{SLURM_ARRAY_LOG_DIRECTORY}/{setup_job_name}_%A_%a.out.log',
+        source_filename=source_filename,
+        slurm_array_directories='runs/*/',
+        mesh_partition_directory=mesh_partition_directory,
+    )
+
+    job_script = AdcircRunJob(
+        platform=platform,
+        slurm_tasks=processors,
+        slurm_account=slurm_account,
+        slurm_duration=job_duration,
+        slurm_run_name=job_name,
+        executable=model_executable,
+        slurm_partition=partition,
+        slurm_email_type=email_type,
+        slurm_email_address=email_address,
+        slurm_error_filename=f'{SLURM_ARRAY_LOG_DIRECTORY}/{job_name}_%A_%a.err.log',
+        slurm_log_filename=f'{SLURM_ARRAY_LOG_DIRECTORY}/{job_name}_%A_%a.out.log',
+        source_filename=source_filename,
+        slurm_array_directories='runs/*/',
+    )
+
+    setup_script.write(setup_script_filename, overwrite=overwrite)
+    job_script.write(job_script_filename, overwrite=overwrite)
+
+    return setup_script_filename, job_script_filename
+
+
+def write_mesh_partition_directory(
+    directory: PathLike,
+    configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration],
+    local_fort14_filename: PathLike,
+    relative_paths: bool = False,
+    overwrite: bool = False,
+    platform: Platform = None,
+    adcirc_processors: int = None,
+    slurm_account: str = None,
+    job_duration: timedelta = None,
+    partition: str = None,
+    email_type: SlurmEmailType = None,
+    email_address: str = None,
+) -> Path:
+    """
+    write a job that partitions the mesh once, producing a `partmesh.txt` to be linked into every run directory
+
+    :param directory: directory in which to partition the mesh
+    :param configuration: unperturbed run configuration
+    :param local_fort14_filename: path to mesh
+    :return: path to mesh partition directory
+    """
+
+    if not isinstance(directory, Path):
+        directory = Path(directory)
+
+    if not directory.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+
+    job_name = 'ADCIRC_PARTITION'
+
+    adcprep_path = configuration['adcirc']['adcprep_executable_path']
+    source_filename = configuration['adcirc']['source_filename']
+
+    adcprep_path = update_path_relative(adcprep_path, relative_paths, directory)
+    source_filename = update_path_relative(source_filename, relative_paths, directory)
+
+    partition_script = AdcircMeshPartitionJob(
+        platform=platform,
+        adcirc_mesh_partitions=adcirc_processors,
+        slurm_account=slurm_account,
+        slurm_duration=job_duration,
+        slurm_partition=partition,
+        slurm_run_name=job_name,
+        adcprep_path=adcprep_path,
+        slurm_email_type=email_type,
+        slurm_email_address=email_address,
+        slurm_error_filename=f'{job_name}.err.log',
+        slurm_log_filename=f'{job_name}.out.log',
+        source_filename=source_filename,
+    )
+    partition_script.write(directory / 'setup.job', overwrite=overwrite)
+
+    create_symlink(local_fort14_filename, directory / 'fort.14', relative=True)
+
     return directory
 
 
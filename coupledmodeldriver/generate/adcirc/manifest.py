@@ -0,0 +1,154 @@
+import hashlib
+import json
+from os import PathLike
+from pathlib import Path
+from typing import Any
+
+from coupledmodeldriver.configure.configure import RunConfiguration
+from coupledmodeldriver.utilities import convert_to_json, LOGGER
+
+# number of bytes read at a time when hashing input files
+HASH_BLOCK_SIZE = 2 ** 20
+
+
+class GenerationManifest:
+    """
+    record of the content hashes of generated directories, written to `manifest.json` in the output directory
+
+    On regeneration, a directory whose hash matches the previous generation (and still exists) does not need to
+    be rewritten. Input files are hashed by content; the size and modification time of each file are kept so that
+    unchanged files are not read again.
+    """
+
+    def __init__(self, filename: PathLike):
+        """
+        :param filename: path to manifest file
+        """
+
+        if not isinstance(filename, Path):
+            filename = Path(filename)
+
+        self.filename = filename
+
+        self.previous_entries = {}
+        self.__previous_files = {}
+        if self.filename.exists():
+            try:
+                with open(self.filename) as manifest_file:
+                    previous_manifest = json.load(manifest_file)
+                self.previous_entries = previous_manifest['entries']
+                self.__previous_files = previous_manifest['files']
+            except Exception as error:
+                LOGGER.warning(f'could not read manifest "{self.filename}": {error}')
+
+        self.entries = {}
+        self.__files = {}
+
+    def file_hash(self, filename: PathLike) -> str:
+        """
+        :param filename: path to input file
+        :return: SHA-256 of file contents, reused from the previous manifest if the file has not been modified
+        """
+
+        if not isinstance(filename, Path):
+            filename = Path(filename)
+
+        key = filename.resolve().as_posix()
+        if key not in self.__files:
+            status = filename.stat()
+            previous = self.__previous_files.get(key)
+            if (
+                previous is not None
+                and previous['size'] == status.st_size
+                and previous['mtime'] == status.st_mtime_ns
+            ):
+                digest = previous['sha256']
+            else:
+                LOGGER.debug(f'hashing "{filename}"')
+                hasher = hashlib.sha256()
+                with open(filename, 'rb') as input_file:
+                    for block in iter(lambda: input_file.read(HASH_BLOCK_SIZE), b''):
+                        hasher.update(block)
+                digest = hasher.hexdigest()
+            self.__files[key] = {
+                'size': status.st_size,
+                'mtime': status.st_mtime_ns,
+                'sha256': digest,
+            }
+
+        return self.__files[key]['sha256']
+
+    def configuration_hash(self, configuration: RunConfiguration, **parameters) -> str:
+        """
+        hash the given run configuration (excluding ensemble perturbations), along with the contents of any input
+        files it references
+
+        :param configuration: run configuration
+        :param parameters: additional values that affect generated files
+        :return: SHA-256 of configuration
+        """
+
+        values = {}
+        for name, entry in configuration.items():
+            entry = dict(entry.configuration)
+            if name == 'modeldriver':
+                entry.pop('perturbations', None)
+            values[name] = {key: self.__input_value(value) for key, value in entry.items()}
+
+        return self.hash(values, **parameters)
+
+    def hash(self, *values: Any, **parameters) -> str:
+        """
+        :param values: values to hash
+        :param parameters: additional named values to hash
+        :return: SHA-256 of the JSON representation of the given values
+        """
+
+        return hashlib.sha256(
+            json.dumps(
+                convert_to_json([values, parameters]), sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+
+    def is_unchanged(self, name: str, digest: str, directory: PathLike = None) -> bool:
+        """
+        :param name: name of entry
+        :param digest: current hash of entry
+        :param directory: generated path of entry, which must still exist
+        :return: whether the entry matches the previous generation
+        """
+
+        if directory is not None and not Path(directory).exists():
+            return False
+        return self.previous_entries.get(name) == digest
+
+    def record(self, name: str, digest: str):
+        """
+        :param name: name of entry
+        :param digest: current hash of entry
+        """
+
+        self.entries[name] = digest
+
+    @property
+    def stale(self) -> [str]:
+        """ entries of the previous generation that are not part of the current generation """
+
+        return sorted(name for name in self.previous_entries if name not in self.entries)
+
+    def write(self):
+        with open(self.filename, 'w') as manifest_file:
+            json.dump(
+                {'entries': self.entries, 'files': self.__files},
+                manifest_file,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def __input_value(self, value: Any) -> Any:
+        if isinstance(value, Path) and value.is_file():
+            return {'path': value.as_posix(), 'sha256': self.file_hash(value)}
+        return value
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.filename)})'
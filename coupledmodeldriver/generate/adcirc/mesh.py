@@ -0,0 +1,281 @@
+from multiprocessing.shared_memory import SharedMemory
+from os import PathLike
+from typing import Any
+
+from adcircpy import AdcircMesh
+import numpy
+from pandas import DataFrame, Index
+
+from coupledmodeldriver.utilities import LOGGER
+
+
+class SharedMesh:
+    """
+    read-only view of a parsed ADCIRC mesh, with node and element arrays stored in shared memory
+
+    The parent process parses the mesh once; worker processes receive only the names of the shared memory blocks
+    (through pickling) and attach to the same buffers instead of copying or re-reading `fort.14`.
+    """
+
+    ARRAYS = ['node_ids', 'coordinates', 'values', 'element_ids', 'elements']
+
+    def __init__(
+        self,
+        node_ids: numpy.ndarray,
+        coordinates: numpy.ndarray,
+        values: numpy.ndarray,
+        element_ids: numpy.ndarray,
+        elements: numpy.ndarray,
+        boundaries: {Any: {int: {str: Any}}} = None,
+        description: str = None,
+        crs: Any = None,
+        node_columns: {str: str} = None,
+        element_columns: {str: str} = None,
+    ):
+        """
+        :param node_ids: node IDs
+        :param coordinates: node coordinates (N x 2)
+        :param values: node values, as stored by `adcircpy` (elevation, positive upward)
+        :param element_ids: element IDs
+        :param elements: node indices of each element, padded with -1 (M x 3 or M x 4)
+        :param boundaries: boundary definitions, as given by `adcircpy`
+        :param description: mesh description
+        :param crs: coordinate reference system
+        :param node_columns: names and types of node table columns, if `adcircpy` stores nodes in a data frame
+        :param element_columns: names and types of element table columns, if `adcircpy` stores elements in a data frame
+        """
+
+        self.boundaries = boundaries
+        self.description = description
+        self.crs = crs
+        self.node_columns = node_columns
+        self.element_columns = element_columns
+
+        self.__shared_memory = {}
+        self.__arrays = {}
+        self.__owner = True
+
+        for name, array in zip(
+            self.ARRAYS, [node_ids, coordinates, values, element_ids, elements]
+        ):
+            array = numpy.ascontiguousarray(array)
+            shared_memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared_array = numpy.ndarray(
+                array.shape, dtype=array.dtype, buffer=shared_memory.buf
+            )
+            shared_array[:] = array
+            shared_array.flags.writeable = False
+            self.__shared_memory[name] = shared_memory
+            self.__arrays[name] = shared_array
+
+        self.__nodes = None
+        self.__elements = None
+
+        LOGGER.debug(
+            f'shared {len(node_ids)} nodes and {len(element_ids)} elements '
+            f'({sum(array.nbytes for array in self.__arrays.values())} bytes)'
+        )
+
+    @property
+    def node_ids(self) -> numpy.ndarray:
+        return self.__arrays['node_ids']
+
+    @property
+    def coordinates(self) -> numpy.ndarray:
+        return self.__arrays['coordinates']
+
+    @property
+    def values(self) -> numpy.ndarray:
+        return self.__arrays['values']
+
+    @property
+    def element_ids(self) -> numpy.ndarray:
+        return self.__arrays['element_ids']
+
+    @property
+    def elements(self) -> numpy.ndarray:
+        return self.__arrays['elements']
+
+    @property
+    def names(self) -> {str: str}:
+        return {
+            name: shared_memory.name for name, shared_memory in self.__shared_memory.items()
+        }
+
+    @property
+    def adcircpy_mesh(self) -> AdcircMesh:
+        """
+        build a new `AdcircMesh` from the shared arrays, through the public `adcircpy` constructor
+
+        The node and element tables passed to the constructor are built once per process and shared between meshes.
+        """
+
+        if self.__nodes is None or self.__elements is None:
+            if self.node_columns is not None:
+                self.__nodes, self.__elements = self.__data_frames()
+            else:
+                self.__nodes, self.__elements = self.__mappings()
+
+        return AdcircMesh(
+            nodes=self.__nodes,
+            elements=self.__elements,
+            boundaries=self.boundaries,
+            description=self.description,
+            crs=self.crs,
+        )
+
+    def __data_frames(self) -> (DataFrame, DataFrame):
+        """ node and element tables in the form of `adcircpy>=1.0.40` (data frames indexed by ID) """
+
+        nodes = DataFrame(
+            numpy.column_stack(
+                [self.coordinates, self.values.reshape(len(self.node_ids), -1)]
+            ),
+            index=Index(self.node_ids, name='id'),
+            columns=list(self.node_columns),
+        ).astype(self.node_columns)
+
+        present = self.elements > -1
+        element_nodes = numpy.where(present, self.node_ids[self.elements], numpy.nan)
+        element_columns = list(self.element_columns)
+        elements = DataFrame(
+            numpy.nan, index=Index(self.element_ids, name='id'), columns=element_columns
+        )
+        elements[element_columns[0]] = numpy.count_nonzero(present, axis=1)
+        for index in range(element_nodes.shape[1]):
+            elements[element_columns[index + 1]] = element_nodes[:, index]
+
+        return nodes, elements.astype(self.element_columns)
+
+    def __mappings(self) -> ({str: list}, {str: list}):
+        """ node and element tables in the form of `adcircpy<1.0.40` (dictionaries keyed by ID) """
+
+        nodes = {
+            node_id: [coordinates, value]
+            for node_id, coordinates, value in zip(
+                self.node_ids.tolist(),
+                map(tuple, self.coordinates.tolist()),
+                self.values.tolist(),
+            )
+        }
+
+        node_ids = self.node_ids
+        elements = {
+            element_id: node_ids[element[element > -1]].tolist()
+            for element_id, element in zip(self.element_ids.tolist(), self.elements)
+        }
+
+        return nodes, elements
+
+    def close(self):
+        """ detach from shared memory, and remove the shared memory blocks if this is the owning process """
+
+        for shared_memory in self.__shared_memory.values():
+            shared_memory.close()
+            if self.__owner:
+                try:
+                    shared_memory.unlink()
+                except FileNotFoundError:
+                    pass
+        self.__shared_memory = {}
+        self.__arrays = {}
+
+    def __enter__(self) -> 'SharedMesh':
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __getstate__(self) -> {str: Any}:
+        return {
+            'names': self.names,
+            'shapes': {name: array.shape for name, array in self.__arrays.items()},
+            'dtypes': {name: array.dtype.str for name, array in self.__arrays.items()},
+            'boundaries': self.boundaries,
+            'description': self.description,
+            'crs': self.crs,
+            'node_columns': self.node_columns,
+            'element_columns': self.element_columns,
+        }
+
+    def __setstate__(self, state: {str: Any}):
+        self.boundaries = state['boundaries']
+        self.description = state['description']
+        self.crs = state['crs']
+        self.node_columns = state['node_columns']
+        self.element_columns = state['element_columns']
+
+        self.__shared_memory = {}
+        self.__arrays = {}
+        self.__owner = False
+
+        for name, shared_memory_name in state['names'].items():
+            shared_memory = SharedMemory(name=shared_memory_name)
+            shared_array = numpy.ndarray(
+                state['shapes'][name], dtype=state['dtypes'][name], buffer=shared_memory.buf
+            )
+            shared_array.flags.writeable = False
+            self.__shared_memory[name] = shared_memory
+            self.__arrays[name] = shared_array
+
+        self.__nodes = None
+        self.__elements = None
+
+    @classmethod
+    def from_adcircpy(cls, mesh: AdcircMesh) -> 'SharedMesh':
+        if isinstance(mesh.nodes, DataFrame):
+            nodes = mesh.nodes
+            element_table = mesh.elements.elements
+
+            node_ids = nodes.index.values
+            coordinates = nodes.iloc[:, :2].values
+            values = nodes.iloc[:, 2:].values
+            if values.shape[1] == 1:
+                values = values[:, 0]
+            element_ids = element_table.index.values
+
+            element_nodes = element_table.iloc[:, 1:]
+            element_nodes = element_nodes.loc[:, element_nodes.notna().any(axis=0)].values
+            present = ~numpy.isnan(element_nodes.astype(float))
+            elements = numpy.full(element_nodes.shape, -1, dtype=numpy.int64)
+            elements[present] = nodes.index.get_indexer(
+                element_nodes[present].astype(node_ids.dtype)
+            )
+
+            node_columns = {name: dtype.str for name, dtype in nodes.dtypes.items()}
+            element_columns = {name: dtype.str for name, dtype in element_table.dtypes.items()}
+        else:
+            node_ids = numpy.array(mesh.nodes.id)
+            coordinates = mesh.coords
+            values = mesh.values
+            element_ids = numpy.array(mesh.elements.id)
+            node_indices = {node_id: index for index, node_id in enumerate(mesh.nodes.id)}
+
+            element_table = mesh.elements.elements
+            rank = max((len(element) for element in element_table.values()), default=3)
+            elements = numpy.full((len(element_table), rank), -1, dtype=numpy.int64)
+            for index, element in enumerate(element_table.values()):
+                elements[index, : len(element)] = [
+                    node_indices[node_id] for node_id in element
+                ]
+
+            node_columns = None
+            element_columns = None
+
+        return cls(
+            node_ids=node_ids,
+            coordinates=numpy.asarray(coordinates, dtype=float),
+            values=numpy.asarray(values, dtype=float),
+            element_ids=element_ids,
+            elements=elements,
+            boundaries=mesh.boundaries.to_dict(),
+            description=mesh.description,
+            crs=mesh.crs,
+            node_columns=node_columns,
+            element_columns=element_columns,
+        )
+
+    @classmethod
+    def open(cls, filename: PathLike, crs: Any = None) -> 'SharedMesh':
+        LOGGER.info(f'opening mesh "{filename}"')
+        return cls.from_adcircpy(AdcircMesh.open(filename, crs=crs))
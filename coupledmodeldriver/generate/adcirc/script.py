@@ -205,8 +205,13 @@ class AdcircSetupJob(AdcircJob):
         aswip_command: str = None,
         slurm_tasks: int = 1,
         commands: [str] = None,
+        mesh_partition_directory: PathLike = None,
         **kwargs,
     ):
+        """
+        :param mesh_partition_directory: directory containing a `partmesh.txt` shared between runs, to skip partitioning the mesh
+        """
+
         super().__init__(
             platform,
             commands,
@@ -230,15 +235,27 @@ class AdcircSetupJob(AdcircJob):
             if isinstance(aswip_command, str):
                 aswip_command = AswipCommand.from_string(aswip_command)
 
+        if mesh_partition_directory is not None:
+            if not isinstance(mesh_partition_directory, Path):
+                mesh_partition_directory = Path(mesh_partition_directory)
+            mesh_partition_directory = mesh_partition_directory.as_posix()
+
         self.adcprep_path = adcprep_path
         self.aswip_command = aswip_command
+        self.mesh_partition_directory = mesh_partition_directory
 
         setup_commands = []
 
-        adcprep_commands = [
-            f'{self.adcprep_path} --np {self.adcirc_partitions} --partmesh',
-            f'{self.adcprep_path} --np {self.adcirc_partitions} --prepall',
-        ]
+        if self.mesh_partition_directory is not None:
+            setup_commands.append(
+                f'ln -sf {self.mesh_partition_directory}/partmesh.txt partmesh.txt'
+            )
+            adcprep_commands = []
+        else:
+            adcprep_commands = [
+                f'{self.adcprep_path} --np {self.adcirc_partitions} --partmesh'
+            ]
+        adcprep_commands.append(f'{self.adcprep_path} --np {self.adcirc_partitions} --prepall')
         if self.launcher is not None:
             adcprep_commands = [f'{self.launcher} {line}' for line in adcprep_commands]
         setup_commands.extend(adcprep_commands)
@@ -249,3 +266,46 @@ class AdcircSetupJob(AdcircJob):
             )
 
         self.commands.extend(setup_commands)
+
+
+class AdcircMeshPartitionJob(AdcircJob):
+    """ script for partitioning the mesh with `adcprep`, once for all runs sharing the mesh and processor count """
+
+    def __init__(
+        self,
+        platform: Platform,
+        adcirc_mesh_partitions: int,
+        slurm_account: str,
+        slurm_duration: timedelta,
+        slurm_run_name: str,
+        adcprep_path: PathLike = None,
+        slurm_tasks: int = 1,
+        commands: [str] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            platform,
+            commands,
+            slurm_tasks,
+            slurm_account,
+            slurm_duration,
+            slurm_run_name,
+            **kwargs,
+        )
+
+        self.adcirc_partitions = adcirc_mesh_partitions
+
+        if adcprep_path is None:
+            adcprep_path = 'adcprep'
+        else:
+            if not isinstance(adcprep_path, Path):
+                adcprep_path = Path(adcprep_path)
+            adcprep_path = adcprep_path.as_posix()
+
+        self.adcprep_path = adcprep_path
+
+        adcprep_command = f'{self.adcprep_path} --np {self.adcirc_partitions} --partmesh'
+        if self.launcher is not None:
+            adcprep_command = f'{self.launcher} {adcprep_command}'
+
+        self.commands.append(adcprep_command)
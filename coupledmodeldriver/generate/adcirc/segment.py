@@ -0,0 +1,149 @@
+from datetime import timedelta
+from os import PathLike
+from pathlib import Path
+
+from coupledmodeldriver.generate.adcirc.fort15 import (
+    fort15_values,
+    replace_fort15_values,
+    write_file,
+)
+from coupledmodeldriver.generate.adcirc.spinup import HOTSTART_FILENAMES
+from coupledmodeldriver.utilities import LOGGER
+
+# `fort.15` and job script of each segment after the first, which is run from `fort.15` by `adcirc.job`
+SEGMENT_FORT15_FILENAME = 'fort.15.segment_{}'
+SEGMENT_JOB_FILENAME = 'adcirc_segment_{}.job'
+
+# hotstart file formats (`NHSTAR`) that write `fort.67.nc` / `fort.68.nc`, read by `IHOT = 567`
+NETCDF_HOTSTART_FORMATS = [3, 5]
+
+
+def segment_steps(maximum_duration: timedelta, throughput: float, timestep: timedelta) -> int:
+    """
+    :param maximum_duration: maximum wall-clock duration of a segment
+    :param throughput: estimated modeled seconds per wall-clock second
+    :param timestep: model timestep
+    :return: number of timesteps that fit in one segment
+    """
+
+    return max(
+        int(maximum_duration.total_seconds() * throughput // timestep.total_seconds()), 1
+    )
+
+
+def segment_end_steps(start_step: int, end_step: int, steps: int) -> [int]:
+    """
+    segments end at multiples of the segment length (counted from coldstart), as hotstart files are written every
+    `NHSINC` timesteps from coldstart
+
+    :param start_step: timestep (since coldstart) at which the run starts
+    :param end_step: timestep (since coldstart) at which the run ends
+    :param steps: number of timesteps in each segment
+    :return: timestep (since coldstart) at which each segment ends
+    """
+
+    boundaries = range((start_step // steps + 1) * steps, end_step, steps)
+    return [*boundaries, end_step]
+
+
+def write_segments(
+    directory: PathLike,
+    maximum_duration: timedelta,
+    throughput: float,
+    run_duration: timedelta,
+    overwrite: bool = False,
+) -> [str]:
+    """
+    split the run written to `fort.15` into hotstart segments that each fit in the given wall-clock duration
+
+    The first segment is run from `fort.15`; every later segment has its own `fort.15.segment_<N>`, which
+    hotstarts (`IHOT = 567`) from the hotstart file written at the end of the previous segment.
+
+    :param directory: run directory containing `fort.15`
+    :param maximum_duration: maximum wall-clock duration of a segment
+    :param throughput: estimated modeled seconds per wall-clock second
+    :param run_duration: modeled duration of the run, ending at `RNDAY`
+    :param overwrite: whether to overwrite existing files
+    :return: `fort.15` filenames of segments after the first
+    """
+
+    if not isinstance(directory, Path):
+        directory = Path(directory)
+
+    fort15_filename = directory / 'fort.15'
+    with open(fort15_filename) as fort15_file:
+        contents = fort15_file.read()
+    values = fort15_values(contents)
+
+    timestep = timedelta(seconds=float(values['DTDP']))
+    end_step = round(timedelta(days=float(values['RNDAY'])) / timestep)
+    start_step = end_step - round(run_duration / timestep)
+
+    hotstart_format, hotstart_interval = (
+        int(value) for value in values.get('NHSTAR NHSINC', '0 0').split()[:2]
+    )
+
+    steps = segment_steps(maximum_duration, throughput, timestep)
+    if hotstart_format in NETCDF_HOTSTART_FORMATS and 0 < hotstart_interval <= steps:
+        # segments end on a hotstart file the run already writes
+        steps -= steps % hotstart_interval
+    else:
+        if hotstart_format not in NETCDF_HOTSTART_FORMATS:
+            hotstart_format = 5
+        hotstart_interval = steps
+
+    end_steps = segment_end_steps(start_step, end_step, steps)
+
+    if len(end_steps) == 1:
+        return []
+
+    LOGGER.debug(
+        f'splitting {run_duration} run into {len(end_steps)} segment(s) of at most {steps} timesteps'
+    )
+
+    segment_filenames = []
+    for index, segment_end_step in enumerate(end_steps):
+        segment_values = {}
+        if index < len(end_steps) - 1:
+            segment_values['RNDAY'] = f'{segment_end_step * timestep / timedelta(days=1):.12G}'
+            segment_values['NHSTAR NHSINC'] = f'{hotstart_format:d} {hotstart_interval:d}'
+        if index > 0:
+            segment_values['IHOT'] = '567'
+        segment_contents = replace_fort15_values(contents, segment_values)
+
+        if index == 0:
+            write_file(fort15_filename, segment_contents, overwrite=True)
+        else:
+            segment_filename = directory / SEGMENT_FORT15_FILENAME.format(index + 1)
+            write_file(segment_filename, segment_contents, overwrite=overwrite)
+            segment_filenames.append(segment_filename.name)
+
+    return segment_filenames
+
+
+def detach_hotstart_commands() -> [str]:
+    """
+    :return: shell commands replacing linked hotstart files with copies, so that segments do not overwrite the spinup
+    """
+
+    return [
+        f'for hotstart_file in {" ".join(HOTSTART_FILENAMES)}; do if [ -L ${{hotstart_file}} ]; then cp --remove-destination $(readlink -f ${{hotstart_file}}) ${{hotstart_file}}; fi; done',
+    ]
+
+
+def segment_commands(fort15_filename: str, adcprep_path: str, processors: int) -> [str]:
+    """
+    :param fort15_filename: `fort.15` of segment
+    :param adcprep_path: path to `adcprep` executable
+    :param processors: number of ADCIRC processors
+    :return: shell commands, run before ADCIRC, that hotstart from the latest hotstart file of the previous segment
+    """
+
+    return [
+        # hotstart files are written alternately to `fort.67.nc` and `fort.68.nc`, and `IHOT = 567` reads the former
+        f'if [ {HOTSTART_FILENAMES[1]} -nt {HOTSTART_FILENAMES[0]} ]; then cp {HOTSTART_FILENAMES[1]} {HOTSTART_FILENAMES[0]}; fi',
+        # the `fort.15` of the first segment is kept, so that the run can be resubmitted from its start
+        f'cp -n fort.15 {SEGMENT_FORT15_FILENAME.format(1)}',
+        f'cp {fort15_filename} fort.15',
+        f'{adcprep_path} --np {processors} --prep15',
+    ]
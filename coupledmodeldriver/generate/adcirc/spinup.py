@@ -0,0 +1,132 @@
+from os import PathLike
+from pathlib import Path
+from typing import Any, Union
+
+from coupledmodeldriver.generate.adcirc.configure import (
+    ADCIRCRunConfiguration,
+    NEMSADCIRCRunConfiguration,
+)
+from coupledmodeldriver.generate.adcirc.manifest import GenerationManifest
+
+# hotstart files written by a tidal spinup, read by the runs that follow it
+HOTSTART_FILENAMES = ['fort.67.nc', 'fort.68.nc']
+
+
+class SpinupCache:
+    """
+    directory of completed tidal spinups, shared between ensembles
+
+    A tidal spinup depends only on the mesh, nodal attributes, tidal constituents, timestep and spinup window.
+    Each completed spinup stores its hotstart files in a subdirectory named by the hash of those inputs, so that
+    later ensembles with the same inputs can link the hotstart files instead of running the spinup again.
+    """
+
+    def __init__(self, directory: PathLike):
+        """
+        :param directory: path to cache directory
+        """
+
+        if not isinstance(directory, Path):
+            directory = Path(directory)
+
+        self.directory = directory
+
+    def key(
+        self,
+        configuration: Union[ADCIRCRunConfiguration, NEMSADCIRCRunConfiguration],
+        manifest: GenerationManifest,
+    ) -> str:
+        """
+        :param configuration: unperturbed run configuration
+        :param manifest: generation manifest, used to hash input files
+        :return: hash of the inputs that determine the tidal spinup
+        """
+
+        adcirc = configuration['adcirc']
+
+        # tidal databases (i.e. TPXO) are shared resources of several gigabytes, identified by path and status
+        if 'tidal' in configuration:
+            tides = {
+                key: input_status(value)
+                for key, value in configuration['tidal'].configuration.items()
+            }
+        else:
+            tides = None
+
+        # meshes are hashed by content, so that ensembles in different directories share spinups
+        return manifest.hash(
+            fort14=input_contents(adcirc['fort_14_path'], manifest),
+            fort13=input_contents(adcirc['fort_13_path'], manifest),
+            tides=tides,
+            timestep=adcirc['tidal_spinup_timestep'],
+            start=adcirc['modeled_start_time'] - adcirc['tidal_spinup_duration'],
+            end=adcirc['modeled_start_time'],
+            attributes=adcirc['attributes'],
+        )
+
+    def entry(self, key: str) -> Path:
+        """
+        :param key: hash of spinup inputs
+        :return: directory holding the hotstart files of the given spinup
+        """
+
+        return self.directory / key
+
+    def is_complete(self, key: str) -> bool:
+        """
+        :param key: hash of spinup inputs
+        :return: whether the given spinup has completed and stored its hotstart file(s)
+        """
+
+        entry = self.entry(key)
+        return any((entry / filename).exists() for filename in HOTSTART_FILENAMES)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.directory)})'
+
+
+def input_contents(value: Any, manifest: GenerationManifest) -> Any:
+    """
+    :param value: configuration value
+    :param manifest: generation manifest, used to hash input files
+    :return: content hash of the file the given value points to, or the value itself
+    """
+
+    if isinstance(value, Path) and value.is_file():
+        return manifest.file_hash(value)
+    return value
+
+
+def input_status(value: Any) -> Any:
+    """
+    :param value: configuration value
+    :return: resolved path, size, and modification time of the file the given value points to, or the value itself
+    """
+
+    if isinstance(value, Path) and value.is_file():
+        status = value.stat()
+        return {
+            'path': value.resolve().as_posix(),
+            'size': status.st_size,
+            'mtime': status.st_mtime_ns,
+        }
+    return value
+
+
+def store_spinup_commands(entry: PathLike) -> [str]:
+    """
+    :param entry: cache directory in which to store the hotstart files of a spinup
+    :return: shell commands, run after the spinup completes, that copy its hotstart files into the cache
+    """
+
+    if not isinstance(entry, Path):
+        entry = Path(entry)
+
+    # the entry is renamed into place only once all hotstart files are copied, so partial entries are never used; a
+    # spinup may write only one of the hotstart files, so only the files that exist are copied
+    return [
+        f'mkdir -p {entry.parent.as_posix()}',
+        f'cache_entry=$(mktemp -d {entry.parent.as_posix()}/.{entry.name}.XXXXXX)',
+        f'for hotstart_file in {" ".join(HOTSTART_FILENAMES)}; do if [ -f ${{hotstart_file}} ]; then cp ${{hotstart_file}} ${{cache_entry}}/; fi; done',
+        f'mv -T ${{cache_entry}} {entry.as_posix()} || rm -rf ${{cache_entry}}',
+    ]
@@ -0,0 +1,223 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from os import PathLike
+from pathlib import Path
+import subprocess
+
+from coupledmodeldriver.utilities import LOGGER
+
+# file in the ensemble directory to which the run script appends the job ID of each submitted job
+JOB_REGISTRY_FILENAME = 'jobs.txt'
+
+
+class JobState(Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    TIMEOUT = 'timeout'
+    OUT_OF_MEMORY = 'out_of_memory'
+    NODE_FAIL = 'node_fail'
+    UNKNOWN = 'unknown'
+
+
+# job states after which a job will not run again
+FAILED_JOB_STATES = [
+    JobState.FAILED,
+    JobState.CANCELLED,
+    JobState.TIMEOUT,
+    JobState.OUT_OF_MEMORY,
+    JobState.NODE_FAIL,
+]
+
+# Slurm job state codes https://slurm.schedmd.com/squeue.html#SECTION_JOB-STATE-CODES
+SLURM_JOB_STATES = {
+    'PENDING': JobState.PENDING,
+    'CONFIGURING': JobState.PENDING,
+    'REQUEUED': JobState.PENDING,
+    'REQUEUE_HOLD': JobState.PENDING,
+    'RESV_DEL_HOLD': JobState.PENDING,
+    'RUNNING': JobState.RUNNING,
+    'COMPLETING': JobState.RUNNING,
+    'SUSPENDED': JobState.RUNNING,
+    'STAGE_OUT': JobState.RUNNING,
+    'COMPLETED': JobState.COMPLETED,
+    'FAILED': JobState.FAILED,
+    'BOOT_FAIL': JobState.FAILED,
+    'DEADLINE': JobState.TIMEOUT,
+    'PREEMPTED': JobState.CANCELLED,
+    'REVOKED': JobState.CANCELLED,
+    'CANCELLED': JobState.CANCELLED,
+    'TIMEOUT': JobState.TIMEOUT,
+    'OUT_OF_MEMORY': JobState.OUT_OF_MEMORY,
+    'NODE_FAIL': JobState.NODE_FAIL,
+}
+
+
+class JobScheduler(ABC):
+    """ queries the states of submitted jobs """
+
+    @abstractmethod
+    def job_states(self, job_ids: [str]) -> {str: JobState}:
+        """
+        :param job_ids: IDs of jobs
+        :return: state of each job known to the scheduler
+        """
+
+        raise NotImplementedError
+
+
+class SlurmScheduler(JobScheduler):
+    """
+    resolves the states of any number of jobs with one `squeue` call, for queued and running jobs, and one `sacct`
+    call for the remaining (finished) jobs
+    """
+
+    def __init__(self, squeue: str = None, sacct: str = None):
+        """
+        :param squeue: `squeue` executable
+        :param sacct: `sacct` executable
+        """
+
+        if squeue is None:
+            squeue = 'squeue'
+        if sacct is None:
+            sacct = 'sacct'
+
+        self.squeue = squeue
+        self.sacct = sacct
+
+    def job_states(self, job_ids: [str]) -> {str: JobState}:
+        job_ids = list(dict.fromkeys(str(job_id) for job_id in job_ids))
+        states = {}
+
+        if len(job_ids) > 0:
+            # `--array` lists pending array tasks individually, as `<job>_<task>`
+            states.update(
+                self.__query(
+                    [
+                        self.squeue,
+                        '--noheader',
+                        '--array',
+                        '--format=%i %T',
+                        f'--jobs={",".join(job_ids)}',
+                    ]
+                )
+            )
+
+        finished_job_ids = [job_id for job_id in job_ids if job_id not in states]
+        if len(finished_job_ids) > 0:
+            states.update(
+                self.__query(
+                    [
+                        self.sacct,
+                        '--noheader',
+                        '--parsable2',
+                        '--allocations',
+                        '--format=JobID,State',
+                        f'--jobs={",".join(finished_job_ids)}',
+                    ],
+                    separator='|',
+                )
+            )
+
+        return {job_id: state for job_id, state in states.items() if job_id in job_ids}
+
+    @staticmethod
+    def __query(command: [str], separator: str = None) -> {str: JobState}:
+        try:
+            # a finished job is an error for `squeue`, but the states of the other jobs are still written
+            process = subprocess.run(command, capture_output=True, text=True)
+        except OSError as error:
+            LOGGER.warning(f'could not query job states with `{command[0]}`: {error}')
+            return {}
+
+        states = {}
+        for line in process.stdout.splitlines():
+            fields = line.strip().split(separator)
+            if len(fields) < 2:
+                continue
+            # `sacct` appends the user to cancelled states, as in `CANCELLED by 1234`
+            state = fields[1].split()[0].rstrip('+') if len(fields[1].strip()) > 0 else None
+            states[fields[0]] = SLURM_JOB_STATES.get(state, JobState.UNKNOWN)
+        return states
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.squeue)}, {repr(self.sacct)})'
+
+
+class LocalScheduler(JobScheduler):
+    """ stands in for a scheduler, with job states set directly """
+
+    def __init__(self, states: {str: JobState} = None):
+        """
+        :param states: state of each job
+        """
+
+        if states is None:
+            states = {}
+
+        self.states = states
+        self.queries = []
+
+    def job_states(self, job_ids: [str]) -> {str: JobState}:
+        job_ids = [str(job_id) for job_id in job_ids]
+        self.queries.append(job_ids)
+        return {job_id: self.states[job_id] for job_id in job_ids if job_id in self.states}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({repr(self.states)})'
+
+
+def read_job_registry(filename: PathLike) -> {str: {str: str}}:
+    """
+    read the job IDs recorded by the run script, as lines of `<run> <job> <job ID>`; later lines replace earlier
+    lines, so that resubmitted jobs replace the jobs they resubmit
+
+    :param filename: path to job registry
+    :return: job IDs of each run, by job name (`setup` or `adcirc`)
+    """
+
+    if not isinstance(filename, Path):
+        filename = Path(filename)
+
+    registry = {}
+    if filename.exists():
+        with open(filename) as registry_file:
+            for line in registry_file:
+                fields = line.split()
+                if len(fields) != 3 or len(fields[2]) == 0:
+                    continue
+                run, job, job_id = fields
+                registry.setdefault(run.rstrip('/'), {})[job] = job_id
+
+    return registry
+
+
+def registry_job_states(
+    registry: {str: {str: str}}, scheduler: JobScheduler = None
+) -> {str: {str: {str: str}}}:
+    """
+    :param registry: job IDs of each run, from `read_job_registry`
+    :param scheduler: scheduler to query, defaulting to Slurm
+    :return: job ID and state of each job of each run, from a single query of the scheduler
+    """
+
+    if scheduler is None:
+        scheduler = SlurmScheduler()
+
+    states = scheduler.job_states(
+        [job_id for jobs in registry.values() for job_id in jobs.values()]
+    )
+
+    return {
+        run: {
+            job: {
+                'job_id': job_id,
+                'state': states[job_id].value if job_id in states else JobState.UNKNOWN.value,
+            }
+            for job, job_id in jobs.items()
+        }
+        for run, jobs in registry.items()
+    }
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from enum import Enum
 from os import PathLike
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 import textwrap
 from typing import Sequence
 import uuid
@@ -9,9 +9,28 @@ import uuid
 import numpy
 
 from coupledmodeldriver.platforms import Platform
+from coupledmodeldriver.scheduler import JOB_REGISTRY_FILENAME
 from coupledmodeldriver.utilities import make_executable
 
 
+# directory of Slurm job array log files, relative to the ensemble directory
+SLURM_ARRAY_LOG_DIRECTORY = 'logs'
+
+# filenames of Slurm job array scripts in the ensemble directory
+SLURM_ARRAY_FILENAMES = {'setup': 'setup_array.job', 'adcirc': 'adcirc_array.job'}
+
+# hotstart segments of a run, after the first, in the order they are run
+SEGMENT_ITERATION = 'for segment in $(ls adcirc_segment_*.job 2>/dev/null | sort -V)'
+
+# Slurm filename patterns and their equivalent environment variables
+SLURM_FILENAME_PATTERNS = {
+    '%A': '${SLURM_ARRAY_JOB_ID}',
+    '%a': '${SLURM_ARRAY_TASK_ID}',
+    '%j': '${SLURM_JOB_ID}',
+    '%x': '${SLURM_JOB_NAME}',
+}
+
+
 class SlurmEmailType(Enum):
     NONE = 'NONE'
     BEGIN = 'BEGIN'
@@ -84,6 +103,7 @@ class JobScript(Script):
         modules: [PathLike] = None,
         path_prefix: str = None,
         write_slurm_directory: bool = False,
+        slurm_array_directories: str = None,
     ):
         """
         Instantiate a new job script, to run locally or from a job manager.
@@ -103,6 +123,7 @@ class JobScript(Script):
         :param modules: file paths to modules to load
         :param path_prefix: file path to prepend to the PATH
         :param write_slurm_directory: explicitly add directory to Slurm header when writing file
+        :param slurm_array_directories: glob of directories, relative to the submission directory, in which to run each task of a Slurm job array (indexed by `SLURM_ARRAY_TASK_ID`)
         """
 
         super().__init__(commands)
@@ -139,6 +160,7 @@ class JobScript(Script):
         self.modules = modules
         self.path_prefix = path_prefix
         self.write_slurm_directory = write_slurm_directory
+        self.slurm_array_directories = slurm_array_directories
 
     @property
     def launcher(self) -> str:
@@ -211,6 +233,31 @@ class JobScript(Script):
 
         return '\n'.join(lines)
 
+    @property
+    def slurm_array_commands(self) -> [str]:
+        """
+        :return: commands changing to the directory of the current Slurm array task, and linking its log files there
+        """
+
+        lines = [
+            '# resolve run directory from Slurm array task ID',
+            f'run_directories=(${{SLURM_SUBMIT_DIR}}/{self.slurm_array_directories})',
+            'cd ${run_directories[${SLURM_ARRAY_TASK_ID}]}',
+        ]
+
+        for log_filename in dict.fromkeys(
+            [self.slurm_error_filename, self.slurm_log_filename]
+        ):
+            if log_filename is not None:
+                log_filename = PurePosixPath(log_filename)
+                linked_filename = f'{self.slurm_run_name}_$(basename ${{PWD}}){"".join(log_filename.suffixes)}'
+                if not log_filename.is_absolute():
+                    log_filename = '${SLURM_SUBMIT_DIR}' / log_filename
+                log_filename = expand_slurm_filename_pattern(log_filename.as_posix())
+                lines.append(f'ln -sf {log_filename} {linked_filename}')
+
+        return lines
+
     def __str__(self) -> str:
         lines = []
 
@@ -220,6 +267,9 @@ class JobScript(Script):
         if self.platform.value['uses_slurm']:
             lines.extend([self.slurm_header, '', 'set -e', ''])
 
+            if self.slurm_array_directories is not None:
+                lines.extend([*self.slurm_array_commands, ''])
+
         if self.modules is not None:
             modules_string = ' '.join(module for module in self.modules)
             lines.extend([f'module load {modules_string}', ''])
@@ -248,14 +298,45 @@ class JobScript(Script):
 
 
 class EnsembleRunScript(Script):
-    def __init__(self, platform: Platform, run_spinup: bool = True, commands: [str] = None):
+    def __init__(
+        self,
+        platform: Platform,
+        run_spinup: bool = True,
+        commands: [str] = None,
+        job_array: bool = False,
+        job_array_throttle: int = None,
+        shared_partition: bool = False,
+        job_registry: bool = False,
+        run_directories: [str] = None,
+        segmented: bool = False,
+    ):
+        """
+        :param platform: HPC to run script on
+        :param run_spinup: whether to run spinup before configurations
+        :param commands: shell commands to run before submitting jobs
+        :param job_array: submit configurations as one setup and one run Slurm job array, instead of two jobs per run
+        :param job_array_throttle: maximum number of array tasks to run at once (`%N`)
+        :param shared_partition: partition the mesh once in `partition/` before setting up spinup and configurations
+        :param job_registry: record the Slurm job IDs of each run in `jobs.txt`, for `check_completion` to query
+        :param run_directories: names of the run directories (in `runs/`) to submit, defaulting to all
+        :param segmented: submit the hotstart segments of each run (`adcirc_segment_<N>.job`) after its `adcirc.job`, each depending on the last
+        """
+
         self.platform = platform
         self.run_spinup = run_spinup
+        self.job_array = job_array
+        self.job_array_throttle = job_array_throttle
+        self.shared_partition = shared_partition
+        self.job_registry = job_registry
+        self.run_directories = run_directories
+        self.segmented = segmented
         super().__init__(commands)
 
     def __str__(self) -> str:
         lines = []
 
+        record_jobs = self.job_registry and self.platform.value['uses_slurm']
+
         if self.shebang is not None:
             lines.append(self.shebang)
 
@@ -267,6 +348,25 @@ class EnsembleRunScript(Script):
             ]
         )
 
+        if self.shared_partition:
+            lines.extend(
+                [
+                    '# partition mesh once for all runs',
+                    'pushd ${DIRECTORY}/partition >/dev/null 2>&1',
+                ]
+            )
+            if self.platform.value['uses_slurm']:
+                lines.append("partition_jobid=$(sbatch setup.job | awk '{print $NF}')")
+                if record_jobs:
+                    lines.append(record_job_command('partition', 'setup', '$partition_jobid'))
+                setup_dependencies = '--dependency=afterok:$partition_jobid '
+            else:
+                lines.append('sh setup.job')
+                setup_dependencies = ''
+            lines.extend(['popd >/dev/null 2>&1', ''])
+        else:
+            setup_dependencies = ''
+
         spinup_lines = []
         if self.run_spinup:
             spinup_lines.extend(['# run spinup', 'pushd ${DIRECTORY}/spinup >/dev/null 2>&1'])
@@ -279,38 +379,145 @@ class EnsembleRunScript(Script):
                 # NOTE: `sbatch` will only use `--dependency` if it is BEFORE the job filename
                 spinup_lines.extend(
                     [
-                        "setup_jobid=$(sbatch setup.job | awk '{print $NF}')",
+                        f"setup_jobid=$(sbatch {setup_dependencies}setup.job | awk '{{print $NF}}')",
                         f"spinup_jobid=$(sbatch {dependencies} adcirc.job | awk '{{print $NF}}')",
                     ]
                 )
+                if record_jobs:
+                    spinup_lines.extend(
+                        [
+                            record_job_command('spinup', 'setup', '$setup_jobid'),
+                            record_job_command('spinup', 'adcirc', '$spinup_jobid'),
+                        ]
+                    )
             else:
                 spinup_lines.extend(['sh setup.job', 'sh adcirc.job'])
             spinup_lines.extend(['popd >/dev/null 2>&1', ''])
         lines.extend(spinup_lines)
 
-        hotstart_lines = ['pushd ${hotstart} >/dev/null 2>&1']
-        if self.platform.value['uses_slurm']:
-            dependencies = ['$setup_jobid']
-            if self.run_spinup:
-                dependencies.append('$spinup_jobid')
-            if len(dependencies) > 0:
-                dependencies = f'--dependency=afterok:{":".join(dependencies)}'
-            else:
-                dependencies = ''
-            # NOTE: `sbatch` will only use `--dependency` if it is BEFORE the job filename
-            hotstart_lines.extend(
-                [
-                    f"setup_jobid=$(sbatch setup.job | awk '{{print $NF}}')",
-                    f'sbatch {dependencies} adcirc.job',
+        if self.run_directories is not None and len(self.run_directories) == 0:
+            # no run directories are selected, i.e. only the spinup is submitted
+            hotstart_lines = []
+        elif self.job_array and self.platform.value['uses_slurm']:
+            if self.run_directories is not None:
+                # array task IDs index the run directories globbed by the array job scripts
+                selection_lines = [
+                    'array_indices=()',
+                    bash_for_loop(
+                        'for index in "${!run_directories[@]}"',
+                        [
+                            'case "${run_directories[$index]}" in',
+                            f'    {"|".join(f"runs/{name}/" for name in self.run_directories)}) array_indices+=(${{index}}) ;;',
+                            'esac',
+                        ],
+                    ),
                 ]
-            )
+                array_range = '$(IFS=,; echo "${array_indices[*]}")'
+                indices = '"${array_indices[@]}"'
+            else:
+                selection_lines = []
+                array_range = '0-$((${#run_directories[@]} - 1))'
+                indices = '"${!run_directories[@]}"'
+            if self.job_array_throttle is not None:
+                array_range += f'%{self.job_array_throttle}'
+            dependencies = ['aftercorr:$setup_jobid']
+            if self.run_spinup:
+                dependencies.append('afterok:$spinup_jobid')
+            adcirc_submission = f'sbatch --dependency={",".join(dependencies)} --array={array_range} {SLURM_ARRAY_FILENAMES["adcirc"]}'
+            if record_jobs:
+                adcirc_submission = (
+                    f"adcirc_jobid=$({adcirc_submission} | awk '{{print $NF}}')"
+                )
+            # NOTE: `aftercorr` starts each run task once the setup task with the same index completes
+            hotstart_lines = [
+                '# run configurations as Slurm job arrays, indexed over run directories',
+                'pushd ${DIRECTORY} >/dev/null 2>&1',
+                f'mkdir -p {SLURM_ARRAY_LOG_DIRECTORY}',
+                'run_directories=(runs/*/)',
+                *selection_lines,
+                f'setup_jobid=$(sbatch {setup_dependencies}--array={array_range} {SLURM_ARRAY_FILENAMES["setup"]} | awk \'{{print $NF}}\')',
+                adcirc_submission,
+                'popd >/dev/null 2>&1',
+            ]
+            if record_jobs:
+                # each array task is recorded as `<array job ID>_<task ID>`
+                hotstart_lines.append(
+                    bash_for_loop(
+                        f'for index in {indices}',
+                        [
+                            record_job_command(
+                                '${run_directories[$index]%/}',
+                                'setup',
+                                '${setup_jobid}_${index}',
+                            ),
+                            record_job_command(
+                                '${run_directories[$index]%/}',
+                                'adcirc',
+                                '${adcirc_jobid}_${index}',
+                            ),
+                        ],
+                    )
+                )
         else:
-            hotstart_lines.extend(['sh setup.job', 'sh adcirc.job'])
-        hotstart_lines.append('popd >/dev/null 2>&1')
-        hotstart_lines = [
-            '# run configurations',
-            bash_for_loop('for hotstart in ${DIRECTORY}/runs/*/', hotstart_lines),
-        ]
+            hotstart_lines = ['pushd ${hotstart} >/dev/null 2>&1']
+            if self.platform.value['uses_slurm']:
+                dependencies = ['$setup_jobid']
+                if self.run_spinup:
+                    dependencies.append('$spinup_jobid')
+                if len(dependencies) > 0:
+                    dependencies = f'--dependency=afterok:{":".join(dependencies)}'
+                else:
+                    dependencies = ''
+                adcirc_submission = f'sbatch {dependencies} adcirc.job'
+                if record_jobs or self.segmented:
+                    adcirc_submission = (
+                        f"adcirc_jobid=$({adcirc_submission} | awk '{{print $NF}}')"
+                    )
+                # NOTE: `sbatch` will only use `--dependency` if it is BEFORE the job filename
+                hotstart_lines.extend(
+                    [
+                        f"setup_jobid=$(sbatch {setup_dependencies}setup.job | awk '{{print $NF}}')",
+                        adcirc_submission,
+                    ]
+                )
+                if record_jobs:
+                    hotstart_lines.extend(
+                        [
+                            record_job_command(
+                                'runs/$(basename ${hotstart})', 'setup', '$setup_jobid'
+                            ),
+                            record_job_command(
+                                'runs/$(basename ${hotstart})', 'adcirc', '$adcirc_jobid'
+                            ),
+                        ]
+                    )
+                if self.segmented:
+                    segment_lines = [
+                        "segment_jobid=$(sbatch --dependency=afterok:$segment_jobid ${segment} | awk '{print $NF}')"
+                    ]
+                    if record_jobs:
+                        segment_lines.append(
+                            record_job_command(
+                                'runs/$(basename ${hotstart})',
+                                '${segment%.job}',
+                                '$segment_jobid',
+                            )
+                        )
+                    hotstart_lines.extend(
+                        [
+                            'segment_jobid=$adcirc_jobid',
+                            bash_for_loop(SEGMENT_ITERATION, segment_lines),
+                        ]
+                    )
+            else:
+                hotstart_lines.extend(['sh setup.job', 'sh adcirc.job'])
+                if self.segmented:
+                    hotstart_lines.append(bash_for_loop(SEGMENT_ITERATION, ['sh ${segment}']))
+            hotstart_lines.append('popd >/dev/null 2>&1')
+            hotstart_lines = [
+                '# run configurations',
+                bash_for_loop(run_directory_iteration(self.run_directories), hotstart_lines),
+            ]
         lines.extend(hotstart_lines)
 
         if self.platform.value['uses_slurm']:
@@ -344,7 +551,29 @@ class EnsembleRunScript(Script):
 class EnsembleCleanupScript(Script):
     """ script for cleaning up ADCIRC NEMS configurations """
 
-    def __init__(self, commands: [str] = None):
+    def __init__(
+        self,
+        commands: [str] = None,
+        shared_partition: bool = False,
+        run_directories: [str] = None,
+        clean_spinup: bool = True,
+        clean_logs: bool = False,
+        segmented: bool = False,
+    ):
+        """
+        :param commands: shell commands to run before cleaning
+        :param shared_partition: whether the mesh was partitioned once in `partition/`
+        :param run_directories: names of the run directories (in `runs/`) to clean, defaulting to all
+        :param clean_spinup: whether to clean the spinup directory
+        :param clean_logs: also remove the Slurm logs and NetCDF output of runs, which would otherwise be read by `check_completion`
+        :param segmented: runs were split into hotstart segments, which replace the hotstart links to the spinup with copies
+        """
+
+        self.shared_partition = shared_partition
+        self.run_directories = run_directories
+        self.clean_spinup = clean_spinup
+        self.clean_logs = clean_logs
+        self.segmented = segmented
         super().__init__(commands)
 
     def __str__(self):
@@ -353,25 +582,56 @@ class EnsembleCleanupScript(Script):
         if self.shebang is not None:
             lines.append(self.shebang)
 
-        lines.extend(
-            [
-                *(str(command) for command in self.commands),
-                'DIRECTORY="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd -P)"',
+        if self.shared_partition:
+            partition_lines = [
+                '# clean shared mesh partition',
+                'pushd ${DIRECTORY}/partition >/dev/null 2>&1',
+                'rm -rf partmesh.txt metis_graph.txt',
+                'popd >/dev/null 2>&1',
                 '',
+            ]
+        else:
+            partition_lines = []
+
+        if self.clean_spinup:
+            spinup_lines = [
                 '# clean spinup files',
                 'pushd ${DIRECTORY}/spinup >/dev/null 2>&1',
                 'rm -rf PE* ADC_* max* partmesh.txt metis_graph.txt fort.16 fort.6* fort.80',
                 'popd >/dev/null 2>&1',
                 '',
+            ]
+        else:
+            spinup_lines = []
+
+        run_lines = [
+            'pushd ${hotstart} >/dev/null 2>&1',
+            'rm -rf PE* ADC_* max* partmesh.txt metis_graph.txt fort.16 fort.63 fort.64 fort.80',
+        ]
+        if self.clean_logs:
+            # hotstart files (`fort.67.nc`, `fort.68.nc`) are links to the spinup, and are kept
+            run_lines.append(
+                'rm -rf ADCIRC_*.log PET*.ESMF_LogFile fort.6[1-4].nc fort.7[1-4].nc'
+            )
+        if self.segmented:
+            # segments overwrite `fort.15` and the copies of the spinup hotstart files, which are restored
+            run_lines.extend(
+                [
+                    'if [ -f fort.15.segment_1 ]; then mv fort.15.segment_1 fort.15; fi',
+                    'if [ -d ../../spinup ]; then for hotstart_file in fort.67.nc fort.68.nc; do ln -sfn ../../spinup/${hotstart_file} ${hotstart_file}; done; fi',
+                ]
+            )
+        run_lines.append('popd >/dev/null 2>&1')
+
+        lines.extend(
+            [
+                *(str(command) for command in self.commands),
+                'DIRECTORY="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd -P)"',
+                '',
+                *partition_lines,
+                *spinup_lines,
                 '# clean run configurations',
-                bash_for_loop(
-                    'for hotstart in ${DIRECTORY}/runs/*/',
-                    [
-                        'pushd ${hotstart} >/dev/null 2>&1',
-                        'rm -rf PE* ADC_* max* partmesh.txt metis_graph.txt fort.16 fort.63 fort.64 fort.80',
-                        'popd >/dev/null 2>&1',
-                    ],
-                ),
+                bash_for_loop(run_directory_iteration(self.run_directories), run_lines),
             ]
         )
 
@@ -387,6 +647,17 @@ class EnsembleCleanupScript(Script):
         super().write(filename, overwrite)
 
 
+def expand_slurm_filename_pattern(filename: str) -> str:
+    """
+    :param filename: Slurm filename pattern, i.e. `ADCIRC_%A_%a.out.log`
+    :return: filename using the equivalent environment variables available within the job
+    """
+
+    for pattern, variable in SLURM_FILENAME_PATTERNS.items():
+        filename = filename.replace(pattern, variable)
+    return filename
+
+
 def bash_if_statement(
     condition: str, then: [str], *else_then: [[str]], indentation: str = '    '
 ) -> str:
@@ -441,6 +712,28 @@ def bash_if_statement(
     return '\n'.join(lines)
 
 
+def run_directory_iteration(run_directories: [str] = None) -> str:
+    """
+    :param run_directories: names of run directories (in `runs/`), defaulting to all
+    :return: Bash for loop statement over the given run directories, as `${hotstart}`
+    """
+
+    if run_directories is None:
+        return 'for hotstart in ${DIRECTORY}/runs/*/'
+    return f'for hotstart in {" ".join(f"${{DIRECTORY}}/runs/{name}/" for name in run_directories)}'
+
+
+def record_job_command(run: str, job: str, job_id: str) -> str:
+    """
+    :param run: run directory, relative to the ensemble directory
+    :param job: name of job (`setup` or `adcirc`)
+    :param job_id: job ID
+    :return: Bash statement appending the given job to the job registry of the ensemble
+    """
+
+    return f'echo "{run} {job} {job_id}" >> ${{DIRECTORY}}/{JOB_REGISTRY_FILENAME}'
+
+
 def bash_for_loop(iteration: str, do: [str], indentation='    ') -> str:
     """
     Create a for loop in Bash syntax using the given variable, iterator, and do statement(s).
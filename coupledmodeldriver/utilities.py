@@ -1,3 +1,5 @@
+import ctypes
+import ctypes.util
 from datetime import datetime, timedelta
 from enum import Enum, EnumMeta
 import json
@@ -5,10 +7,12 @@ import logging
 import os
 from os import PathLike
 from pathlib import Path
+import select
 import shutil
+import struct
 import sys
 import tarfile
-from typing import Any, Collection, Iterable, Mapping, Union
+from typing import Any, Callable, Collection, Iterable, Mapping, Union
 
 from dateutil.parser import parse as parse_date
 import numpy
@@ -245,8 +249,129 @@ def convert_value(value: Any, to_type: type) -> Any:
     return value
 
 
+def compile_converter(to_type: type) -> Callable[[Any], Any]:
+    """
+    resolve the given type once into a specialized function, equivalent to `convert_value(value, to_type)`
+
+    Common values (`None`, values that are already of the given type, and plain strings) are converted directly;
+    anything else falls back to `convert_value`.
+
+    :param to_type: type to which to convert values
+    :return: function converting a single value
+    """
+
+    if to_type is None:
+        return lambda value: value
+    elif isinstance(to_type, str):
+        to_type = eval(to_type)
+
+    def convert_generic(value: Any) -> Any:
+        return convert_value(value, to_type)
+
+    if isinstance(to_type, Collection):
+        collection_type = type(to_type)
+        if collection_type is EnumMeta:
+
+            def convert(value: Any) -> Any:
+                if value is None or type(value) is to_type:
+                    return value
+                return convert_generic(value)
+
+        elif issubclass(collection_type, Mapping):
+
+            def convert(value: Any) -> Any:
+                if isinstance(value, (Enum, str, CRS)):
+                    return convert_generic(value)
+                return value
+
+        else:
+            element_converters = [compile_converter(element_type) for element_type in to_type]
+
+            def convert(value: Any) -> Any:
+                if value is None:
+                    return collection_type()
+                elif isinstance(value, str):
+                    value = [value]
+                elif not isinstance(value, (list, tuple)):
+                    return convert_generic(value)
+                if len(element_converters) == 1:
+                    element_converter = element_converters[0]
+                    return collection_type(element_converter(entry) for entry in value)
+                elif len(element_converters) == len(value):
+                    return collection_type(
+                        element_converter(entry)
+                        for element_converter, entry in zip(element_converters, value)
+                    )
+                return convert_generic(value)
+
+    elif to_type is timedelta:
+
+        def convert(value: Any) -> Any:
+            if value is None or isinstance(value, timedelta):
+                return value
+            elif isinstance(value, str):
+                parts = value.split(':')
+                if len(parts) in (3, 4):
+                    try:
+                        parts = [float(part) for part in parts]
+                    except ValueError:
+                        return convert_generic(value)
+                    days = parts.pop(0) if len(parts) > 3 else 0
+                    return timedelta(
+                        days=days, hours=parts[0], minutes=parts[1], seconds=parts[2]
+                    )
+            return convert_generic(value)
+
+    elif to_type is datetime:
+
+        def convert(value: Any) -> Any:
+            if value is None or isinstance(value, datetime):
+                return value
+            elif isinstance(value, str):
+                try:
+                    converted_value = datetime.fromisoformat(value)
+                    if converted_value.tzinfo is None:
+                        return converted_value
+                except ValueError:
+                    pass
+            return convert_generic(value)
+
+    elif to_type is bool:
+        boolean_strings = {'True': True, 'False': False}
+
+        def convert(value: Any) -> Any:
+            if value is None or isinstance(value, bool):
+                return value
+            elif isinstance(value, str) and value in boolean_strings:
+                return boolean_strings[value]
+            return convert_generic(value)
+
+    elif to_type in (int, float, str, Path):
+
+        def convert(value: Any) -> Any:
+            if value is None or (isinstance(value, to_type) and not isinstance(value, Enum)):
+                return value
+            elif isinstance(value, str):
+                return to_type(value)
+            return convert_generic(value)
+
+    elif isinstance(to_type, type):
+
+        def convert(value: Any) -> Any:
+            if value is None or (isinstance(value, to_type) and not isinstance(value, Enum)):
+                return value
+            return convert_generic(value)
+
+    else:
+        convert = convert_generic
+
+    return convert
+
+
 def convert_to_json(value: Any) -> Union[str, float, int, dict, list, bool]:
-    if isinstance(value, Path):
+    if value is None:
+        return value
+    elif isinstance(value, Path):
         value = value.as_posix()
     elif isinstance(value, Enum):
         value = value.name
@@ -315,3 +440,89 @@ def extract_download(
             local_file.extractall(directory)
 
     os.remove(temporary_filename)
+
+
+class DirectoryWatcher:
+    """
+    wait for changes to files in the given directories, through `inotify` where available (Linux)
+
+    Without `inotify`, `wait` only sleeps for the given timeout, and changes must be found by polling.
+    Note that `inotify` does not see writes made from other hosts to network file systems (such as Lustre),
+    so callers should still poll when `wait` times out.
+    """
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    INOTIFY_MASK = 0x002 | 0x004 | 0x008 | 0x080 | 0x100 | 0x200
+    # IN_NONBLOCK | IN_CLOEXEC
+    INOTIFY_FLAGS = 0o4000 | 0o2000000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directories: [PathLike]):
+        """
+        :param directories: directories to watch
+        """
+
+        self.directories = [Path(directory) for directory in directories]
+
+        self.__file_descriptor = None
+        self.__watches = {}
+
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+                file_descriptor = libc.inotify_init1(self.INOTIFY_FLAGS)
+                if file_descriptor < 0:
+                    raise OSError(ctypes.get_errno(), 'could not initialize `inotify`')
+                for directory in self.directories:
+                    watch_descriptor = libc.inotify_add_watch(
+                        file_descriptor, os.fsencode(directory), self.INOTIFY_MASK
+                    )
+                    if watch_descriptor >= 0:
+                        self.__watches[watch_descriptor] = directory
+                self.__file_descriptor = file_descriptor
+            except (AttributeError, OSError) as error:
+                LOGGER.debug(f'`inotify` is not available; falling back to polling: {error}')
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self.__file_descriptor is not None
+
+    def wait(self, timeout: float = None) -> {Path}:
+        """
+        :param timeout: maximum number of seconds to wait
+        :return: directories in which files changed, or an empty set if the timeout elapsed
+        """
+
+        if self.__file_descriptor is None:
+            if timeout is not None:
+                select.select([], [], [], timeout)
+            return set()
+
+        readable, _, _ = select.select([self.__file_descriptor], [], [], timeout)
+        changed_directories = set()
+        if len(readable) > 0:
+            try:
+                events = os.read(self.__file_descriptor, 2 ** 16)
+            except BlockingIOError:
+                events = b''
+            position = 0
+            while position + self.EVENT_HEADER.size <= len(events):
+                watch_descriptor, _, _, name_length = self.EVENT_HEADER.unpack_from(
+                    events, position
+                )
+                if watch_descriptor in self.__watches:
+                    changed_directories.add(self.__watches[watch_descriptor])
+                position += self.EVENT_HEADER.size + name_length
+        return changed_directories
+
+    def close(self):
+        if self.__file_descriptor is not None:
+            os.close(self.__file_descriptor)
+            self.__file_descriptor = None
+            self.__watches = {}
+
+    def __enter__(self) -> 'DirectoryWatcher':
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
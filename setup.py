@@ -15,6 +15,7 @@ DEPENDENCIES = {
     'numpy': [],
     'pyproj': [],
     'requests': [],
+    'scipy': [],
 }
 
 
@@ -154,7 +155,7 @@ setup(
     long_description_content_type='text/markdown',
     url=metadata['url'],
     packages=find_packages(),
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     setup_requires=['dunamai', 'setuptools>=41.2'],
     install_requires=list(DEPENDENCIES),
     extras_require={
@@ -166,6 +167,7 @@ setup(
             'initialize_adcirc=coupledmodeldriver.client.initialize_adcirc:main',
             'generate_adcirc=coupledmodeldriver.client.generate_adcirc:main',
             'check_completion=coupledmodeldriver.client.check_completion:main',
+            'resubmit_adcirc=coupledmodeldriver.client.resubmit_adcirc:main',
         ],
     },
 )
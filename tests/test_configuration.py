@@ -1,20 +1,40 @@
 from datetime import datetime, timedelta
+import os
 from pathlib import Path
+import shutil
 
+from adcircpy import Tides
+from adcircpy.forcing.tides import TPXO
+from adcircpy.forcing.tides.dataset import TidalDataset
+from adcircpy.forcing.winds.best_track import read_atcf
 from nemspy.model import ADCIRCEntry, AtmosphericMeshEntry, WaveWatch3MeshEntry
+from netCDF4 import Dataset
+import numpy
 import pytest
 
 from coupledmodeldriver import Platform
 from coupledmodeldriver.configure import (
     ATMESHForcingJSON,
+    BestTrackForcingJSON,
     ModelDriverJSON,
     NEMSJSON,
     SlurmJSON,
     TidalForcingJSON,
     WW3DATAForcingJSON,
 )
+from coupledmodeldriver.configure.forcings.cache import (
+    BestTrackCache,
+    CachedBestTrackForcing,
+    CachedTidalDataset,
+    TidalBoundaryCache,
+)
+from coupledmodeldriver.configure.forcings.tides import (
+    EQUILIBRIUM_ARGUMENT_COEFFICIENTS,
+    tidal_arguments,
+    WindowedTPXO,
+)
 from coupledmodeldriver.generate.adcirc.base import ADCIRCJSON
-from tests import INPUT_DIRECTORY
+from tests import INPUT_DIRECTORY, OUTPUT_DIRECTORY
 
 
 def test_update():
@@ -31,6 +51,23 @@ def test_update():
     assert configuration.fields['test_entry_2'] == int
 
 
+def test_overlay():
+    configuration = SlurmJSON(account='coastal', tasks=602, job_duration=timedelta(hours=6))
+
+    overlay = configuration.overlay()
+    overlay.update({'job_duration': '01:00:00', 'test_entry': 'test value'})
+
+    assert overlay['account'] == 'coastal'
+    assert overlay['job_duration'] == timedelta(hours=1)
+    assert overlay['test_entry'] == 'test value'
+    assert configuration['job_duration'] == timedelta(hours=6)
+    assert 'test_entry' not in configuration
+    assert list(overlay.configuration.maps[0]) == ['job_duration', 'test_entry']
+    assert list(overlay.configuration)[: len(configuration.configuration)] == list(
+        configuration.configuration
+    )
+
+
 def test_slurm():
     configuration = SlurmJSON(
         account='coastal',
@@ -162,6 +199,226 @@ def test_tidal():
     assert list(configuration.adcircpy_forcing.active_constituents) == ['Q1', 'P1', 'M2']
 
 
+def test_tidal_arguments():
+    constituents = tuple(EQUILIBRIUM_ARGUMENT_COEFFICIENTS)
+    start_date = datetime(2018, 9, 13, 6)
+    end_date = datetime(2018, 9, 20)
+    spinup_time = timedelta(days=12.5)
+
+    tides = Tides.__new__(Tides)
+    tides.end_date = end_date
+    tides.start_date = start_date
+    tides.spinup_time = spinup_time
+
+    nodal_factors, equilibrium_arguments = tidal_arguments(
+        constituents, start_date, end_date, spinup_time
+    )
+    hits = tidal_arguments.cache_info().hits
+    tidal_arguments(constituents, start_date, end_date, spinup_time)
+
+    configuration = TidalForcingJSON(tidal_source='HAMTIDE', constituents='major')
+    major_arguments = configuration.tidal_arguments(start_date, end_date, spinup_time)
+
+    assert tidal_arguments.cache_info().hits == hits + 1
+    numpy.testing.assert_allclose(
+        nodal_factors, [tides.get_nodal_factor(constituent) for constituent in constituents],
+    )
+    assert numpy.allclose(
+        equilibrium_arguments,
+        [tides.get_greenwich_factor(constituent) for constituent in constituents],
+    )
+    assert list(major_arguments.index) == tides.major_constituents
+    assert numpy.allclose(
+        major_arguments['equilibrium_argument'],
+        [tides.get_greenwich_factor(constituent) for constituent in tides.major_constituents],
+    )
+
+
+def test_tidal_boundary_cache():
+    output_directory = OUTPUT_DIRECTORY / 'test_tidal_boundary_cache'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    class PlanarTides(TidalDataset):
+        def __init__(self):
+            super().__init__()
+            self.reads = 0
+
+        def get_amplitude(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+            self.reads += 1
+            return vertices[:, 0] + vertices[:, 1]
+
+        def get_phase(self, constituent: str, vertices: numpy.ndarray) -> numpy.ndarray:
+            return vertices[:, 0] - vertices[:, 1]
+
+        x = numpy.arange(-180, 180)
+        y = numpy.arange(-90, 90)
+        constituents = ['M2', 'S2']
+
+    vertices = numpy.array([[-72.5, 40.8], [-72.4, 40.7], [-72.3, 40.6]])
+
+    dataset = PlanarTides()
+    cached_dataset = CachedTidalDataset(dataset, TidalBoundaryCache(output_directory))
+    amplitude, phase = cached_dataset('M2', vertices)
+    cached_dataset('M2', vertices)
+    cached_dataset('S2', vertices)
+
+    # a new cache reads the values written by the first
+    reread_dataset = CachedTidalDataset(dataset, TidalBoundaryCache(output_directory))
+    reread_amplitude, reread_phase = reread_dataset('M2', vertices)
+
+    assert dataset.reads == 2
+    assert len(list(output_directory.glob('*.npy'))) == 2
+    assert numpy.array_equal(reread_amplitude, amplitude)
+    assert numpy.array_equal(reread_phase, dataset.get_phase('M2', vertices))
+
+
+def test_windowed_tpxo():
+    output_directory = OUTPUT_DIRECTORY / 'test_windowed_tpxo'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+    output_directory.mkdir(parents=True)
+
+    # a coarse global grid in the layout of `h_tpxo9.v1.nc`
+    longitudes = numpy.arange(0.25, 360, 0.5)
+    latitudes = numpy.arange(-89.75, 90, 0.5)
+    constituents = ['m2', 's2']
+
+    tpxo_filename = output_directory / 'h_tpxo9.v1.nc'
+    with Dataset(tpxo_filename, 'w') as dataset:
+        dataset.createDimension('nc', len(constituents))
+        dataset.createDimension('nct', 4)
+        dataset.createDimension('nx', len(longitudes))
+        dataset.createDimension('ny', len(latitudes))
+        dataset.createVariable('con', 'S1', ('nc', 'nct'))[:] = numpy.array(
+            [list(f'{constituent:4}') for constituent in constituents], dtype='S1'
+        )
+        x, y = numpy.meshgrid(longitudes, latitudes, indexing='ij')
+        dataset.createVariable('lon_z', 'f8', ('nx', 'ny'))[:] = x
+        dataset.createVariable('lat_z', 'f8', ('nx', 'ny'))[:] = y
+        # `s2` has land (zero) cells next to the first two vertices
+        land = (x >= 287.5) & (y >= 41)
+        dataset.createVariable('ha', 'f4', ('nc', 'nx', 'ny'))[:] = [
+            numpy.cos(numpy.radians(x)) * numpy.sin(numpy.radians(y)),
+            numpy.where(
+                land, 0, numpy.cos(numpy.radians(x)) * numpy.sin(numpy.radians(y)) + 1
+            ),
+        ]
+        dataset.createVariable('hp', 'f4', ('nc', 'nx', 'ny'))[:] = [
+            x % 360,
+            numpy.where(land, 0, (x + y) % 360),
+        ]
+
+    vertices = numpy.array(
+        [[-72.5, 40.8], [-72.3, 41.2], [-72.4, 40.7], [-71.9, 40.2], [-71.6, 39.9]]
+    )
+
+    tpxo = TPXO(tpxo_filename)
+    windowed_tpxo = WindowedTPXO(tpxo)
+    x_window, y_window = windowed_tpxo.window(vertices + [360, 0])
+
+    assert x_window.stop - x_window.start < 10
+    assert y_window.stop - y_window.start < 10
+    assert numpy.array_equal(
+        windowed_tpxo.get_amplitude('M2', vertices), tpxo.get_amplitude('M2', vertices)
+    )
+    assert numpy.array_equal(
+        windowed_tpxo.get_phase('M2', vertices), tpxo.get_phase('M2', vertices)
+    )
+
+    longitude, latitude = numpy.radians(vertices[:, 0]), numpy.radians(vertices[:, 1])
+    numpy.testing.assert_allclose(
+        windowed_tpxo.get_amplitude('S2', vertices),
+        numpy.cos(longitude) * numpy.sin(latitude) + 1,
+        rtol=1e-4,
+    )
+    numpy.testing.assert_allclose(
+        windowed_tpxo.get_phase('S2', vertices),
+        vertices[:, 0] + 360 + vertices[:, 1],
+        rtol=1e-6,
+    )
+
+    tpxo.dataset.close()
+
+
+def test_besttrack_cache():
+    output_directory = OUTPUT_DIRECTORY / 'test_besttrack_cache'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    track = read_atcf(INPUT_DIRECTORY / 'forcings' / 'ike' / 'fort.22')
+    mirror = BestTrackCache(output_directory / 'mirror', offline=True)
+    mirror.store('ike2008', track)
+
+    configuration = BestTrackForcingJSON(
+        storm_id='ike2008',
+        nws=20,
+        start_date=datetime(2008, 9, 8),
+        end_date=datetime(2008, 9, 12),
+    )
+
+    BestTrackForcingJSON.cache = mirror
+    try:
+        # served from the mirror, without looking up the storm or downloading its track
+        forcing = configuration.adcircpy_forcing
+        fort22 = str(forcing)
+
+        with pytest.raises(FileNotFoundError):
+            BestTrackForcingJSON(storm_id='florence2018').adcircpy_forcing
+    finally:
+        BestTrackForcingJSON.cache = None
+
+    expiring_cache = BestTrackCache(output_directory / 'mirror', ttl=timedelta(days=1))
+    assert expiring_cache.is_fresh('ike2008')
+    expired_time = (datetime.now() - timedelta(days=2)).timestamp()
+    os.utime(expiring_cache.filename('ike2008'), (expired_time, expired_time))
+
+    assert mirror.track('ike2008').equals(track)
+    assert isinstance(forcing, CachedBestTrackForcing)
+    assert forcing.storm_id == 'AL092008'
+    assert fort22.startswith('AL, 09, 2008090800')
+    assert not expiring_cache.is_fresh('ike2008')
+    assert not expiring_cache.is_fresh('florence2018')
+
+
+def test_forcing_memoization():
+    output_directory = OUTPUT_DIRECTORY / 'test_forcing_memoization'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    mirror = BestTrackCache(output_directory / 'mirror', offline=True)
+    mirror.store('ike2008', read_atcf(INPUT_DIRECTORY / 'forcings' / 'ike' / 'fort.22'))
+
+    configuration = BestTrackForcingJSON(
+        storm_id='ike2008',
+        nws=20,
+        start_date=datetime(2008, 9, 8),
+        end_date=datetime(2008, 9, 12),
+    )
+
+    BestTrackForcingJSON.cache = mirror
+    try:
+        forcing = configuration.adcircpy_forcing
+        assert configuration.adcircpy_forcing is forcing
+
+        # setting an unchanged entry keeps the forcing object
+        configuration.update({'nws': 20})
+        assert configuration.adcircpy_forcing is forcing
+
+        configuration['end_date'] = datetime(2008, 9, 11)
+        updated_forcing = configuration.adcircpy_forcing
+        assert updated_forcing is not forcing
+        assert updated_forcing.end_date == datetime(2008, 9, 11)
+
+        assert '_ForcingJSON__adcircpy_forcing' not in configuration.__getstate__()
+    finally:
+        BestTrackForcingJSON.cache = None
+
+
 def test_atmesh():
     configuration = ATMESHForcingJSON(
         resource='Wind_HWRF_SANDY_Nov2018_ExtendedSmoothT.nc',
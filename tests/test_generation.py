@@ -1,17 +1,55 @@
 from datetime import datetime, timedelta
-
+import json
+import math
+import os
+from pathlib import Path
+import pickle
+import shutil
+from typing import Any
+
+from adcircpy import AdcircMesh
 from adcircpy.forcing.tides.tides import TidalSource, Tides
 from adcircpy.forcing.waves.ww3 import WaveWatch3DataForcing
 from adcircpy.forcing.winds.atmesh import AtmosphericMeshForcing
 from adcircpy.forcing.winds.best_track import BestTrackForcing
+import netCDF4
+import numpy
 import pytest
 
 from coupledmodeldriver import Platform
+from coupledmodeldriver.client.check_completion import (
+    check_completion,
+    COMPLETION_CACHE_FILENAME,
+    ensemble_telemetry,
+    watch_completion,
+)
+from coupledmodeldriver.client.resubmit_adcirc import resubmit_adcirc_configuration
+from coupledmodeldriver.configure import BestTrackForcingJSON, TidalForcingJSON
 from coupledmodeldriver.generate import (
     ADCIRCRunConfiguration,
     generate_adcirc_configuration,
     NEMSADCIRCRunConfiguration,
 )
+from coupledmodeldriver.generate.adcirc.check import (
+    adcirc_completion_fingerprint,
+    OutputStatus,
+    scan_log,
+    validate_adcirc_outputs,
+)
+from coupledmodeldriver.generate.adcirc.checkpoint import (
+    HotstartPlanner,
+    optimal_checkpoint_interval,
+    read_mesh_size,
+)
+from coupledmodeldriver.generate.adcirc.fort15 import (
+    ATTRIBUTE_LINES,
+    Fort15Template,
+    fort15_values,
+)
+from coupledmodeldriver.generate.adcirc.mesh import SharedMesh
+from coupledmodeldriver.generate.adcirc.script import AdcircRunJob, AdcircSetupJob
+from coupledmodeldriver.scheduler import JobState, LocalScheduler
+from coupledmodeldriver.script import EnsembleRunScript
 from tests import (
     check_reference_directory,
     INPUT_DIRECTORY,
@@ -898,3 +936,941 @@ def test_stampede2_adcirc_tidal_nems_atmesh_ww3data():
             'nems.configure': [0],
         },
     )
+
+
+def test_shared_mesh():
+    mesh = AdcircMesh.open(INPUT_DIRECTORY / 'meshes' / 'shinnecock' / 'fort.14', crs=4326)
+
+    with SharedMesh.from_adcircpy(mesh) as shared_mesh:
+        attached_mesh = pickle.loads(pickle.dumps(shared_mesh))
+        attached_adcircpy_mesh = attached_mesh.adcircpy_mesh
+
+        assert len(pickle.dumps(shared_mesh)) < 10000
+        assert not attached_mesh.coordinates.flags.writeable
+        assert numpy.all(attached_adcircpy_mesh.coords == mesh.coords)
+        assert numpy.all(attached_adcircpy_mesh.values == mesh.values)
+        assert str(attached_adcircpy_mesh) == str(mesh)
+
+        attached_mesh.close()
+
+
+def test_nodal_attributes_loaded_once(monkeypatch):
+    output_directory = OUTPUT_DIRECTORY / 'test_nodal_attributes_loaded_once'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    # mesh without `fort.13`, for which tau0 is generated
+    tau0_mesh_directory = output_directory / 'mesh_without_fort13'
+    tau0_mesh_directory.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(
+        INPUT_DIRECTORY / 'meshes' / 'shinnecock' / 'fort.14', tau0_mesh_directory / 'fort.14',
+    )
+
+    calls = {'import_nodal_attributes': 0, 'generate_tau0': 0}
+    for method_name in calls:
+        method = getattr(AdcircMesh, method_name)
+
+        def counted(self, *args, __method=method, __method_name=method_name, **kwargs):
+            calls[__method_name] += 1
+            return __method(self, *args, **kwargs)
+
+        monkeypatch.setattr(AdcircMesh, method_name, counted)
+
+    # attributes are loaded once when writing the mesh of the ensemble and, if the runs read a rewritten `fort.13`, once
+    # more for all runs, instead of once for every run
+    for mesh_directory, expected_calls in [
+        (
+            INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+            {'import_nodal_attributes': 2, 'generate_tau0': 0},
+        ),
+        (tau0_mesh_directory, {'import_nodal_attributes': 0, 'generate_tau0': 1}),
+    ]:
+        for method_name in calls:
+            calls[method_name] = 0
+
+        configuration = ADCIRCRunConfiguration(
+            mesh_directory=mesh_directory,
+            modeled_start_time=datetime(2008, 8, 23),
+            modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+            modeled_timestep=timedelta(seconds=2),
+            platform=Platform.HERA,
+            slurm_job_duration=timedelta(hours=6),
+            perturbations={
+                # the time step is not written from the `fort.15` template, so every run builds its mesh
+                f'run_{index}': {'adcirc': {'modeled_timestep': timedelta(seconds=index)}}
+                for index in range(1, 4)
+            },
+        )
+        configuration_directory = output_directory / mesh_directory.name
+        configuration.write_directory(configuration_directory, overwrite=True)
+        generate_adcirc_configuration(configuration_directory, overwrite=True, parallel=False)
+
+        for index in range(1, 4):
+            assert (configuration_directory / 'runs' / f'run_{index}' / 'fort.15').exists()
+        assert calls == expected_calls
+
+    # each mesh holds its own copy of the cached attribute values
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        platform=Platform.HERA,
+    )
+    configuration['adcirc'].preload()
+    first_values = configuration['adcirc'].adcircpy_mesh.get_nodal_attribute(
+        'primitive_weighting_in_continuity_equation'
+    )['values']
+    first_values[:] = -1
+    second_values = configuration['adcirc'].adcircpy_mesh.get_nodal_attribute(
+        'primitive_weighting_in_continuity_equation'
+    )['values']
+
+    assert second_values is not first_values
+    assert not numpy.any(second_values == -1)
+
+
+def test_fort15_template():
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+        perturbations={
+            'run_1': {'adcirc': {'attributes': {'CF': 0.0025, 'NHSTAR': 0}}},
+            'run_2': {'adcirc': {'modeled_timestep': timedelta(seconds=1)}},
+        },
+    )
+
+    template = Fort15Template(configuration)
+
+    run_1 = configuration.perturbed(configuration['modeldriver']['perturbations']['run_1'])
+    run_2 = configuration.perturbed(configuration['modeldriver']['perturbations']['run_2'])
+
+    assert template.perturbed_attributes(configuration) == {}
+    assert template.perturbed_attributes(run_1) == {'CF': 0.0025, 'NHSTAR': 0}
+    assert template.perturbed_attributes(run_2) is None
+
+    output_directory = OUTPUT_DIRECTORY / 'test_fort15_template'
+    template.write(
+        output_directory / 'template', template.perturbed_attributes(run_1), overwrite=True,
+    )
+    run_1.adcircpy_driver.write(
+        output_directory / 'reference',
+        overwrite=True,
+        fort14=None,
+        coldstart=None,
+        hotstart='fort.15',
+        driver=None,
+    )
+
+    with open(output_directory / 'template' / 'fort.15') as template_file:
+        template_lines = template_file.readlines()
+    with open(output_directory / 'reference' / 'fort.15') as reference_file:
+        reference_lines = reference_file.readlines()
+
+    # skip run description, which contains the creation time
+    assert template_lines[1:] == reference_lines[1:]
+
+
+def test_fort15_template_attributes():
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+    )
+
+    perturbed_values = {
+        'NFOVER': 0,
+        'NABOUT': 0,
+        'NSCREEN': 50,
+        'ICS': 1,
+        'NCOR': 0,
+        'NTIP': 2,
+        'G': 9.80665,
+        'DRAMP': 2.123456789,
+        'H0': 0.0123456789,
+        'VELMIN': 0.0234567891,
+        'SLAM0': -72.123456789,
+        'SFEA0': 40.987654321,
+        'FFACTOR': 0.00312345678,
+        'CF': 0.00312345678,
+        'HBREAK': 1.23456789,
+        'FTHETA': 9.87654321,
+        'FGAMMA': 0.123456789,
+        'ESLM': -0.123456789,
+        'CORI': 0.000123456789,
+        'ANGINN': 91.23456789,
+        'THAS': 1.23456789,
+        'THAF': 10.123456789,
+        'NHAINC': 123,
+        'FMV': 0.123456789,
+        'NHSTAR': 5,
+        'NHSINC': 3600,
+        'ITITER': -1,
+        'ISLDIA': 1,
+        'CONVCR': 1.23456789e-10,
+        'ITMAX': 30,
+        'NCPROJ': 'project',
+        'NCINST': 'institution',
+        'NCSOUR': 'source',
+        'NCHIST': 'history',
+        'NCREF': 'references',
+        'NCCOM': 'comments',
+        'NCHOST': 'host',
+        'NCCONV': 'CF-1.6',
+    }
+
+    assert set(perturbed_values) == set(ATTRIBUTE_LINES)
+
+    template = Fort15Template(configuration)
+
+    output_directory = OUTPUT_DIRECTORY / 'test_fort15_template_attributes'
+    templated_attributes = []
+    for name, value in perturbed_values.items():
+        run = configuration.perturbed({'adcirc': {'attributes': {name: value}}})
+        run_directory = output_directory / name
+
+        try:
+            run.adcircpy_driver.write(
+                run_directory / 'reference',
+                overwrite=True,
+                fort14=None,
+                coldstart=None,
+                hotstart='fort.15',
+                driver=None,
+            )
+        except Exception:
+            # runs that `adcircpy` cannot write (i.e. `NCOR = 0`) are not written from the template either
+            assert template.perturbed_attributes(run) is None
+            continue
+
+        attributes = template.perturbed_attributes(run)
+        if attributes is None:
+            continue
+        assert attributes == {name: value}
+        template.write(run_directory / 'template', attributes, overwrite=True)
+
+        with open(run_directory / 'template' / 'fort.15') as template_file:
+            template_lines = template_file.readlines()
+        with open(run_directory / 'reference' / 'fort.15') as reference_file:
+            reference_lines = reference_file.readlines()
+
+        # skip run description, which contains the creation time
+        assert template_lines[1:] == reference_lines[1:], name
+        templated_attributes.append(name)
+
+    assert {'G', 'H0', 'CF', 'ESLM', 'NHSTAR', 'CONVCR', 'NCPROJ'} <= set(templated_attributes)
+
+
+def test_incremental_generation():
+    output_directory = OUTPUT_DIRECTORY / 'test_incremental_generation'
+
+    def configuration(perturbations: {str: {str: {str: Any}}}) -> ADCIRCRunConfiguration:
+        return ADCIRCRunConfiguration(
+            mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+            modeled_start_time=datetime(2008, 8, 23),
+            modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+            modeled_timestep=timedelta(seconds=2),
+            platform=Platform.HERA,
+            slurm_job_duration=timedelta(hours=6),
+            perturbations=perturbations,
+        )
+
+    configuration(
+        {
+            'run_1': {'adcirc': {'attributes': {'CF': 0.0025}}},
+            'run_2': {'adcirc': {'attributes': {'CF': 0.003}}},
+            'run_3': {'adcirc': {'attributes': {'CF': 0.0035}}},
+        }
+    ).write_directory(output_directory, overwrite=True)
+    generate_adcirc_configuration(output_directory, overwrite=True, parallel=False)
+
+    run_1_modified_time = (output_directory / 'runs' / 'run_1' / 'fort.15').stat().st_mtime_ns
+
+    configuration(
+        {
+            'run_1': {'adcirc': {'attributes': {'CF': 0.0025}}},
+            'run_2': {'adcirc': {'attributes': {'CF': 0.004}}},
+        }
+    ).write_directory(output_directory, overwrite=True)
+    generate_adcirc_configuration(
+        output_directory, overwrite=True, parallel=False, incremental=True, remove_stale=True,
+    )
+
+    with open(output_directory / 'runs' / 'run_2' / 'fort.15') as fort15_file:
+        run_2_fort15 = fort15_file.read()
+
+    assert (
+        output_directory / 'runs' / 'run_1' / 'fort.15'
+    ).stat().st_mtime_ns == run_1_modified_time
+    assert '0.004 ' in run_2_fort15
+    assert not (output_directory / 'runs' / 'run_3').exists()
+
+
+def test_spinup_cache():
+    output_directory = OUTPUT_DIRECTORY / 'test_spinup_cache'
+    spinup_cache_directory = output_directory / 'spinup_cache'
+
+    if spinup_cache_directory.exists():
+        shutil.rmtree(spinup_cache_directory)
+
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        tidal_spinup_duration=timedelta(days=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+        perturbations={'run_1': None},
+    )
+
+    for name in ['first', 'second']:
+        configuration.write_directory(output_directory / name, overwrite=True)
+
+    generate_adcirc_configuration(
+        output_directory / 'first',
+        overwrite=True,
+        parallel=False,
+        spinup_cache_directory=spinup_cache_directory,
+    )
+
+    with open(output_directory / 'first' / 'spinup' / 'adcirc.job') as job_file:
+        spinup_commands = job_file.read()
+    spinup_cache_entry = Path(
+        [line for line in spinup_commands.splitlines() if line.startswith('mv -T')][0].split()[
+            3
+        ]
+    )
+
+    assert spinup_cache_entry.parent == spinup_cache_directory
+    assert not spinup_cache_entry.exists()
+    assert (
+        'for hotstart_file in fort.67.nc fort.68.nc; do if [ -f ${hotstart_file} ]; then cp ${hotstart_file} ${cache_entry}/; fi; done'
+        in spinup_commands
+    )
+
+    # simulate the completed spinup storing its hotstart file (a spinup may write only one)
+    spinup_cache_entry.mkdir(parents=True, exist_ok=True)
+    (spinup_cache_entry / 'fort.67.nc').touch()
+
+    generate_adcirc_configuration(
+        output_directory / 'second',
+        overwrite=True,
+        parallel=False,
+        spinup_cache_directory=spinup_cache_directory,
+    )
+
+    with open(output_directory / 'second' / 'run_hera.sh') as run_script_file:
+        run_script = run_script_file.read()
+
+    assert not (output_directory / 'second' / 'spinup').exists()
+    assert '# run spinup' not in run_script
+    assert (output_directory / 'second' / 'runs' / 'run_1' / 'fort.67.nc').resolve() == (
+        spinup_cache_entry / 'fort.67.nc'
+    ).resolve()
+
+
+def test_iterate_perturbed():
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        platform=Platform.HERA,
+        perturbations={
+            f'run_{index}': {'adcirc': {'attributes': {'CF': 0.001 * index}}}
+            for index in range(1, 4)
+        },
+    )
+
+    perturbed_configurations = configuration.iterate_perturbed()
+    run_name, run_configuration = next(perturbed_configurations)
+
+    assert run_name == 'run_1'
+    assert run_configuration['adcirc']['attributes']['CF'] == 0.001
+    assert configuration['adcirc']['attributes']['CF'] is None
+    assert [run_name for run_name, _ in configuration.iterate_perturbed(runs=['run_3'])] == [
+        'run_3'
+    ]
+    assert list(configuration.perturb()) == ['run_1', 'run_2', 'run_3']
+
+
+def test_job_array_scripts():
+    run_script = str(
+        EnsembleRunScript(platform=Platform.HERA, job_array=True, job_array_throttle=10)
+    )
+    job_script = str(
+        AdcircRunJob(
+            platform=Platform.HERA,
+            slurm_tasks=600,
+            slurm_account='coastal',
+            slurm_duration=timedelta(hours=6),
+            slurm_run_name='ADCIRC_HOTSTART',
+            slurm_log_filename='logs/ADCIRC_HOTSTART_%A_%a.out.log',
+            slurm_error_filename='logs/ADCIRC_HOTSTART_%A_%a.err.log',
+            slurm_array_directories='runs/*/',
+        )
+    )
+
+    assert 'for hotstart in' not in run_script
+    assert '--array=0-$((${#run_directories[@]} - 1))%10 setup_array.job' in run_script
+    assert '--dependency=aftercorr:$setup_jobid,afterok:$spinup_jobid' in run_script
+    assert 'cd ${run_directories[${SLURM_ARRAY_TASK_ID}]}' in job_script
+    assert (
+        'ln -sf ${SLURM_SUBMIT_DIR}/logs/ADCIRC_HOTSTART_${SLURM_ARRAY_JOB_ID}_${SLURM_ARRAY_TASK_ID}.out.log '
+        'ADCIRC_HOTSTART_$(basename ${PWD}).out.log'
+    ) in job_script
+
+
+def test_shared_partition_scripts():
+    run_script = str(EnsembleRunScript(platform=Platform.HERA, shared_partition=True))
+    setup_script = str(
+        AdcircSetupJob(
+            platform=Platform.HERA,
+            adcirc_mesh_partitions=600,
+            slurm_account='coastal',
+            slurm_duration=timedelta(hours=6),
+            slurm_run_name='ADCIRC_SETUP_run_1',
+            mesh_partition_directory='../../partition',
+        )
+    )
+
+    assert "partition_jobid=$(sbatch setup.job | awk '{print $NF}')" in run_script
+    assert run_script.count('sbatch --dependency=afterok:$partition_jobid setup.job') == 2
+    assert 'ln -sf ../../partition/partmesh.txt partmesh.txt' in setup_script
+    assert '--partmesh' not in setup_script
+    assert '--prepall' in setup_script
+
+
+def test_generation_restores_caches():
+    output_directory = OUTPUT_DIRECTORY / 'test_generation_restores_caches'
+
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+        perturbations={'run_1': None},
+    )
+    configuration.write_directory(output_directory, overwrite=True)
+
+    besttrack_cache = BestTrackForcingJSON.cache
+    tidal_cache = TidalForcingJSON.cache
+    working_directory = Path.cwd()
+
+    # segmenting without a throughput fails once the caches are in place
+    with pytest.raises(ValueError):
+        generate_adcirc_configuration(
+            output_directory,
+            overwrite=True,
+            parallel=False,
+            besttrack_cache_directory=output_directory / 'besttrack_cache',
+            tidal_cache_directory=output_directory / 'tidal_cache',
+            segment_duration=timedelta(hours=4),
+        )
+
+    assert BestTrackForcingJSON.cache is besttrack_cache
+    assert TidalForcingJSON.cache is tidal_cache
+    assert Path.cwd() == working_directory
+
+
+def test_check_completion_cache():
+    output_directory = OUTPUT_DIRECTORY / 'test_check_completion_cache'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    for run_name in ['run_1', 'run_2']:
+        run_directory = output_directory / 'runs' / run_name
+        run_directory.mkdir(parents=True, exist_ok=True)
+        for filename in ['fort.14', 'fort.15', 'fort.16', 'ADCIRC_HOTSTART_run.err.log']:
+            (run_directory / filename).touch()
+        with open(run_directory / 'ADCIRC_HOTSTART_run.out.log', 'w') as log_file:
+            log_file.write('TIME STEP = 1 50.0% COMPLETE\n')
+
+    completion = check_completion(output_directory)
+
+    with open(
+        output_directory / 'runs' / 'run_2' / 'ADCIRC_HOTSTART_run.out.log', 'a'
+    ) as log_file:
+        log_file.write('TIME STEP = 2 100.0% COMPLETE\nEnd Epilogue\n')
+
+    cached_completion = check_completion(output_directory)
+
+    assert (output_directory / COMPLETION_CACHE_FILENAME).exists()
+    assert list(completion['runs']) == list(cached_completion['runs'])
+    assert cached_completion['runs']['run_1'] == completion['runs']['run_1']
+    assert cached_completion['runs']['run_2'].endswith('100.0%')
+    assert check_completion(output_directory, use_cache=False) == cached_completion
+
+    # the modeled window is read from the ensemble configuration, which must invalidate cached completion
+    with open(output_directory / 'configure_adcirc.json', 'w') as configuration_file:
+        json.dump({'modeled_start_time': '2008-08-23 00:00:00'}, configuration_file)
+
+    assert '../../configure_adcirc.json' in adcirc_completion_fingerprint(
+        output_directory / 'runs' / 'run_1'
+    )
+
+
+def test_job_registry():
+    output_directory = OUTPUT_DIRECTORY / 'test_job_registry'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    run_script = str(EnsembleRunScript(platform=Platform.HERA, job_registry=True))
+
+    for run_name in ['run_1', 'run_2']:
+        run_directory = output_directory / 'runs' / run_name
+        run_directory.mkdir(parents=True, exist_ok=True)
+        for filename in ['fort.14', 'fort.15']:
+            (run_directory / filename).touch()
+    for filename in ['fort.16', 'ADCIRC_HOTSTART_run.err.log', 'ADCIRC_HOTSTART_run.out.log']:
+        (output_directory / 'runs' / 'run_1' / filename).touch()
+
+    with open(output_directory / 'jobs.txt', 'w') as registry_file:
+        registry_file.write('runs/run_1 setup 100\nruns/run_1 adcirc 101\n')
+        registry_file.write('runs/run_2 setup 102\nruns/run_2 adcirc 103\n')
+        # resubmitted jobs replace the jobs recorded before them
+        registry_file.write('runs/run_2 setup 104\nruns/run_2 adcirc 105\n')
+
+    scheduler = LocalScheduler(
+        {
+            '100': JobState.COMPLETED,
+            '101': JobState.TIMEOUT,
+            '103': JobState.CANCELLED,
+            '104': JobState.RUNNING,
+            '105': JobState.PENDING,
+        }
+    )
+    completion = check_completion(output_directory, use_cache=False, scheduler=scheduler)
+    verbose_completion = check_completion(
+        output_directory, verbose=True, use_cache=False, scheduler=scheduler
+    )
+
+    assert (
+        'echo "runs/$(basename ${hotstart}) adcirc $adcirc_jobid" >> ${DIRECTORY}/jobs.txt'
+        in run_script
+    )
+    assert 'echo "spinup adcirc $spinup_jobid" >> ${DIRECTORY}/jobs.txt' in run_script
+    assert 'jobs.txt' not in str(EnsembleRunScript(platform=Platform.HERA))
+    assert scheduler.queries == [['100', '101', '104', '105']] * 2
+    assert completion['runs']['run_1'].startswith('failed')
+    assert completion['runs']['run_2'].startswith('in_setup')
+    assert verbose_completion['runs']['run_1']['jobs']['adcirc'] == {
+        'job_id': '101',
+        'state': 'timeout',
+    }
+
+
+def test_resubmit_adcirc_configuration():
+    output_directory = OUTPUT_DIRECTORY / 'test_resubmit_adcirc_configuration'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    for run_name in ['spinup', 'runs/run_1', 'runs/run_2', 'runs/run_3', 'runs/run_4']:
+        run_directory = output_directory / run_name
+        run_directory.mkdir(parents=True, exist_ok=True)
+        for filename in ['fort.14', 'fort.15']:
+            (run_directory / filename).touch()
+    for run_name in ['spinup', 'runs/run_1', 'runs/run_2']:
+        run_directory = output_directory / run_name
+        for filename in ['fort.16', 'ADCIRC_HOTSTART_run.err.log']:
+            (run_directory / filename).touch()
+        with open(run_directory / 'ADCIRC_HOTSTART_run.out.log', 'w') as log_file:
+            log_file.write('TIME STEP = 2 100.0% COMPLETE\nEnd Epilogue\n')
+        with open(run_directory / 'PET0.ESMF_LogFile', 'w') as log_file:
+            log_file.write('20080823 000000.000 INFO PET0 finished\n')
+    with open(output_directory / 'runs' / 'run_2' / 'PET0.ESMF_LogFile', 'a') as log_file:
+        log_file.write('20080823 000000.000 ERROR PET0 segmentation fault\n')
+
+    with open(output_directory / 'configure_modeldriver.json', 'w') as configuration_file:
+        json.dump({'platform': 'HERA'}, configuration_file)
+    with open(output_directory / 'jobs.txt', 'w') as registry_file:
+        registry_file.write(
+            'runs/run_2 adcirc 100\nruns/run_3 adcirc 101\nruns/run_4 adcirc 102\n'
+        )
+    (output_directory / 'setup_array.job').touch()
+    (output_directory / 'adcirc_array.job').touch()
+    with open(output_directory / 'run_hera.sh', 'w') as run_script_file:
+        run_script_file.write(
+            'sbatch --array=0-$((${#run_directories[@]} - 1))%5 setup_array.job\n'
+        )
+
+    scheduler = LocalScheduler(
+        {'100': JobState.FAILED, '101': JobState.CANCELLED, '102': JobState.PENDING}
+    )
+    resubmitted = resubmit_adcirc_configuration(
+        output_directory, submit=False, scheduler=scheduler
+    )
+
+    with open(output_directory / 'resubmit_hera.sh') as resubmit_script_file:
+        resubmit_script = resubmit_script_file.read()
+    with open(output_directory / 'cleanup_resubmit.sh') as cleanup_script_file:
+        cleanup_script = cleanup_script_file.read()
+
+    assert resubmitted == ['runs/run_2', 'runs/run_3']
+    assert 'runs/run_2/|runs/run_3/) array_indices+=(${index}) ;;' in resubmit_script
+    assert '--array=$(IFS=,; echo "${array_indices[*]}")%5' in resubmit_script
+    assert 'spinup' not in resubmit_script
+    assert 'spinup_jobid' not in resubmit_script
+    assert (
+        'echo "${run_directories[$index]%/} adcirc ${adcirc_jobid}_${index}"'
+        in resubmit_script
+    )
+    assert (
+        'for hotstart in ${DIRECTORY}/runs/run_2/ ${DIRECTORY}/runs/run_3/' in cleanup_script
+    )
+    assert 'spinup' not in cleanup_script
+
+
+def test_resubmit_adcirc_spinup():
+    output_directory = OUTPUT_DIRECTORY / 'test_resubmit_adcirc_spinup'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    for run_name in ['spinup', 'runs/run_1', 'runs/run_2']:
+        run_directory = output_directory / run_name
+        run_directory.mkdir(parents=True, exist_ok=True)
+        for filename in ['fort.14', 'fort.15']:
+            (run_directory / filename).touch()
+    (output_directory / 'runs' / 'run_1' / 'adcirc_segment_2.job').touch()
+
+    with open(output_directory / 'configure_modeldriver.json', 'w') as configuration_file:
+        json.dump({'platform': 'HERA'}, configuration_file)
+    with open(output_directory / 'jobs.txt', 'w') as registry_file:
+        registry_file.write(
+            'spinup adcirc 200\n'
+            'runs/run_1 setup 201\nruns/run_1 adcirc 202\n'
+            'runs/run_2 setup 203\nruns/run_2 adcirc 204\n'
+        )
+
+    # `run_1` waits on the failed spinup, while the setup of `run_2` is still running
+    scheduler = LocalScheduler(
+        {
+            '200': JobState.FAILED,
+            '201': JobState.PENDING,
+            '202': JobState.PENDING,
+            '203': JobState.RUNNING,
+            '204': JobState.PENDING,
+        }
+    )
+    resubmitted = resubmit_adcirc_configuration(
+        output_directory, submit=False, scheduler=scheduler
+    )
+
+    with open(output_directory / 'resubmit_hera.sh') as resubmit_script_file:
+        resubmit_script = resubmit_script_file.read()
+    with open(output_directory / 'cleanup_resubmit.sh') as cleanup_script_file:
+        cleanup_script = cleanup_script_file.read()
+
+    assert resubmitted == ['spinup', 'runs/run_1']
+    assert 'scancel 201 202\n' in resubmit_script
+    assert 'for hotstart in ${DIRECTORY}/runs/run_1/; do' in resubmit_script
+    assert 'segment_jobid=$adcirc_jobid' in resubmit_script
+    assert 'mv fort.15.segment_1 fort.15' in cleanup_script
+    assert 'ln -sfn ../../spinup/${hotstart_file} ${hotstart_file}' in cleanup_script
+
+    spinup_script = str(
+        EnsembleRunScript(
+            Platform.HERA,
+            run_spinup=True,
+            job_array=True,
+            job_registry=True,
+            run_directories=[],
+        )
+    )
+
+    assert 'spinup_jobid' in spinup_script
+    assert 'array_indices' not in spinup_script
+    assert '--array=' not in spinup_script
+
+
+def test_segmented_runs():
+    output_directory = OUTPUT_DIRECTORY / 'test_segmented_runs'
+
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        tidal_spinup_duration=timedelta(days=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+        perturbations={'run_1': None},
+    )
+    configuration.write_directory(output_directory, overwrite=True)
+
+    # 4 hours at 60 modeled seconds per second is 10 modeled days, so segments end 10 days after coldstart
+    generate_adcirc_configuration(
+        output_directory,
+        overwrite=True,
+        parallel=False,
+        job_registry=True,
+        segment_duration=timedelta(hours=4),
+        throughput=60,
+    )
+
+    run_directory = output_directory / 'runs' / 'run_1'
+    fort15_values = {}
+    for filename in ['fort.15', 'fort.15.segment_2']:
+        with open(run_directory / filename) as fort15_file:
+            fort15_values[filename] = {
+                line.split(' ! ')[1].split(' - ')[0].strip(): line.split(' ! ')[0].strip()
+                for line in fort15_file
+                if ' ! ' in line
+            }
+    with open(run_directory / 'adcirc_segment_2.job') as job_file:
+        segment_script = job_file.read()
+    with open(output_directory / 'run_hera.sh') as run_script_file:
+        run_script = run_script_file.read()
+
+    assert not (run_directory / 'adcirc_segment_3.job').exists()
+    assert fort15_values['fort.15']['IHOT'] == '567'
+    assert fort15_values['fort.15']['RNDAY'] == '10'
+    assert fort15_values['fort.15']['NHSTAR NHSINC'] == '5 432000'
+    assert fort15_values['fort.15.segment_2']['IHOT'] == '567'
+    assert fort15_values['fort.15.segment_2']['RNDAY'] == '16.5'
+    assert fort15_values['fort.15.segment_2']['NHSTAR NHSINC'] == '0 0'
+    assert '#SBATCH --time=04:00:00' in segment_script
+    assert 'cp -n fort.15 fort.15.segment_1' in segment_script
+    assert 'cp fort.15.segment_2 fort.15' in segment_script
+    assert (
+        "segment_jobid=$(sbatch --dependency=afterok:$segment_jobid ${segment} | awk '{print $NF}')"
+        in run_script
+    )
+    assert 'echo "runs/$(basename ${hotstart}) ${segment%.job} $segment_jobid"' in run_script
+
+    generate_adcirc_configuration(output_directory, overwrite=True, parallel=False)
+
+    assert not (run_directory / 'adcirc_segment_2.job').exists()
+    assert not (run_directory / 'fort.15.segment_2').exists()
+
+
+def test_hotstart_planner():
+    output_directory = OUTPUT_DIRECTORY / 'test_hotstart_planner'
+
+    configuration = ADCIRCRunConfiguration(
+        mesh_directory=INPUT_DIRECTORY / 'meshes' / 'shinnecock',
+        modeled_start_time=datetime(2008, 8, 23),
+        modeled_end_time=datetime(2008, 8, 23) + timedelta(days=14.5),
+        modeled_timestep=timedelta(seconds=2),
+        tidal_spinup_duration=timedelta(days=2),
+        platform=Platform.HERA,
+        slurm_job_duration=timedelta(hours=6),
+        perturbations={'run_1': None},
+    )
+    configuration.write_directory(output_directory, overwrite=True)
+
+    generate_adcirc_configuration(
+        output_directory,
+        overwrite=True,
+        parallel=False,
+        segment_duration=timedelta(hours=4),
+        throughput=60,
+        hotstart_write_bandwidth=0.01,
+        node_failure_rate=0.004,
+    )
+
+    planner = HotstartPlanner(
+        *read_mesh_size(INPUT_DIRECTORY / 'meshes' / 'shinnecock' / 'fort.14'),
+        write_bandwidth=0.01,
+        node_failure_rate=0.004,
+        throughput=60,
+        platform=Platform.HERA,
+    )
+    hotstart_interval = planner.attributes(
+        configuration['adcirc']['processors'], timedelta(seconds=2), timedelta(days=14.5)
+    )['NHSINC']
+
+    run_fort15_values = {}
+    for filename in ['fort.15', 'fort.15.segment_2']:
+        with open(output_directory / 'runs' / 'run_1' / filename) as fort15_file:
+            run_fort15_values[filename] = fort15_values(fort15_file.read())
+    with open(output_directory / 'spinup' / 'fort.15') as fort15_file:
+        spinup_fort15_values = fort15_values(fort15_file.read())
+
+    assert optimal_checkpoint_interval(
+        timedelta(seconds=60), timedelta(hours=24)
+    ) == timedelta(seconds=math.sqrt(2 * 60 * 24 * 3600) - 60)
+    assert 0 < hotstart_interval < 432000
+    assert spinup_fort15_values['NHSTAR NHSINC'] == '5 86400'
+    assert run_fort15_values['fort.15']['NHSTAR NHSINC'] == f'5 {hotstart_interval}'
+    assert run_fort15_values['fort.15.segment_2']['NHSTAR NHSINC'] == f'5 {hotstart_interval}'
+    # segments end on a planned hotstart file
+    assert (
+        round(float(run_fort15_values['fort.15']['RNDAY']) * 24 * 3600 / 2) % hotstart_interval
+        == 0
+    )
+
+
+def test_scan_log():
+    output_directory = OUTPUT_DIRECTORY / 'test_scan_log'
+    output_directory.mkdir(parents=True, exist_ok=True)
+    log_filename = output_directory / 'PET0.ESMF_LogFile'
+
+    with open(log_filename, 'w') as log_file:
+        for index in range(100):
+            log_file.write(f'20080823 000000.000 INFO PET0 step {index}\n')
+            if index % 2 == 0:
+                log_file.write(f'20080823 000000.000 ERROR PET0 step {index}\n')
+        log_file.write('segmentation fault (no trailing newline)')
+
+    lines = scan_log(log_filename, limit=3, chunk_size=64)
+
+    assert lines == [
+        '20080823 000000.000 ERROR PET0 step 0',
+        '20080823 000000.000 ERROR PET0 step 2',
+        '20080823 000000.000 ERROR PET0 step 4',
+        '... 45 more matching line(s) ...',
+        '20080823 000000.000 ERROR PET0 step 96',
+        '20080823 000000.000 ERROR PET0 step 98',
+        'segmentation fault (no trailing newline)',
+    ]
+    assert scan_log(log_filename, limit=100) == scan_log(log_filename, limit=100, chunk_size=7)
+
+
+def test_watch_completion():
+    output_directory = OUTPUT_DIRECTORY / 'test_watch_completion'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    for run_name in ['run_1', 'run_2']:
+        run_directory = output_directory / 'runs' / run_name
+        run_directory.mkdir(parents=True, exist_ok=True)
+        for filename in ['fort.14', 'fort.15', 'fort.16', 'ADCIRC_HOTSTART_run.err.log']:
+            (run_directory / filename).touch()
+        with open(run_directory / 'PET0.ESMF_LogFile', 'w') as log_file:
+            log_file.write('20080823 000000.000 INFO PET0 Running\n')
+        with open(run_directory / 'ADCIRC_HOTSTART_run.out.log', 'w') as log_file:
+            log_file.write('TIME STEP = 1 50.0% COMPLETE\n')
+
+    status_changes = watch_completion(output_directory, interval=0.1)
+
+    initial_status_changes = [next(status_changes), next(status_changes)]
+
+    with open(
+        output_directory / 'runs' / 'run_2' / 'ADCIRC_HOTSTART_run.out.log', 'a'
+    ) as log_file:
+        log_file.write('TIME STEP = 2 100.0% COMPLETE\nEnd Epilogue\n')
+
+    status_change = next(status_changes)
+
+    with open(output_directory / 'runs' / 'run_1' / 'PET0.ESMF_LogFile', 'a') as log_file:
+        log_file.write('20080823 000000.000 ERROR PET0 segmentation fault\n')
+
+    # the watch ends once no run can progress without intervention
+    final_status_changes = list(status_changes)
+
+    assert sorted(status_change['run'] for status_change in initial_status_changes) == [
+        'runs/run_1',
+        'runs/run_2',
+    ]
+    assert all(status_change['previous'] is None for status_change in initial_status_changes)
+    assert status_change['run'] == 'runs/run_2'
+    assert status_change['previous'] == 'running'
+    assert status_change['status'] == 'completed'
+    assert [
+        (status_change['run'], status_change['status'])
+        for status_change in final_status_changes
+    ] == [('runs/run_1', 'error')]
+
+
+def test_adcirc_progress():
+    output_directory = OUTPUT_DIRECTORY / 'test_adcirc_progress'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+
+    run_directory = output_directory / 'runs' / 'run_1'
+    run_directory.mkdir(parents=True, exist_ok=True)
+    with open(output_directory / 'configure_adcirc.json', 'w') as configuration_file:
+        json.dump(
+            {
+                'modeled_start_time': '2008-08-23 00:00:00',
+                'modeled_end_time': '2008-09-02 00:00:00',
+                'tidal_spinup_duration': 172800.0,
+            },
+            configuration_file,
+        )
+    with open(output_directory / 'configure_slurm.json', 'w') as configuration_file:
+        json.dump({'job_duration': 300.0}, configuration_file)
+
+    output_filename = run_directory / 'fort.63.nc'
+    with netCDF4.Dataset(output_filename, 'w') as dataset:
+        dataset.createDimension('time', None)
+        times = dataset.createVariable('time', float, ('time',))
+        times.units = 'seconds since 2008-08-21 00:00:00'
+        times[:] = [timedelta(days=days).total_seconds() for days in [3, 4]]
+    os.utime(output_filename, (1000, 1000))
+
+    first_progress = check_completion(output_directory, verbose=True)['runs']['run_1']
+
+    with netCDF4.Dataset(output_filename, 'a') as dataset:
+        dataset['time'][2] = timedelta(days=7).total_seconds()
+    os.utime(output_filename, (1100, 1100))
+
+    completion = check_completion(output_directory, verbose=True)
+    second_progress = completion['runs']['run_1']
+    telemetry = ensemble_telemetry(completion, now=datetime.fromtimestamp(1100))
+
+    assert first_progress['completion_percentage'] == 20.0
+    assert first_progress['progress']['model_time'] == '2008-08-25T00:00:00'
+    assert first_progress['progress']['throughput'] is None
+    assert second_progress['completion_percentage'] == 50.0
+    assert second_progress['progress']['throughput'] == timedelta(days=3).total_seconds() / 100
+    assert second_progress['progress']['remaining'] == pytest.approx(500 / 3)
+    assert second_progress['progress']['exceeds_job_duration']
+    assert telemetry['ensemble']['makespan'] == pytest.approx(500 / 3)
+    assert telemetry['ensemble']['exceeding_job_duration'] == ['runs/run_1']
+
+
+def test_validate_adcirc_outputs():
+    output_directory = OUTPUT_DIRECTORY / 'test_validate_adcirc_outputs'
+
+    if output_directory.exists():
+        shutil.rmtree(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    filenames = {}
+    for name, format, num_records in [
+        ('complete', 'NETCDF3_64BIT_OFFSET', 5),
+        ('in_progress', 'NETCDF3_CLASSIC', 3),
+        ('empty', 'NETCDF4', 0),
+        ('truncated', 'NETCDF3_64BIT_OFFSET', 5),
+    ]:
+        filename = output_directory / name / 'fort.63.nc'
+        filename.parent.mkdir()
+        with netCDF4.Dataset(filename, 'w', format=format) as dataset:
+            dataset.createDimension('time', None)
+            dataset.createDimension('node', 100)
+            times = dataset.createVariable('time', float, ('time',))
+            times.units = 'seconds since 2008-08-23 00:00:00'
+            elevations = dataset.createVariable('zeta', float, ('time', 'node'))
+            for record in range(num_records):
+                times[record] = timedelta(hours=6 * record).total_seconds()
+                elevations[record] = numpy.full(100, record)
+        filenames[name] = filename
+
+    with open(filenames['truncated'], 'r+b') as truncated_file:
+        truncated_file.truncate(filenames['truncated'].stat().st_size - 100)
+
+    statuses = validate_adcirc_outputs(filenames.values(), end_time=datetime(2008, 8, 24))
+
+    assert statuses[filenames['complete']] == (OutputStatus.COMPLETE, None)
+    assert statuses[filenames['in_progress']][0] == OutputStatus.IN_PROGRESS
+    assert statuses[filenames['empty']][0] == OutputStatus.IN_PROGRESS
+    assert statuses[filenames['truncated']][0] == OutputStatus.TRUNCATED
@@ -1,11 +1,18 @@
 from datetime import datetime, timedelta
 from enum import Enum
 import os
+from pathlib import Path
+from typing import Any
 
 from pyproj import CRS
 import pytest
 
-from coupledmodeldriver.utilities import convert_to_json, convert_value, create_symlink
+from coupledmodeldriver.utilities import (
+    compile_converter,
+    convert_to_json,
+    convert_value,
+    create_symlink,
+)
 from tests import INPUT_DIRECTORY, OUTPUT_DIRECTORY, REFERENCE_DIRECTORY
 
 
@@ -237,6 +244,41 @@ def test_convert_value():
     assert crs_3 == reference_crs_json
 
 
+def test_compile_converter():
+    values = [
+        None,
+        'a',
+        '0.55',
+        5,
+        'True',
+        [1, 2, '3', '4'],
+        datetime(2021, 3, 26),
+        '2021-03-26 00:00:00',
+        '20210326',
+        timedelta(hours=1),
+        '01:13:20:00',
+        '06:00:00',
+        EnumerationTest.test_1,
+        'test_1',
+        {'a': 1},
+    ]
+    types = [str, float, int, bool, [int], (int, str, float, str), datetime, timedelta]
+    types += [EnumerationTest, {str: Any}, Path]
+
+    for to_type in types:
+        converter = compile_converter(to_type)
+        for value in values:
+            try:
+                expected = convert_value(value, to_type)
+            except Exception as error:
+                with pytest.raises(type(error)):
+                    converter(value)
+            else:
+                converted_value = converter(value)
+                assert type(converted_value) == type(expected)
+                assert converted_value == expected
+
+
 def test_convert_values_to_json():
     result_1 = convert_to_json(5)
     result_2 = convert_to_json('5')